@@ -0,0 +1,54 @@
+"""批量转录音频文件（不监听热键，不需要麦克风）
+
+与听写使用同一个转录后端和后处理（.env 中的 SERVICE_PLATFORM、ADD_SYMBOL、翻译配置等），
+结果以 JSON 行追加到输出文件；中断后再次运行同样的命令，会跳过已经成功的文件：
+
+    python batch_transcribe.py ~/VoiceMemos -o memos.jsonl --workers 4
+    python batch_transcribe.py manifest.txt --mode translations
+"""
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.llm.cache import flush_cache, log_cache_stats
+from src.transcription import registry
+from src.transcription.batch import MODES, BatchTranscriber, ResultJournal, collect_inputs
+from src.utils.config import get_config
+from src.utils.httpClient import log_connection_stats
+from src.utils.logger import logger
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量转录音频文件，结果写入 JSONL")
+    parser.add_argument("source", help="音频目录（递归查找），或清单文件（每行一个路径或 JSON 对象）")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl", help="结果文件，同时用于断点续传")
+    parser.add_argument("-j", "--workers", type=int, default=4, help="同时进行的后端请求数")
+    parser.add_argument("--mode", choices=MODES, default="transcriptions", help="清单中未指定模式时使用的模式")
+    args = parser.parse_args(argv)
+
+    items = collect_inputs(args.source, args.mode)
+    if not items:
+        logger.warning(f"没有找到音频文件: {args.source}")
+        return 0
+    processor = registry.create_audio_processor(get_config())
+    with ResultJournal(args.output) as journal:
+        summary = BatchTranscriber(processor, workers=args.workers).run(items, journal)
+    flush_cache()
+    log_connection_stats()
+    log_cache_stats()
+
+    logger.info(
+        f"完成 {summary['succeeded']} 个, 失败 {summary['failed']} 个, 跳过 {summary['skipped']} 个; "
+        f"音频 {summary['audio_seconds']:.1f}秒 / 耗时 {summary['wall_seconds']:.1f}秒, "
+        f"吞吐量 {summary['throughput']:.1f} 音频秒/秒"
+    )
+    if summary["latency_p50"] is not None:
+        logger.info(f"单个文件耗时 p50 {summary['latency_p50']:.2f}秒, p95 {summary['latency_p95']:.2f}秒")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""性能基准与本地替身服务
+在无网络环境下复现延迟、验证流式拼接等行为，运行方式：
+
+    python -m benchmarks.bench_streaming
+"""
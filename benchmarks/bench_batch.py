@@ -0,0 +1,169 @@
+"""批量转录：不同并发数的吞吐量，以及中断后的续传
+
+本地替身服务模拟硅基流动的转录接口（固定延迟 + 与音频时长成正比的处理时间），
+生成一批不同长度、不同采样率的测试音频，分别用不同并发数完整转录一遍，
+报告吞吐量（音频秒/墙钟秒）和单个文件的耗时。之后模拟中断：结果文件只保留前一半
+（最后一行只写了一半），再次运行命令行入口，检查只补转了剩余的文件、结果完整且正确；
+之后启用 LLM_STREAM 以翻译模式转录一遍（后处理结果是文本片段的迭代器），检查结果正确写入；
+最后关闭 LLM_STREAM、让翻译接口返回 404，检查每个文件都记为失败且批量转录不中断，
+恢复翻译接口后再次运行，检查失败的文件被重新转录。
+任何一项结果不正确时以非零状态退出。
+
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_batch --files 40 --workers 1,4,16
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from .stub_server import StubServer, synth_utterance
+
+
+def _make_files(directory, count):
+    """生成测试音频，返回 {绝对路径: 期望的识别结果}"""
+    rng = np.random.default_rng(0)
+    rates = (16000, 44100, 48000)
+    expected = {}
+    for i in range(count):
+        words = [int(k) for k in rng.integers(0, 15, size=rng.integers(4, 16))]
+        sample_rate = rates[i % len(rates)]
+        path = os.path.join(directory, f"memo_{i:03d}.wav")
+        sf.write(path, synth_utterance(words, sample_rate), sample_rate)
+        expected[os.path.abspath(path)] = " ".join(f"w{k}" for k in words)
+    return expected
+
+
+def _read_results(path):
+    """读取结果文件，同一文件以最后一行为准"""
+    results = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            results[record["path"]] = record
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量转录吞吐量与续传")
+    parser.add_argument("--files", type=int, default=24, help="测试音频个数")
+    parser.add_argument("--workers", default="1,2,4,8", help="逗号分隔的并发数")
+    args = parser.parse_args()
+
+    stub = StubServer(base_latency=0.3, realtime_factor=0.05, jitter=0.05, seed=1).start()
+    failures = []
+    try:
+        os.environ.update({
+            "SERVICE_PLATFORM": "siliconflow",
+            "LOCAL_SENSEVOICE_URL": f"{stub.url}/v1/audio/transcriptions",
+            "HEDGE_PLATFORM": "",
+            "CONVERT_TO_SIMPLIFIED": "false",
+            "METRICS_PATH": "",
+        })
+
+        import batch_transcribe
+        from src.transcription import registry
+        from src.transcription.batch import BatchTranscriber, ResultJournal, collect_inputs
+        from src.utils.config import Config, get_config, set_config
+
+        set_config(Config.from_env())
+        processor = registry.create_audio_processor(get_config())
+
+        with tempfile.TemporaryDirectory() as workdir:
+            audio_dir = os.path.join(workdir, "memos")
+            os.makedirs(audio_dir)
+            expected = _make_files(audio_dir, args.files)
+            items = collect_inputs(audio_dir)
+            assert len(items) == args.files
+
+            print(f"{args.files} 个文件，共 {sum(sf.info(p).duration for p, _ in items):.1f} 秒音频")
+            print(f"{'并发数':>6} {'耗时(s)':>8} {'吞吐量(音频秒/秒)':>16} {'单个p50(s)':>10} {'单个p95(s)':>10} {'正确':>6}")
+            baseline = None
+            for workers in (int(w) for w in args.workers.split(",")):
+                output = os.path.join(workdir, f"results_{workers}.jsonl")
+                with ResultJournal(output) as journal:
+                    summary = BatchTranscriber(processor, workers=workers).run(items, journal)
+                results = _read_results(output)
+                correct = sum(results[path]["text"] == text for path, text in expected.items())
+                baseline = baseline or summary["throughput"]
+                print(f"{workers:>6} {summary['wall_seconds']:8.2f} {summary['throughput']:10.1f} "
+                      f"({summary['throughput'] / baseline:.1f}x) {summary['latency_p50']:10.2f} "
+                      f"{summary['latency_p95']:10.2f} {correct:>3}/{len(expected)}")
+                if correct != len(expected):
+                    failures.append(f"并发数 {workers}: {correct}/{len(expected)} 正确")
+
+            # 模拟中断：只保留前一半结果，最后一行只写了一半
+            output = os.path.join(workdir, "resume.jsonl")
+            with open(os.path.join(workdir, f"results_{workers}.jsonl"), encoding="utf-8") as f:
+                lines = f.readlines()
+            kept = args.files // 2
+            with open(output, "w", encoding="utf-8") as f:
+                f.writelines(lines[:kept])
+                f.write(lines[kept][:len(lines[kept]) // 2])
+            requests = stub.requests
+            exit_code = batch_transcribe.main([audio_dir, "-o", output, "--workers", str(workers)])
+            resent = stub.requests - requests
+            results = _read_results(output)
+            correct = sum(results.get(path, {}).get("text") == text for path, text in expected.items())
+            print(f"\n续传: 已有 {kept} 个结果，补转 {resent} 个文件（应为 {args.files - kept}），"
+                  f"退出码 {exit_code}，结果 {correct}/{len(expected)} 正确")
+            if resent != args.files - kept or correct != len(expected):
+                failures.append("续传")
+
+            # 流式后处理：翻译结果以文本片段的迭代器返回，写入结果前需要合并
+            os.environ.update({
+                "LLM_STREAM": "true",
+                "TRANSLATE_API_URL": f"{stub.url}/v1/chat/completions",
+                "TRANSLATE_MODEL": "stub",
+                "LLM_CACHE_SIZE": "0",
+            })
+            set_config(Config.from_env())
+            output = os.path.join(workdir, "stream.jsonl")
+            with ResultJournal(output) as journal:
+                summary = BatchTranscriber(registry.create_audio_processor(get_config()), workers=4).run(
+                    collect_inputs(audio_dir, "translations"), journal)
+            results = _read_results(output)
+            correct = sum(results.get(path, {}).get("text") == f"[en] {text}" for path, text in expected.items())
+            print(f"流式翻译: 成功 {summary['succeeded']} 个，失败 {summary['failed']} 个，"
+                  f"结果 {correct}/{len(expected)} 正确")
+            if correct != len(expected):
+                failures.append("流式翻译")
+
+            # 翻译失败：每个文件都应记为失败，恢复接口后续传时重新翻译
+            os.environ.update({
+                "LLM_STREAM": "false",
+                "TRANSLATE_API_URL": f"{stub.url}/v1/missing",
+            })
+            set_config(Config.from_env())
+            output = os.path.join(workdir, "translate.jsonl")
+            with ResultJournal(output) as journal:
+                summary = BatchTranscriber(registry.create_audio_processor(get_config()), workers=4).run(
+                    collect_inputs(audio_dir, "translations"), journal)
+            failed = summary["failed"]
+            os.environ["TRANSLATE_API_URL"] = f"{stub.url}/v1/chat/completions"
+            set_config(Config.from_env())
+            with ResultJournal(output) as journal:
+                summary = BatchTranscriber(registry.create_audio_processor(get_config()), workers=4).run(
+                    collect_inputs(audio_dir, "translations"), journal)
+            results = _read_results(output)
+            correct = sum(results.get(path, {}).get("text") == f"[en] {text}" for path, text in expected.items())
+            print(f"翻译失败: 失败 {failed} 个（应为 {len(expected)}），恢复后重新转录 {summary['files']} 个，"
+                  f"结果 {correct}/{len(expected)} 正确")
+            if failed != len(expected) or summary["files"] != len(expected) or correct != len(expected):
+                failures.append("翻译失败")
+    finally:
+        stub.stop()
+    if failures:
+        print(f"失败: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
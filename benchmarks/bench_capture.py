@@ -0,0 +1,100 @@
+"""录音采集微基准：音频回调耗时与松开按键后 stop_recording 的耗时
+
+对比旧实现（queue.Queue + indata.copy() + np.concatenate + 整段写 WAV）
+与环形缓冲区实现，分别在 16kHz 与 48kHz 下测量。
+
+    python -m benchmarks.bench_capture
+"""
+import io
+import queue
+import time
+
+import numpy as np
+import soundfile as sf
+
+from src.audio.ringBuffer import RingBuffer
+from .virtual_input import virtual_microphone
+
+RECORD_SECONDS = 10
+
+
+class _NullStream:
+    """不产生数据的输入流，由基准直接调用回调"""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _blocks(rate, dtype):
+    block = rate // 100  # 10ms
+    audio = np.random.default_rng(0).normal(0, 0.1, (rate * RECORD_SECONDS, 1)).astype(np.float32)
+    if dtype == np.int16:
+        audio = (audio * 32767).astype(np.int16)
+    return [audio[i:i + block] for i in range(0, len(audio), block)]
+
+
+def _legacy(rate):
+    q = queue.Queue()
+    blocks = _blocks(rate, np.float32)
+    start = time.perf_counter()
+    for block in blocks:
+        q.put(block.copy())
+    callback_us = (time.perf_counter() - start) / len(blocks) * 1e6
+
+    start = time.perf_counter()
+    data = []
+    while not q.empty():
+        data.append(q.get())
+    audio = np.concatenate(data)
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, rate, format='WAV')
+    stop_ms = (time.perf_counter() - start) * 1000
+    return callback_us, stop_ms
+
+
+def _ring(rate):
+    ring = RingBuffer(rate * 30)
+    blocks = _blocks(rate, np.int16)
+    start = time.perf_counter()
+    for block in blocks:
+        ring.write(block)
+    callback_us = (time.perf_counter() - start) / len(blocks) * 1e6
+
+    from src.audio import recorder as recorder_module
+    silence = np.zeros((rate, 1), dtype=np.float32)
+    with virtual_microphone(recorder_module.sd, silence, rate):
+        recorder_module.sd.InputStream = _NullStream
+        recorder = recorder_module.AudioRecorder()
+        recorder.min_record_duration = 0
+        recorder.start_recording()
+        for block in blocks:
+            recorder._audio_callback(block, len(block), None, None)
+        while recorder._read_pos < recorder.ring.written:  # 等待后台线程追上，模拟实时录音
+            time.sleep(0.01)
+        start = time.perf_counter()
+        recorder.stop_recording().close()
+        stop_ms = (time.perf_counter() - start) * 1000
+    return callback_us, stop_ms
+
+
+def main():
+    rows = []
+    for rate in (16000, 48000):
+        rows.append((rate, "queue+concat", *_legacy(rate)))
+        rows.append((rate, "ring buffer", *_ring(rate)))
+    print(f"{'采样率':>7} {'实现':>14} {'回调(us/块)':>12} {'stop(ms)':>9}")
+    for rate, name, callback_us, stop_ms in rows:
+        print(f"{rate:7d} {name:>14} {callback_us:12.2f} {stop_ms:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
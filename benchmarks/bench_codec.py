@@ -0,0 +1,48 @@
+"""上传音频编码格式对比：字节数、松开按键后的收尾耗时、慢速链路上的上传耗时
+
+    python -m benchmarks.bench_codec
+"""
+import time
+
+import numpy as np
+
+from src.audio.encoder import CODECS, AudioEncoder, payload_size
+from .stub_server import synth_utterance
+
+SAMPLE_RATE = 16000
+BLOCK = 160  # 10ms 一块，与低延迟模式下的回调粒度相当
+LINK_KBPS = 512  # 模拟上行带宽
+
+
+def _speech_like(seconds):
+    """正弦"词"叠加少量噪声，比纯正弦更接近真实语音的可压缩性"""
+    words = [k % 10 for k in range(int(seconds / 0.6) + 1)]
+    audio = synth_utterance(words, SAMPLE_RATE)[:int(seconds * SAMPLE_RATE)]
+    noise = np.random.default_rng(0).normal(0, 0.01, audio.shape).astype(np.float32)
+    return audio + noise
+
+
+def main():
+    print(f"{'格式':>6} {'时长(s)':>7} {'字节':>9} {'KB/s':>7} {'收尾(ms)':>9} {'整段编码(ms)':>12} {'上传(ms)':>9}")
+    for seconds in (5, 15):
+        audio = _speech_like(seconds)
+        for codec in CODECS:
+            encoder = AudioEncoder(SAMPLE_RATE, codec=codec)
+            for i in range(0, len(audio), BLOCK):
+                encoder.write(audio[i:i + BLOCK])
+            start = time.perf_counter()
+            buffer = encoder.finish()
+            finish_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            AudioEncoder.encode(audio, SAMPLE_RATE, codec=codec).close()
+            batch_ms = (time.perf_counter() - start) * 1000
+
+            size = payload_size(buffer)
+            upload_ms = size * 8 / (LINK_KBPS * 1000) * 1000
+            print(f"{encoder.codec:>6} {seconds:7d} {size:9d} {size / seconds / 1024:7.1f} "
+                  f"{finish_ms:9.2f} {batch_ms:12.2f} {upload_ms:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
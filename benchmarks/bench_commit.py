@@ -0,0 +1,69 @@
+"""文本提交耗时：旧协议（粘贴 + 完成标记 + 固定等待）与新协议对比
+
+用假 Controller（每个按键事件模拟 2ms 的系统注入耗时）驱动 KeyboardManager，
+测量从拿到结果到文本提交完成、状态回到空闲的耗时，以及合成的按键事件数。
+
+    python -m benchmarks.bench_commit
+"""
+import os
+import time
+
+from .fake_keyboard import fake_keyboard
+
+KEY_DELAY = 0.002
+TEXTS = {
+    "短英文": "OK, got it",
+    "短文本": "好的，收到",
+    "长文本": "今天下午三点在会议室讨论下一季度的预算安排，请大家提前准备好材料，" * 4,
+}
+
+
+def legacy_type_text(keyboard, text):
+    """旧的提交协议，用于对比"""
+    from src.keyboard.inputState import InputState
+
+    keyboard._delete_previous_text()
+    keyboard.type_temp_text(text + " ✅")
+    time.sleep(0.5)
+    keyboard.temp_text_length = 2
+    keyboard._delete_previous_text()
+    keyboard._restore_clipboard()
+    keyboard.state = InputState.IDLE
+
+
+def _run(text, legacy):
+    from src.keyboard import listener as listener_module
+    from src.keyboard.inputState import InputState
+
+    with fake_keyboard(listener_module, key_delay=KEY_DELAY) as (controller, clipboard):
+        noop = lambda: None
+        keyboard = listener_module.KeyboardManager(noop, noop, noop, noop, noop)
+        keyboard._original_clipboard = clipboard.paste()
+        keyboard.state = InputState.PROCESSING
+        events_before = len(controller.events)
+        start = time.perf_counter()
+        if legacy:
+            legacy_type_text(keyboard, text)
+        else:
+            keyboard.type_text(text)
+        elapsed = time.perf_counter() - start
+        assert keyboard.state == InputState.IDLE
+        events = len(controller.events) - events_before
+        time.sleep(keyboard.clipboard_restore_delay + 0.1)
+        assert clipboard.text == "原始剪贴板", clipboard.text
+    return elapsed, events
+
+
+def main():
+    os.environ.setdefault("TRANSCRIPTIONS_BUTTON", "alt")
+    os.environ.setdefault("TRANSLATIONS_BUTTON", "shift")
+    os.environ.setdefault("STATUS_SINK", "field")  # 保留输入框内的状态文本，只对比提交协议本身
+    print(f"{'文本':>6} {'协议':>4} {'提交耗时(ms)':>12} {'按键事件':>8}")
+    for name, text in TEXTS.items():
+        for legacy in (True, False):
+            elapsed, events = _run(text, legacy)
+            print(f"{name:>6} {'旧' if legacy else '新':>4} {elapsed * 1000:12.1f} {events:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""配置热更新：修改 .env 后只重建受影响的组件
+
+在进程内创建 VoiceAssistant（虚拟麦克风、模拟键盘，转录与翻译分别使用两个本地替身服务），
+依次修改 .env 中的配置并调用 reload_config()，报告每次重新加载的耗时、重建的组件、
+转录后端是否保留，以及之后一次翻译听写在两个服务上新建的连接数。
+超时、缓存、连接池等参数在现有后端上更新，只有转录地址等决定后端本身的配置才重新创建后端；
+只有连接池参数变化才会新建连接。任何一步与预期不符时以非零状态退出。
+重新启动主程序的耗时见 bench_daemon 的冷启动。
+
+    python -m benchmarks.bench_config_reload
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .fake_keyboard import fake_keyboard
+from .stub_server import StubServer, synth_utterance
+from .virtual_input import virtual_microphone
+
+SAMPLE_RATE = 16000
+
+# (说明, 修改的配置, 转录后端是否应保留)
+STEPS = [
+    ("翻译模型", {"TRANSLATE_MODEL": "stub-b"}, True),
+    ("请求超时", {"API_TIMEOUT": "15"}, True),
+    ("缓存有效期", {"LLM_CACHE_TTL": "3600"}, True),
+    ("预录时长", {"PREROLL_SECONDS": "0.5"}, True),
+    ("热键", {"TRANSLATIONS_BUTTON": "ctrl"}, True),
+    ("连接池上限", {"HTTP_MAX_CONNECTIONS": "4"}, True),
+    ("无效值", {"API_TIMEOUT": "abc"}, True),
+]
+
+
+def _write_env(path, values):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{key}={value}\n" for key, value in values.items())
+
+
+def _opened(origins):
+    from src.utils.httpClient import connection_stats
+
+    stats = connection_stats()
+    return [stats.get(origin, {}).get("opened", 0) for origin in origins]
+
+
+def main():
+    asr_stub = StubServer(base_latency=0.05, realtime_factor=0, seed=1).start()
+    llm_stub = StubServer(base_latency=0.05, realtime_factor=0, seed=2).start()
+    try:
+        values = {
+            "SERVICE_PLATFORM": "siliconflow",
+            "LOCAL_SENSEVOICE_URL": f"{asr_stub.url}/v1/audio/transcriptions",
+            "TRANSLATE_API_URL": f"{llm_stub.url}/v1/chat/completions",
+            "TRANSLATE_MODEL": "stub-a",
+            "TRANSCRIPTIONS_BUTTON": "alt",
+            "TRANSLATIONS_BUTTON": "shift",
+            "HEDGE_PLATFORM": "",
+            "STATUS_SINK": "none",
+            "METRICS_PATH": "",
+            "LLM_CACHE_SIZE": "0",
+            "DEVICE_CHECK_INTERVAL": "0",
+            "CONFIG_WATCH_INTERVAL": "0",
+        }
+        os.environ.update(values)
+
+        import main as app
+        from src.audio import recorder as recorder_module
+        from src.audio.encoder import AudioEncoder
+        from src.keyboard import listener as listener_module
+        from src.transcription import registry
+        from src.llm.cache import get_cache
+        from src.utils.config import Config, get_config, set_config
+
+        set_config(Config.from_env())
+        origins = [asr_stub.url, llm_stub.url]
+        speech = synth_utterance([1, 2, 3], SAMPLE_RATE)
+        silence = np.zeros((SAMPLE_RATE, 1), dtype=np.float32)
+
+        def dictate(assistant):
+            text, error = assistant.audio_processor.process_audio(
+                AudioEncoder.encode(speech, SAMPLE_RATE), mode="translations", prompt="")
+            assert error is None, error
+            return text
+
+        with tempfile.TemporaryDirectory() as workdir, \
+                virtual_microphone(recorder_module.sd, silence, SAMPLE_RATE), \
+                fake_keyboard(listener_module):
+            app.ENV_PATH = os.path.join(workdir, ".env")
+            app.PINNED_ENV = {}
+            _write_env(app.ENV_PATH, values)
+            assistant = app.VoiceAssistant(registry.create_audio_processor(get_config()))
+            dictate(assistant)  # 建立两个连接池的连接
+
+            # 换一个转录地址：决定后端本身的配置，必须重新创建后端
+            steps = STEPS[:-1] + [("转录地址", {"LOCAL_SENSEVOICE_URL": f"{asr_stub.url}/v2/audio/transcriptions"}, False),
+                                  STEPS[-1]]
+            failures = []
+            print(f"{'修改':<10} {'耗时(ms)':>9} {'后端保留':>8} {'新建连接(转录/翻译)':>20}  重建的组件")
+            for label, change, expect_kept in steps:
+                _write_env(app.ENV_PATH, {**values, **change})
+                processor, recorder = assistant.audio_processor, assistant.audio_recorder
+                start = time.perf_counter()
+                try:
+                    reply = assistant.reload_config()
+                except ValueError as e:
+                    elapsed = time.perf_counter() - start
+                    _write_env(app.ENV_PATH, values)
+                    ok = assistant.audio_processor is processor
+                    print(f"{label:<10} {elapsed * 1000:9.2f} {'是' if ok else '否':>8} {'-':>20}  未应用: {e}")
+                    if not ok:
+                        failures.append(label)
+                    continue
+                assistant.capture_engine.submit(time.perf_counter).result()  # 等待后端与录音器切换完成
+                values.update(change)
+                before = _opened(origins)
+                dictate(assistant)
+                opened = [after - b for after, b in zip(_opened(origins), before)]
+                kept = assistant.audio_processor is processor
+                # 只有连接池参数变化时两个服务才各新建一个连接
+                ok = kept == expect_kept and opened == ([1, 1] if "HTTP_MAX_CONNECTIONS" in change else [0, 0])
+                components = list(reply["components"])
+                if assistant.audio_recorder is not recorder:
+                    components.append("(录音器已重建)")
+                print(f"{label:<10} {reply['reload_ms']:9.2f} {'是' if kept else '否':>8} {opened[0]:>9}/{opened[1]:<10}  "
+                      f"{', '.join(components)}  {'✓' if ok else '✗'}")
+                if not ok:
+                    failures.append(label)
+
+            processor = assistant.audio_processor
+            if processor.translate_processor.model != "stub-b":
+                failures.append("翻译模型未生效")
+            if processor.timeout_seconds != 15.0 or get_config().api_timeout != 15.0:
+                failures.append("请求超时未生效或被无效值覆盖")
+            if processor.translate_processor.cache is not get_cache():
+                failures.append("翻译客户端仍在使用旧的结果缓存")
+            assistant.capture_engine.shutdown(wait=True)
+            assistant.engine.shutdown(wait=True)
+            assistant.audio_recorder.close()
+    finally:
+        asr_stub.stop()
+        llm_stub.stop()
+
+    if failures:
+        print(f"失败: {', '.join(failures)}")
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""常驻主程序：冷启动与暂停后恢复的耗时
+
+旧方式每次点击"启动"都重新运行 main.py，要承担解释器启动、导入、扫描录音设备
+和创建客户端的开销；现在主程序常驻，"关闭"只是通过控制端口暂停听写。
+本脚本分别测量：
+    冷启动 - 启动 main.py 到控制端口可以应答的耗时（以及进程内统计的启动耗时），
+             以及发送 shutdown 到进程退出并被回收的耗时
+    恢复   - 常驻进程暂停后发送 resume 的往返耗时
+
+API 地址和密钥均为占位值，不会发出网络请求：
+
+    python -m benchmarks.bench_daemon
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+COLD_ROUNDS = 3
+RESUME_ROUNDS = 50
+READY_TIMEOUT = 30
+
+ENV = {
+    "SERVICE_PLATFORM": "siliconflow",
+    "SILICONFLOW_API_KEY": "placeholder",
+    "LOCAL_SENSEVOICE_URL": "http://127.0.0.1:9/v1/audio/transcriptions",
+    "TRANSCRIPTIONS_BUTTON": "alt",
+    "TRANSLATIONS_BUTTON": "shift",
+    "STATUS_SINK": "none",
+    "METRICS_PATH": "",
+    "HEDGE_PLATFORM": "",
+}
+
+
+def _free_addr():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def _spawn(repo, workdir, addr):
+    env = dict(os.environ, **ENV, CONTROL_SOCKET_ADDR=addr)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [repo, os.environ.get("PYTHONPATH")] if p)
+    env.pop("LOG_STREAM_ADDR", None)
+    return subprocess.Popen([sys.executable, os.path.join(repo, "main.py")], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _wait_ready(process, addr):
+    """轮询控制端口，返回 (启动到应答的耗时, 主程序统计的启动耗时)"""
+    from src.control import send_command
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < READY_TIMEOUT:
+        if process.poll() is not None:
+            raise RuntimeError(f"主程序启动失败，退出码 {process.returncode}")
+        try:
+            stats = send_command("stats", addr, timeout=0.2)
+            return time.perf_counter() - start, stats["startup_ms"] / 1000
+        except (OSError, ValueError):
+            time.sleep(0.005)
+    raise RuntimeError("等待主程序就绪超时")
+
+
+def _shutdown(process, addr):
+    from src.control import send_command
+
+    start = time.perf_counter()
+    send_command("shutdown", addr)
+    process.wait(timeout=10)
+    return time.perf_counter() - start
+
+
+def main():
+    from src.control import send_command
+
+    repo = os.getcwd()
+    sys.path.insert(0, repo)
+    cold, inside, exits = [], [], []
+    resumes, resume_inside = [], []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(COLD_ROUNDS):
+            addr = _free_addr()
+            process = _spawn(repo, workdir, addr)
+            try:
+                ready, startup = _wait_ready(process, addr)
+                cold.append(ready)
+                inside.append(startup)
+                exits.append(_shutdown(process, addr))
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+            assert process.returncode is not None  # 已被回收，不会留下僵尸进程
+
+        addr = _free_addr()
+        process = _spawn(repo, workdir, addr)
+        try:
+            _wait_ready(process, addr)
+            for _ in range(RESUME_ROUNDS):
+                assert send_command("pause", addr)["state"] == "paused"
+                start = time.perf_counter()
+                reply = send_command("resume", addr)
+                resumes.append(time.perf_counter() - start)
+                assert reply["state"] == "running"
+                resume_inside.append(send_command("stats", addr)["resume_ms"] / 1000)
+            _shutdown(process, addr)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+    print(f"{'':>10} {'p50(ms)':>10} {'p95(ms)':>10} {'次数':>6}")
+    for label, values in (("冷启动", cold), ("  进程内", inside), ("退出", exits),
+                          ("恢复往返", resumes), ("  进程内", resume_inside)):
+        p50, p95 = np.percentile(values, [50, 95]) * 1000
+        print(f"{label:>10} {p50:10.2f} {p95:10.2f} {len(values):6d}")
+    print(f"恢复比冷启动快 {np.median(cold) / np.median(resumes):.0f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""端到端延迟：松开按键 → 文本提交完成
+
+用虚拟麦克风播放 WAV 录音、假键盘和本地替身服务驱动完整的 VoiceAssistant，
+按真实的按键时序（按下、按住、松开）反复听写，统计每种配置下的总延迟、首字延迟
+以及各阶段（停止录音、转录与后处理、文本提交）耗时的 p50/p95/p99，并把结果
+写入 JSON 文件供脚本比较。
+
+替身服务各自独立，延迟和抖动可配置：
+    sensevoice - LOCAL_SENSEVOICE_URL 指向的 SenseVoice 接口
+    groq       - GROQ_BASE_URL：Whisper 音频接口，以及 SymbolProcessor 的对话补全
+    translate  - TRANSLATE_API_URL：TranslateProcessor 的对话补全
+
+    python -m benchmarks.bench_e2e
+    python -m benchmarks.bench_e2e --fixtures recordings/ --rounds 30 --jitter 0.1 --output e2e.json
+    python -m benchmarks.bench_e2e --configs sensevoice,groq+llm
+
+--fixtures 目录中的 WAV 任意采样率、声道数均可；不指定时使用合成语音。
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+from .fake_keyboard import fake_keyboard
+from .stub_server import StubServer, synth_utterance
+from .virtual_input import cued_microphone
+
+DEVICE_RATE = 48000
+FIXTURE_WORDS = ([1, 2, 3], [4, 5, 6, 7, 8], [0, 2, 4, 6, 8, 1, 3, 5])
+COMMIT_TIMEOUT = 30
+STAGES = ("total", "first_char", "capture", "process", "commit")
+
+# 配置名: (SERVICE_PLATFORM, 模式, 额外环境变量)
+CONFIGS = {
+    "sensevoice": ("siliconflow", "transcriptions", {}),
+    "sensevoice+translate": ("siliconflow", "translations", {}),
+    "sensevoice+translate-stream": ("siliconflow", "translations", {"LLM_STREAM": "true"}),
+    "groq": ("groq", "transcriptions", {"ADD_SYMBOL": "false", "OPTIMIZE_RESULT": "false"}),
+    "groq+llm": ("groq", "transcriptions", {"ADD_SYMBOL": "true", "OPTIMIZE_RESULT": "true"}),
+    "groq+llm-stream": ("groq", "transcriptions", {"ADD_SYMBOL": "true", "OPTIMIZE_RESULT": "true", "LLM_STREAM": "true"}),
+}
+
+
+def _write_synthetic_fixtures(directory):
+    """没有录音时，把合成语音写成 WAV，与真实录音走同样的加载流程"""
+    paths = []
+    for i, words in enumerate(FIXTURE_WORDS):
+        path = os.path.join(directory, f"synthetic_{i}.wav")
+        sf.write(path, synth_utterance(words, 16000), 16000, subtype="PCM_16")
+        paths.append(path)
+    return paths
+
+
+def load_fixtures(paths):
+    """读取 WAV 并转换为虚拟麦克风采样率的单声道 float32"""
+    from src.audio.resampler import resample
+
+    fixtures = []
+    for path in paths:
+        audio, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+        audio = resample(audio, sample_rate, DEVICE_RATE).astype(np.float32) / 32768.0
+        fixtures.append((os.path.basename(path), audio.reshape(-1, 1)))
+    return fixtures
+
+
+def percentiles(values):
+    if not values:
+        return None
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "mean": float(np.mean(values)), "max": float(np.max(values))}
+
+
+class DictationProbe:
+    """给 VoiceAssistant 的各阶段打点，记录一次听写中的时间戳"""
+
+    def __init__(self, assistant):
+        self.marks = {}
+        self.committed = threading.Event()
+        self.text = None
+        self.error = None
+        recorder = assistant.audio_recorder
+        processor = assistant.audio_processor
+        keyboard = assistant.keyboard_manager
+
+        stop_recording = recorder.stop_recording
+        process_audio = processor.process_audio
+        type_text = keyboard.type_text
+
+        def timed_stop():
+            result = stop_recording()
+            self.marks["stopped"] = time.perf_counter()
+            return result
+
+        def timed_process(*args, **kwargs):
+            self.marks["process_start"] = time.perf_counter()
+            result = process_audio(*args, **kwargs)
+            self.marks["process_end"] = time.perf_counter()
+            return result
+
+        def collect(chunks):
+            pieces = []
+            for chunk in chunks:
+                pieces.append(chunk)
+                yield chunk
+            self.text = "".join(pieces)
+
+        def timed_type(text, error=None, dictation=None):
+            self.marks["commit_start"] = time.perf_counter()
+            self.text, self.error = text, error
+            if text is not None and not isinstance(text, str):
+                text = collect(text)  # 流式结果：边输入边记录完整文本
+            try:
+                type_text(text, error, dictation)
+            finally:
+                self.marks["committed"] = time.perf_counter()
+                self.committed.set()
+
+        recorder.stop_recording = timed_stop
+        processor.process_audio = timed_process
+        keyboard.type_text = timed_type
+
+    def reset(self):
+        self.marks.clear()
+        self.committed.clear()
+        self.text = self.error = None
+
+
+def _run_config(name, fixtures, rounds, stubs):
+    from pynput.keyboard import Key
+
+    import main
+    from src.audio import recorder as recorder_module
+    from src.keyboard import listener as listener_module
+    from src.transcription import registry
+    from src.utils.config import Config, set_config
+
+    service_platform, mode, extra_env = CONFIGS[name]
+    saved_env = dict(os.environ)
+    os.environ.update(extra_env)
+    os.environ["SERVICE_PLATFORM"] = service_platform
+    set_config(Config.from_env())
+    samples = []
+    try:
+        with cued_microphone(recorder_module.sd, DEVICE_RATE) as cue, \
+                fake_keyboard(listener_module) as (controller, _):
+            assistant = main.VoiceAssistant(registry.create_processor(service_platform))
+            keyboard = assistant.keyboard_manager
+            probe = DictationProbe(assistant)
+            stub_requests = {key: stub.requests for key, stub in stubs.items()}
+
+            for i in range(rounds):
+                fixture_name, audio = fixtures[i % len(fixtures)]
+                probe.reset()
+                if mode == "translations":
+                    keyboard.on_press(Key.shift)
+                keyboard.on_press(Key.alt)
+                cue.play(audio)  # 按下热键时开始说话，依靠预录保留按住阈值期间的音频
+                time.sleep(keyboard.PRESS_DURATION_THRESHOLD + len(audio) / DEVICE_RATE + 0.15)
+
+                released = time.perf_counter()
+                keyboard.on_release(Key.alt)
+                if mode == "translations":
+                    keyboard.on_release(Key.shift)
+                if not probe.committed.wait(COMMIT_TIMEOUT):
+                    samples.append({"fixture": fixture_name, "error": "timeout"})
+                    continue
+
+                marks = probe.marks
+                sample = {
+                    "fixture": fixture_name,
+                    "audio_seconds": len(audio) / DEVICE_RATE,
+                    "error": probe.error,
+                    "text": probe.text,
+                    "total": marks["committed"] - released,
+                    "first_char": keyboard.first_char_latency,
+                    "capture": marks["stopped"] - released,
+                    "commit": marks["committed"] - marks["commit_start"],
+                }
+                if "process_start" in marks:
+                    sample["process"] = marks["process_end"] - marks["process_start"]
+                samples.append(sample)
+                time.sleep(0.1)  # 等待状态回到空闲
+
+            assistant.capture_engine.shutdown(wait=True)
+            assistant.engine.shutdown(wait=True)
+            assistant.audio_recorder.close()
+            requests = {key: stub.requests - stub_requests[key] for key, stub in stubs.items()}
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        set_config(Config.from_env())
+
+    ok = [s for s in samples if not s.get("error")]
+    return {
+        "name": name,
+        "platform": service_platform,
+        "mode": mode,
+        "env": extra_env,
+        "rounds": rounds,
+        "errors": len(samples) - len(ok),
+        "stub_requests": requests,
+        "metrics": {stage: percentiles([s[stage] for s in ok if s.get(stage) is not None]) for stage in STAGES},
+        "samples": samples,
+    }
+
+
+def _ms(metric, key="p50"):
+    return f"{metric[key] * 1000:7.0f}" if metric else f"{'-':>7}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端听写延迟基准")
+    parser.add_argument("--configs", default=",".join(CONFIGS), help=f"逗号分隔，可选: {', '.join(CONFIGS)}")
+    parser.add_argument("--fixtures", help="WAV 录音目录，默认使用合成语音")
+    parser.add_argument("--rounds", type=int, default=10, help="每种配置的听写次数")
+    parser.add_argument("--asr-latency", type=float, default=0.2, help="转录接口的固定延迟（秒）")
+    parser.add_argument("--asr-realtime-factor", type=float, default=0.1, help="转录接口每秒音频的处理时间（秒）")
+    parser.add_argument("--llm-latency", type=float, default=0.15, help="对话补全接口的首个片段延迟（秒）")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="流式对话补全的片段间隔（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05, help="所有替身服务的随机抖动上限（秒）")
+    parser.add_argument("--tail-probability", type=float, default=0.0, help="长尾延迟出现的概率")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="长尾延迟（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join("logs", "bench_e2e_results.json"),
+                        help="JSON 结果文件路径（默认写入被 git 忽略的 logs/ 目录）")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.configs.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CONFIGS]
+    if unknown:
+        parser.error(f"未知的配置: {', '.join(unknown)}")
+
+    tail = {"jitter": args.jitter, "tail_probability": args.tail_probability, "tail_latency": args.tail_latency}
+    stubs = {
+        "sensevoice": StubServer(args.asr_latency, args.asr_realtime_factor, seed=args.seed, **tail),
+        # Groq 的对话补全（标点、优化）与音频接口共用 GROQ_BASE_URL
+        "groq": StubServer(args.asr_latency, args.asr_realtime_factor, seed=args.seed + 1,
+                           token_latency=args.token_latency, llm_latency=args.llm_latency, **tail),
+        "translate": StubServer(args.llm_latency, 0.0, seed=args.seed + 2, token_latency=args.token_latency, **tail),
+    }
+
+    for stub in stubs.values():
+        stub.start()
+    os.environ.update({
+        "LOCAL_SENSEVOICE_URL": f"{stubs['sensevoice'].url}/v1/audio/transcriptions",
+        "GROQ_BASE_URL": f"{stubs['groq'].url}/v1",
+        "GROQ_API_KEY": "stub",
+        "TRANSLATE_API_URL": f"{stubs['translate'].url}/v1/chat/completions",
+        "TRANSLATE_MODEL": "stub",
+    })
+    for key, value in {
+        "TRANSCRIPTIONS_BUTTON": "alt",
+        "TRANSLATIONS_BUTTON": "shift",
+        "CONVERT_TO_SIMPLIFIED": "false",
+        "LLM_CACHE_SIZE": "0",  # 每次都走替身服务，测的是接口延迟而不是缓存
+        "STATUS_SINK": "none",
+        "DEVICE_CHECK_INTERVAL": "0",
+        "HEDGE_PLATFORM": "",
+        # 默认关闭的常驻输入流和预录在这里开启：按下热键时就开始说话，依靠预录保留按住阈值期间的音频
+        "WARM_STREAM": "true",
+        "PREROLL_SECONDS": "1.0",
+    }.items():
+        os.environ.setdefault(key, value)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.fixtures:
+            paths = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+            if not paths:
+                parser.error(f"{args.fixtures} 中没有 WAV 文件")
+        else:
+            paths = _write_synthetic_fixtures(directory)
+        fixtures = load_fixtures(paths)
+
+    results = []
+    try:
+        for name in names:
+            results.append(_run_config(name, fixtures, args.rounds, stubs))
+    finally:
+        for stub in stubs.values():
+            stub.stop()
+
+    print(f"{'配置':<28} {'次数':>4} {'失败':>4} {'总p50':>7} {'总p95':>7} {'总p99':>7} {'首字p50':>7} "
+          f"{'停止p50':>7} {'处理p50':>7} {'提交p50':>7}  (ms)")
+    for result in results:
+        m = result["metrics"]
+        print(f"{result['name']:<28} {result['rounds']:4d} {result['errors']:4d} "
+              f"{_ms(m['total'])} {_ms(m['total'], 'p95')} {_ms(m['total'], 'p99')} {_ms(m['first_char'])} "
+              f"{_ms(m['capture'])} {_ms(m['process'])} {_ms(m['commit'])}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "fixtures": [name for name, _ in fixtures],
+        "settings": {key: value for key, value in vars(args).items() if key not in ("configs", "output")},
+        "configs": results,
+    }
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
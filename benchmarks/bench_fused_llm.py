@@ -0,0 +1,57 @@
+"""LLM 后处理：逐步调用与合并调用的延迟对比
+
+本地替身 LLM 每个请求固定延迟，分别测量
+添加标点 + 优化结果 两次串行请求，与合并成一次请求的端到端耗时。
+
+    python -m benchmarks.bench_fused_llm
+"""
+import os
+import time
+
+import numpy as np
+
+from .stub_server import StubServer
+
+REQUESTS = 20
+PHRASES = ["hello world", "send the report by friday", "see you tomorrow", "thanks for the update"]
+
+
+def _measure(func):
+    latencies = []
+    for i in range(REQUESTS):
+        # 每次使用不同文本，避免命中结果缓存
+        text = f"{PHRASES[i % len(PHRASES)]} {i}"
+        start = time.perf_counter()
+        result = func(text)
+        latencies.append(time.perf_counter() - start)
+    return np.percentile(latencies, [50, 95]), result
+
+
+def main():
+    stub = StubServer(base_latency=0.3, realtime_factor=0, jitter=0.05, seed=1).start()
+    try:
+        os.environ["GROQ_BASE_URL"] = f"{stub.url}/v1"
+        os.environ["GROQ_API_KEY"] = "stub"
+        os.environ["LLM_CACHE_SIZE"] = "0"
+
+        from src.llm.symbol import SymbolProcessor
+
+        symbol = SymbolProcessor()
+
+        def chained(text):
+            return symbol.optimize_result(symbol.add_symbol(text))
+
+        def fused(text):
+            return symbol.process(text, ["add_symbol", "optimize"])
+
+        print(f"{'方式':>6} {'p50(s)':>7} {'p95(s)':>7}  请求数  示例输出")
+        for name, func in (("逐步", chained), ("合并", fused)):
+            before = stub.requests
+            (p50, p95), sample = _measure(func)
+            print(f"{name:>6} {p50:7.2f} {p95:7.2f}  {stub.requests - before:6d}  {sample}")
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""对冲请求的尾延迟对比
+
+两个本地替身服务都有随机抖动和一定概率的长尾延迟，
+分别测量只用主后端、延迟对冲、立即对冲三种方式的 p50/p95/p99 与胜出统计。
+对冲方式还要检查统计是否自洽，任何一项不满足时以非零状态退出：
+    - 主/备胜出次数之和等于请求数，且没有后端失败
+    - 备用请求（含未发送即取消的）次数：立即对冲时等于请求数；延迟对冲时等于耗时超过
+      延迟的听写次数（替身服务的正常延迟远小于对冲延迟，长尾远大于它）
+    - 每个发出后落败的请求都计为在途放弃：发出的请求数 = 胜出次数 + 放弃次数
+
+    python -m benchmarks.bench_hedging
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from .stub_server import StubServer, synth_utterance
+
+REQUESTS = 40
+
+
+def _measure(processor, audio):
+    from src.audio.encoder import AudioEncoder
+
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        text, error = processor.process_audio(AudioEncoder.encode(audio, 16000))
+        assert error is None, error
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _check(hedged, delay, latencies):
+    """检查对冲统计是否自洽，返回失败项列表"""
+    # 被放弃的请求在下一个检查点才退出，等它们全部结束后再统计
+    hedged._executor.shutdown(wait=True)
+    stats = hedged.get_stats()
+    primary, secondary = stats["primary"], stats["secondary"]
+    failures = []
+    wins = primary["wins"] + secondary["wins"]
+    if wins != REQUESTS or primary["errors"] or secondary["errors"]:
+        failures.append(f"胜出 {wins} 次、失败 {primary['errors'] + secondary['errors']} 次，请求 {REQUESTS} 次")
+    launched = secondary["requests"] + secondary["cancelled"]
+    expected = REQUESTS if delay == 0 else sum(latency > delay for latency in latencies)
+    if launched != expected:
+        failures.append(f"备用请求 {launched} 次，应为 {expected} 次")
+    if primary["requests"] + primary["cancelled"] != REQUESTS:
+        failures.append(f"主请求 {primary['requests'] + primary['cancelled']} 次，应为 {REQUESTS} 次")
+    sent = primary["requests"] + secondary["requests"]
+    abandoned = primary["abandoned"] + secondary["abandoned"]
+    if sent != wins + abandoned:
+        failures.append(f"发出 {sent} 次 ≠ 胜出 {wins} 次 + 放弃 {abandoned} 次")
+    return [f"对冲 {delay:g}s: {failure}" for failure in failures]
+
+
+def main():
+    primary_stub = StubServer(base_latency=0.15, realtime_factor=0, jitter=0.05,
+                              tail_probability=0.15, tail_latency=1.5, seed=1).start()
+    secondary_stub = StubServer(base_latency=0.25, realtime_factor=0, jitter=0.05,
+                                tail_probability=0.15, tail_latency=1.5, seed=2).start()
+    try:
+        primary_url = f"{primary_stub.url}/v1/audio/transcriptions"
+        os.environ.setdefault("TRANSLATE_API_URL", primary_url)
+        os.environ.setdefault("TRANSLATE_MODEL", "stub")
+
+        from src.transcription.hedged import HedgedProcessor
+        from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
+
+        audio = synth_utterance([1, 2, 3])
+        primary = SenseVoiceSmallProcessor(url=primary_url)
+        secondary = SenseVoiceSmallProcessor(url=f"{secondary_stub.url}/v1/audio/transcriptions")
+
+        print(f"{'方式':>10} {'p50(s)':>7} {'p95(s)':>7} {'p99(s)':>7}  胜出 (主/备)  失败方 (未发送即取消/在途放弃)")
+        p50, p95, p99 = np.percentile(_measure(primary, audio), [50, 95, 99])
+        print(f"{'仅主后端':>10} {p50:7.2f} {p95:7.2f} {p99:7.2f}")
+        failures = []
+        for delay in (0.4, 0.0):
+            hedged = HedgedProcessor(primary, secondary, delay=delay)
+            latencies = _measure(hedged, audio)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            failures += _check(hedged, delay, latencies)
+            stats = hedged.get_stats()
+            name = f"对冲 {delay:g}s"
+            cancelled = sum(s["cancelled"] for s in stats.values())
+            abandoned = sum(s["abandoned"] for s in stats.values())
+            print(f"{name:>10} {p50:7.2f} {p95:7.2f} {p99:7.2f}  "
+                  f"{stats['primary']['wins']}/{stats['secondary']['wins']} "
+                  f"(备用请求 {stats['secondary']['requests']} 次)  {cancelled}/{abandoned}")
+    finally:
+        primary_stub.stop()
+        secondary_stub.stop()
+
+    if failures:
+        print("失败: " + "; ".join(failures))
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
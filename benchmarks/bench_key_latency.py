@@ -0,0 +1,86 @@
+"""后端处理缓慢时按键回调的响应延迟
+
+用虚拟麦克风、假键盘和一个耗时数秒的假转录后端驱动 VoiceAssistant，
+连续进行多次听写，测量 pynput 的 on_press / on_release 回调各自阻塞了多久。
+对比"同步执行"（旧行为）与流水线引擎两种模式。流水线模式下任何一次回调超过
+MAX_HANDLER_MS 时以非零状态退出（同步模式一行仅作对比）。
+
+    python -m benchmarks.bench_key_latency
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from .fake_keyboard import fake_keyboard
+from .stub_server import synth_utterance
+from .virtual_input import virtual_microphone
+
+SAMPLE_RATE = 16000
+BACKEND_SECONDS = 2.0
+DICTATIONS = 3
+MAX_HANDLER_MS = 50.0  # 流水线模式下单次回调允许的最长耗时
+
+
+class SlowProcessor:
+    """假转录后端：固定耗时后返回文本"""
+
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt="", stream=None):
+        time.sleep(BACKEND_SECONDS)
+        if audio_buffer is not None:
+            audio_buffer.close()
+        return "测试文本", None
+
+
+def _run(synchronous):
+    from pynput.keyboard import Key
+
+    import main
+    from src.audio import recorder as recorder_module
+    from src.keyboard import listener as listener_module
+
+    audio = synth_utterance(list(range(10)), SAMPLE_RATE)
+    with virtual_microphone(recorder_module.sd, audio, SAMPLE_RATE), fake_keyboard(listener_module):
+        assistant = main.VoiceAssistant(SlowProcessor())
+        keyboard = assistant.keyboard_manager
+        if synchronous:
+            for engine in (assistant.capture_engine, assistant.engine):
+                engine.submit = lambda func, *args, on_error=None, **kwargs: func(*args, **kwargs)
+
+        handler_times = []
+        start = time.perf_counter()
+        for _ in range(DICTATIONS):
+            t = time.perf_counter()
+            keyboard.on_press(Key.alt)
+            handler_times.append(time.perf_counter() - t)
+            time.sleep(keyboard.PRESS_DURATION_THRESHOLD + 1.2)  # 超过阈值开始录音，再录 1.2 秒
+
+            t = time.perf_counter()
+            keyboard.on_release(Key.alt)
+            handler_times.append(time.perf_counter() - t)
+            time.sleep(0.1)
+
+        assistant.engine.shutdown(wait=True)
+        total = time.perf_counter() - start
+    return max(handler_times), float(np.median(handler_times)), total
+
+
+def main():
+    os.environ.setdefault("TRANSCRIPTIONS_BUTTON", "alt")
+    os.environ.setdefault("TRANSLATIONS_BUTTON", "shift")
+    print(f"{'模式':>8} {'回调最大(ms)':>12} {'回调中位(ms)':>12} {'总耗时(s)':>9}")
+    for synchronous in (True, False):
+        worst, median, total = _run(synchronous)
+        name = "同步" if synchronous else "流水线"
+        mark = "" if synchronous else ("✓" if worst * 1000 <= MAX_HANDLER_MS else "✗")
+        print(f"{name:>8} {worst * 1000:12.1f} {median * 1000:12.1f} {total:9.1f}  {mark}")
+
+    if worst * 1000 > MAX_HANDLER_MS:
+        print(f"失败: 流水线模式下回调最长阻塞 {worst * 1000:.1f}ms，超过 {MAX_HANDLER_MS:g}ms")
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""LLM 流式输出的首字延迟对比
+
+本地替身 LLM 首个片段前固定延迟，之后每 3 个字符一个片段（流式分块会刻意拆开多字节字符）。
+用假键盘驱动 KeyboardManager，分别测量一次性返回与流式输出两种方式下：
+从松开按键到第一个字符输入的延迟（首字延迟）、到文本全部输入完成的耗时，并校验输入内容：
+含中文的批次必须通过剪贴板粘贴，不能用按键直接输入（会被输入法拦截）。
+
+    python -m benchmarks.bench_llm_stream
+"""
+import os
+import time
+
+from .fake_keyboard import fake_keyboard
+from .stub_server import StubServer
+
+TEXT = "今天下午三点在会议室讨论下一季度的预算安排，请大家提前准备好材料，meeting notes 会后发到群里"
+ROUNDS = 3
+
+
+def _run(processor, mode, stream, expected):
+    from src.keyboard import listener as listener_module
+    from src.keyboard.inputState import InputState
+
+    processor.stream_llm = stream
+    first_chars, totals = [], []
+    for _ in range(ROUNDS):
+        with fake_keyboard(listener_module) as (controller, _):
+            noop = lambda: None
+            keyboard = listener_module.KeyboardManager(noop, noop, noop, noop, noop)
+            keyboard.state = InputState.PROCESSING
+            start = time.perf_counter()
+            keyboard.type_text(processor.post_process(TEXT, mode))
+            totals.append(time.perf_counter() - start)
+            first_chars.append(keyboard.first_char_latency)
+            entered = "".join(controller.entered)
+            assert entered == expected, entered
+            assert all(text.isascii() for text in controller.typed), controller.typed
+            assert keyboard.state == InputState.IDLE
+    return sum(first_chars) / ROUNDS, sum(totals) / ROUNDS
+
+
+def main():
+    stub = StubServer(base_latency=0.3, realtime_factor=0, token_latency=0.02, seed=1).start()
+    try:
+        os.environ.update({
+            "TRANSCRIPTIONS_BUTTON": "alt", "TRANSLATIONS_BUTTON": "shift",
+            "TRANSLATE_API_URL": f"{stub.url}/v1/chat/completions", "TRANSLATE_MODEL": "stub",
+            "GROQ_BASE_URL": f"{stub.url}/v1", "GROQ_API_KEY": "stub", "SERVICE_PLATFORM": "groq",
+            "ADD_SYMBOL": "true", "OPTIMIZE_RESULT": "true",
+            "LLM_CACHE_SIZE": "0",
+        })
+
+        from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
+        from src.transcription.whisper import WhisperProcessor
+
+        cases = [
+            ("翻译", SenseVoiceSmallProcessor(url=f"{stub.url}/v1/audio/transcriptions"), "translations",
+             f"[en] {TEXT}"),
+            ("标点+优化", WhisperProcessor(), "transcriptions", f"{TEXT}."),
+        ]
+        print(f"{'后处理':>8} {'方式':>6} {'首字延迟(s)':>11} {'完成耗时(s)':>11}")
+        for name, processor, mode, expected in cases:
+            for stream in (False, True):
+                first_char, total = _run(processor, mode, stream, expected)
+                print(f"{name:>8} {'流式' if stream else '一次性':>6} {first_char:11.2f} {total:11.2f}")
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""进程内 CPU 转录的延迟（需要 pip install faster-whisper，首次运行会下载模型）
+
+对每种线程数 × 量化方式的组合加载一次本地模型，报告加载和预热耗时，再对不同
+时长的片段分别以 PcmBuffer（录音器直接交出的 PCM）和 FLAC（编码后再解码）两种
+输入各转录若干次，报告中位延迟和实时率（处理耗时 / 音频时长）。只使用 CPU。
+
+    python -m benchmarks.bench_local_asr
+    LOCAL_MODEL=tiny BENCH_THREADS=1,4 BENCH_COMPUTE_TYPES=int8,float32 python -m benchmarks.bench_local_asr
+
+可用 BENCH_WAV 指定一段真实录音（单声道 16kHz），默认使用合成音频。
+"""
+import os
+import time
+
+import numpy as np
+import soundfile as sf
+
+from .stub_server import synth_utterance
+
+SAMPLE_RATE = 16000
+CLIP_SECONDS = (2, 5, 10)
+ROUNDS = 3
+
+
+def _clips():
+    path = os.getenv("BENCH_WAV")
+    if path:
+        audio, sample_rate = sf.read(path, dtype="int16")
+        assert sample_rate == SAMPLE_RATE, f"BENCH_WAV 需要 {SAMPLE_RATE}Hz 音频"
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+    else:
+        tone = synth_utterance(list(range(40)), SAMPLE_RATE)[:, 0]
+        audio = (tone * 32767).astype(np.int16)
+    return {seconds: audio[:seconds * SAMPLE_RATE] for seconds in CLIP_SECONDS if len(audio) >= seconds * SAMPLE_RATE}
+
+
+def _median_latency(processor, make_buffer):
+    times = []
+    for _ in range(ROUNDS):
+        buffer = make_buffer()
+        start = time.perf_counter()
+        processor.transcribe_segment(buffer)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    from src.audio.encoder import AudioEncoder, PcmBuffer
+    from src.transcription import localWhisper
+    from src.utils.config import Config, get_config, set_config
+
+    if localWhisper.WhisperModel is None:
+        print("未安装 faster-whisper，请先执行: pip install faster-whisper")
+        return
+
+    os.environ["CONVERT_TO_SIMPLIFIED"] = "false"
+    os.environ["OPTIMIZE_RESULT"] = "false"
+    set_config(Config.from_env())
+    threads = [int(n) for n in os.getenv("BENCH_THREADS", f"1,{os.cpu_count() or 1}").split(",")]
+    compute_types = os.getenv("BENCH_COMPUTE_TYPES", "int8,float32").split(",")
+    clips = _clips()
+
+    print(f"模型: {get_config().local_model}")
+    print(f"{'线程':>4} {'量化':>8} {'加载(s)':>8} {'预热(s)':>8} {'时长(s)':>8} {'PCM(ms)':>9} {'FLAC(ms)':>9} {'实时率':>7}")
+    for compute_type in compute_types:
+        for cpu_threads in threads:
+            processor = localWhisper.LocalWhisperProcessor(compute_type=compute_type, cpu_threads=cpu_threads)
+            for seconds, audio in clips.items():
+                pcm = _median_latency(processor, lambda: PcmBuffer(audio, SAMPLE_RATE))
+                flac = _median_latency(processor, lambda: AudioEncoder.encode(audio, SAMPLE_RATE, codec="flac"))
+                print(
+                    f"{cpu_threads:4d} {compute_type:>8} {processor.load_seconds:8.2f} {processor.warm_up_seconds:8.2f} "
+                    f"{seconds:8d} {pcm * 1000:9.0f} {flac * 1000:9.0f} {pcm / seconds:7.2f}"
+                )
+            del processor
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""控制界面的日志显示：高日志速率下界面线程的耗时
+
+子进程以极高速率写日志，分别用旧方式（界面轮询并读取 logs/app.log，无行数上限）
+和新方式（日志经本地 TCP 推送、按帧合并、视图限制行数）显示，报告界面线程
+处理日志的总耗时及占比、单次最长耗时、事件循环最长卡顿（5ms 心跳的最大间隔）、
+收到的行数以及日志视图的行数。新方式要求单次处理和卡顿都不超过 FRAME_BUDGET_MS，
+且视图行数不超过上限，不满足时以非零状态退出（旧方式的行仅作对比）。
+
+在无显示环境中自动使用 Qt 的 offscreen 平台：
+
+    python -m benchmarks.bench_log_stream
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+LINES = 50000
+RATES = (0, 20000)  # 每秒行数，0 表示不限速
+MAX_LINES = 2000
+FRAME_BUDGET_MS = 50
+IDLE_SECONDS = 1.0
+
+CHILD = """
+import sys, time
+from src.utils.logger import logger
+lines, rate = int(sys.argv[1]), float(sys.argv[2])
+start = time.perf_counter()
+for i in range(lines):
+    logger.info(f"第 {i} 行日志：正在调用 API... 模式 transcriptions，示例文本 w1 w2 w3")
+    if rate and i % 100 == 0:
+        time.sleep(max(start + i / rate - time.perf_counter(), 0))
+time.sleep(1.5)  # 等待发送线程发完
+"""
+
+
+class UiClock:
+    """累计界面线程中处理日志的耗时"""
+
+    def __init__(self):
+        self.total = 0.0
+        self.worst = 0.0
+        self.calls = 0
+
+    def measure(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.total += elapsed
+            self.worst = max(self.worst, elapsed)
+            self.calls += 1
+
+
+def _run(mode, rate, repo, workdir):
+    from PyQt5.QtCore import QFileSystemWatcher, QTimer
+    from PyQt5.QtWidgets import QApplication, QPlainTextEdit
+
+    import control_ui
+
+    app = QApplication.instance() or QApplication([])
+    clock = UiClock()
+    arrivals = {"count": 0}  # 收到数据的次数，用于判断日志是否已经全部到达
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([repo, os.environ.get("PYTHONPATH", "")]))
+    env.pop("LOG_STREAM_ADDR", None)
+
+    if mode == "stream":
+        class TimedControlUI(control_ui.ControlUI):
+            def receive_log(self):
+                arrivals["count"] += 1
+                clock.measure(super().receive_log)
+
+            def update_log_view(self):
+                clock.measure(super().update_log_view)
+
+        os.environ["LOG_VIEW_MAX_LINES"] = str(MAX_LINES)
+        window = TimedControlUI()
+        view = window.log_view
+        env["LOG_STREAM_ADDR"] = f"127.0.0.1:{window.log_server.serverPort()}"
+    else:
+        # 旧实现：文件变化通知 + 500ms 定时器，每次重新打开日志文件读取新增内容
+        window = None
+        view = QPlainTextEdit()
+        os.makedirs("logs", exist_ok=True)
+        open("logs/app.log", "w").close()
+        state = {"pos": 0}
+
+        def legacy_update():
+            try:
+                with open("logs/app.log", "r") as f:
+                    f.seek(state["pos"])
+                    new_content = f.read()
+                    state["pos"] = f.tell()
+                    if state["pos"] > os.path.getsize("logs/app.log"):
+                        state["pos"] = 0
+                        new_content = f.read()
+                    if new_content:
+                        view.appendPlainText(new_content)
+                        view.verticalScrollBar().setValue(view.verticalScrollBar().maximum())
+            except FileNotFoundError:
+                pass  # 轮转过程中文件短暂不存在
+
+        watcher = QFileSystemWatcher(["logs/app.log"])
+        watcher.fileChanged.connect(lambda: clock.measure(legacy_update))
+        timer = QTimer()
+        timer.timeout.connect(lambda: clock.measure(legacy_update))
+        timer.start(500)
+
+    # 心跳：测量事件循环被日志处理卡住的最长时间
+    beat = {"last": time.perf_counter(), "worst": 0.0}
+
+    def heartbeat():
+        now = time.perf_counter()
+        beat["worst"] = max(beat["worst"], now - beat["last"])
+        beat["last"] = now
+
+    pulse = QTimer()
+    pulse.timeout.connect(heartbeat)
+    pulse.start(5)
+
+    child = subprocess.Popen([sys.executable, "-c", CHILD, str(LINES), str(rate)], cwd=workdir, env=env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    progress = {"count": -1, "changed": time.perf_counter()}
+
+    def watchdog():
+        count = (arrivals["count"], view.blockCount())
+        if count != progress["count"]:
+            progress["count"], progress["changed"] = count, time.perf_counter()
+        if child.poll() is not None and time.perf_counter() - progress["changed"] > IDLE_SECONDS:
+            app.quit()
+
+    guard = QTimer()
+    guard.timeout.connect(watchdog)
+    guard.start(100)
+    beat["last"] = time.perf_counter()
+    started = time.perf_counter()
+    app.exec_()
+    duration = time.perf_counter() - started - IDLE_SECONDS
+
+    pulse.stop()
+    guard.stop()
+    blocks = view.blockCount()
+    received = window.log_buffer.received if window is not None else blocks - 1
+    if window is not None:
+        window.log_server.close()
+        window.status_socket.close()
+        window.deleteLater()
+    return clock, clock.total / duration, beat["worst"], received, blocks
+
+
+def main():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    repo = os.getcwd()
+    sys.path.insert(0, repo)
+    print(f"每次写入 {LINES} 行，视图上限 {MAX_LINES} 行，单帧预算 {FRAME_BUDGET_MS}ms")
+    print(f"{'方式':>4} {'速率(行/秒)':>10} {'界面耗时(ms)':>12} {'占比':>6} {'单次最长(ms)':>12} {'最长卡顿(ms)':>12} "
+          f"{'收到行数':>8} {'视图行数':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # 控制界面会清空当前目录下的 logs/app.log，不要动仓库里的日志
+        failures = []
+        try:
+            for mode in ("legacy", "stream"):
+                for rate in RATES:
+                    clock, duty, stall, received, blocks = _run(mode, rate, repo, workdir)
+                    ok = ""
+                    if mode == "stream":
+                        passed = (clock.worst * 1000 <= FRAME_BUDGET_MS and stall * 1000 <= FRAME_BUDGET_MS
+                                  and blocks <= MAX_LINES)
+                        ok = "✓" if passed else "✗"
+                        if not passed:
+                            failures.append(f"速率 {rate or '不限'}: 单次最长 {clock.worst * 1000:.1f}ms, "
+                                            f"最长卡顿 {stall * 1000:.1f}ms, 视图 {blocks} 行")
+                    print(f"{'旧' if mode == 'legacy' else '新':>4} {rate or '不限':>10} {clock.total * 1000:12.0f} {duty:6.0%} "
+                          f"{clock.worst * 1000:12.1f} {stall * 1000:12.1f} {received:8d} {blocks:8d}  {ok}")
+        finally:
+            os.chdir(repo)
+
+    if failures:
+        print("失败: " + "; ".join(failures))
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""预录缓冲：按住阈值期间说的话是否被保留
+
+虚拟麦克风先播放一段静音，随后"用户"在按下热键的同时开始说话；
+录音在按住 0.5 秒后才确认开始。分别在关闭与开启预录时识别录到的词，
+并统计从松开按键前录到的音频时长。开启预录时必须识别出全部词，
+关闭预录时应丢失开头的词（否则说明测试场景没有覆盖按住阈值期间的语音），不满足时以非零状态退出。
+
+    python -m benchmarks.bench_preroll
+"""
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+from .stub_server import decode_utterance, synth_utterance
+from .virtual_input import virtual_microphone
+
+SAMPLE_RATE = 48000
+LEAD_SECONDS = 0.5  # 按下热键前的静音
+THRESHOLD = 0.5  # 与 KeyboardManager.PRESS_DURATION_THRESHOLD 相同
+WORDS = [1, 2, 3, 4, 5, 6]
+
+
+def _dictate(preroll_seconds):
+    from src.audio import recorder as recorder_module
+    from src.utils.config import Config, set_config
+
+    os.environ["PREROLL_SECONDS"] = str(preroll_seconds)
+    set_config(Config.from_env())
+    speech = synth_utterance(WORDS, SAMPLE_RATE)
+    lead = np.zeros((int(LEAD_SECONDS * SAMPLE_RATE), 1), dtype=np.float32)
+    audio = np.concatenate([lead, speech])
+    with virtual_microphone(recorder_module.sd, audio, SAMPLE_RATE):
+        opened = time.perf_counter()
+        recorder = recorder_module.AudioRecorder()
+        recorder.min_record_duration = 0
+        time.sleep(max(LEAD_SECONDS - (time.perf_counter() - opened), 0))
+        recorder.arm()  # 按下热键，同时开始说话
+        time.sleep(THRESHOLD)
+        recorder.start_recording()  # 按住达到阈值，确认录音
+        time.sleep(len(speech) / SAMPLE_RATE - THRESHOLD + 0.3)
+        result = recorder.stop_recording()
+        recorder.close()
+
+    if not hasattr(result, "getvalue"):
+        return [], 0.0
+    data, rate = sf.read(io.BytesIO(result.getvalue()), dtype="float32")
+    return decode_utterance(data, rate), len(data) / rate
+
+
+def main():
+    os.environ.setdefault("DEVICE_CHECK_INTERVAL", "0")
+    os.environ.setdefault("VAD_ENABLED", "false")  # 保留完整时长，便于对比
+    print(f"期望识别: {WORDS}")
+    print(f"{'预录':>6} {'录音时长(s)':>11}  识别结果")
+    failures = []
+    for preroll in (0.0, 1.0):
+        words, seconds = _dictate(preroll)
+        ok = (words == WORDS) == (preroll > 0)
+        print(f"{preroll:5.1f}s {seconds:11.2f}  {words} {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append(f"预录 {preroll:g}秒: 识别结果 {words}")
+
+    if failures:
+        print("失败: " + "; ".join(failures))
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
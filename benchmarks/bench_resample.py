@@ -0,0 +1,100 @@
+"""重采样/混缩精度与速度
+
+精度：通带正弦的信噪比、阻带（会混叠的）正弦的衰减、逐块处理与一次性处理的差异（int16 LSB）、输出长度，
+16kHz 单声道 int16 输入原样输出；
+速度：逐块（10ms）处理的实时倍数。
+任何一项低于下面的门限时以非零状态退出。
+
+    python -m benchmarks.bench_resample
+"""
+import sys
+import time
+
+import numpy as np
+
+from src.audio.resampler import Resampler, resample
+
+OUT_RATE = 16000
+MIN_SNR_DB = 60.0  # 通带信噪比下限
+MAX_STOPBAND_DB = -40.0  # 阻带衰减上限
+MAX_BLOCK_DIFF = 1  # 逐块与一次性处理的最大差异（int16 LSB）
+MIN_SPEED = 10.0  # 逐块处理的最低实时倍数
+
+
+def _tone(freq, rate, seconds=1.0, channels=1):
+    t = np.arange(int(rate * seconds)) / rate
+    tone = (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+    return np.repeat(tone[:, None], channels, axis=1)
+
+
+def _snr_db(in_rate, freq):
+    out = resample(_tone(freq, in_rate), in_rate, OUT_RATE).astype(np.float64) / 32768
+    ref = 0.5 * np.sin(2 * np.pi * freq * np.arange(len(out)) / OUT_RATE)
+    core = slice(OUT_RATE // 10, -OUT_RATE // 10)  # 去掉首尾过渡
+    noise = out[core] - ref[core]
+    return 10 * np.log10(np.sum(ref[core] ** 2) / np.sum(noise ** 2))
+
+
+def _stopband_db(in_rate, freq):
+    out = resample(_tone(freq, in_rate), in_rate, OUT_RATE).astype(np.float64) / 32768
+    return 20 * np.log10(max(np.sqrt(np.mean(out ** 2)) / (0.5 / np.sqrt(2)), 1e-9))
+
+
+def _blockwise(audio, rate, block):
+    resampler = Resampler(rate, OUT_RATE)
+    parts = [resampler.process(audio[i:i + block]) for i in range(0, len(audio), block)]
+    return np.concatenate(parts + [resampler.flush()])
+
+
+def main():
+    failures = []
+    print(f"{'输入':>7} {'1kHz SNR':>9} {'6kHz SNR':>9} {'12kHz 衰减':>11} {'长度':>6} {'逐块误差':>8} {'实时倍数':>9}")
+    for rate in (16000, 22050, 44100, 48000):
+        snr_1k = _snr_db(rate, 1000)
+        snr_6k = _snr_db(rate, 6000)
+        stop = _stopband_db(rate, 12000) if rate > 24000 else float("nan")
+
+        stereo = _tone(440, rate, seconds=3.0, channels=2)
+        block = rate // 100
+        streamed = _blockwise(stereo, rate, block)
+        whole = resample(stereo, rate, OUT_RATE)
+        length_ok = len(streamed) == 3 * OUT_RATE
+        diff = int(np.abs(streamed.astype(np.int32) - whole).max())
+
+        audio = _tone(440, rate, seconds=10.0, channels=1)
+        resampler = Resampler(rate, OUT_RATE)
+        start = time.perf_counter()
+        for i in range(0, len(audio), block):
+            resampler.process(audio[i:i + block])
+        speed = 10.0 / (time.perf_counter() - start)
+
+        print(f"{rate:7d} {snr_1k:9.1f} {snr_6k:9.1f} {stop:11.1f} {'✓' if length_ok else '✗':>6} "
+              f"{diff:8d} {speed:8.0f}x")
+        if min(snr_1k, snr_6k) < MIN_SNR_DB:
+            failures.append(f"{rate}Hz: 通带信噪比 {min(snr_1k, snr_6k):.1f}dB 低于 {MIN_SNR_DB:g}dB")
+        if stop > MAX_STOPBAND_DB:  # nan 比较为 False，不需要抗混叠的采样率不检查
+            failures.append(f"{rate}Hz: 阻带衰减 {stop:.1f}dB 不足 {MAX_STOPBAND_DB:g}dB")
+        if not length_ok:
+            failures.append(f"{rate}Hz: 逐块输出 {len(streamed)} 个采样，应为 {3 * OUT_RATE}")
+        if diff > MAX_BLOCK_DIFF:
+            failures.append(f"{rate}Hz: 逐块与一次性处理相差 {diff} LSB")
+        if speed < MIN_SPEED:
+            failures.append(f"{rate}Hz: 实时倍数 {speed:.0f}x 低于 {MIN_SPEED:g}x")
+
+    # 16kHz 单声道 int16 不需要转换，逐块和一次性处理都应原样输出（含满幅值）
+    pcm = np.random.default_rng(0).integers(-32768, 32768, size=(OUT_RATE, 1)).astype(np.int16)
+    pcm[:2, 0] = (-32768, 32767)
+    identity = (np.array_equal(resample(pcm, OUT_RATE), pcm[:, 0])
+                and np.array_equal(_blockwise(pcm, OUT_RATE, OUT_RATE // 100), pcm[:, 0]))
+    print(f"16kHz int16 原样输出: {'✓' if identity else '✗'}")
+    if not identity:
+        failures.append("16kHz int16 输入未原样输出")
+
+    if failures:
+        print("失败: " + "; ".join(failures))
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
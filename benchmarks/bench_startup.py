@@ -0,0 +1,151 @@
+"""启动耗时：从启动到可以开始听写
+
+每种配置在新的子进程中依次执行 import main、创建转录处理器（registry.create_processor）
+和创建 VoiceAssistant（打开录音设备、键盘控制器），报告各步耗时与合计的就绪时间，
+并用 python -X importtime 统计各模块的导入耗时（含其依赖，嵌套导入计入最先导入它的模块）。
+"旧方式"一行在 import main 之前预先导入全部远程后端模块，对应按需加载之前的行为。
+
+不会发出任何网络请求，API 地址和密钥均为占位值：
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --configs siliconflow,groq --rounds 5 --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# 配置名: (SERVICE_PLATFORM, 额外环境变量, 是否预先导入全部后端)
+CONFIGS = {
+    "siliconflow": ("siliconflow", {}, False),
+    "siliconflow(旧方式)": ("siliconflow", {}, True),
+    "groq": ("groq", {"ADD_SYMBOL": "false", "OPTIMIZE_RESULT": "false"}, False),
+    "groq+llm": ("groq", {"ADD_SYMBOL": "true", "OPTIMIZE_RESULT": "true"}, False),
+    "local": ("local", {}, False),
+}
+STEPS = ("import", "processor", "assistant", "ready")
+
+BASE_ENV = {
+    "LOCAL_SENSEVOICE_URL": "http://127.0.0.1:9/v1/audio/transcriptions",
+    "TRANSLATE_API_URL": "http://127.0.0.1:9/v1/chat/completions",
+    "TRANSLATE_MODEL": "placeholder",
+    "GROQ_API_KEY": "placeholder",
+    "GROQ_BASE_URL": "http://127.0.0.1:9/v1",
+    "METRICS_PATH": "",
+    "CONVERT_TO_SIMPLIFIED": "false",
+    "HEDGE_PLATFORM": "",
+}
+
+CHILD = """
+import json, os, sys, time
+start = time.perf_counter()
+if os.environ.get("BENCH_EAGER"):
+    import src.transcription.whisper, src.transcription.senseVoiceSmall
+import main
+from src.transcription import registry
+imported = time.perf_counter()
+processor = registry.create_processor(os.environ["SERVICE_PLATFORM"])
+created = time.perf_counter()
+assistant = main.VoiceAssistant(processor)
+ready = time.perf_counter()
+print(json.dumps({"import": imported - start, "processor": created - imported,
+                  "assistant": ready - created, "ready": ready - start}))
+sys.stdout.flush()
+os._exit(0)  # 不等待录音设备与连接池的后台线程
+"""
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 的输出，返回 {模块: 累计耗时(秒)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        # 同一模块只会真正导入一次，取最大值即可
+        modules[name] = max(modules.get(name, 0), int(cumulative) / 1e6)
+    return modules
+
+
+def _run(name, repo):
+    service_platform, extra_env, eager = CONFIGS[name]
+    env = dict(os.environ, **BASE_ENV, **extra_env, SERVICE_PLATFORM=service_platform)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [repo, os.environ.get("PYTHONPATH")] if p)
+    if eager:
+        env["BENCH_EAGER"] = "1"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=repo, env=env,
+                            capture_output=True, text=True)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        error = result.stderr.strip().splitlines()
+        return None, None, error[-1] if error else f"退出码 {result.returncode}"
+    return json.loads(lines[-1]), parse_importtime(result.stderr), None
+
+
+def _top_modules(modules, top):
+    """项目模块列出耗时超过 1ms 的；第三方只列出顶层包中最慢的 top 个"""
+    own = {name: t for name, t in modules.items() if name == "main" or name.startswith("src.")}
+    packages = {name: t for name, t in modules.items() if "." not in name and name not in own}
+    own = {name: t for name, t in own.items() if t >= 0.001}
+    third_party = dict(sorted(packages.items(), key=lambda item: -item[1])[:top])
+    return own, third_party
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时")
+    parser.add_argument("--configs", default=",".join(CONFIGS), help=f"逗号分隔，可选 {', '.join(CONFIGS)}")
+    parser.add_argument("--rounds", type=int, default=3, help="每种配置启动的次数，取中位数")
+    parser.add_argument("--top", type=int, default=8, help="列出导入最慢的第三方包个数")
+    args = parser.parse_args()
+
+    repo = os.getcwd()
+    names = [name.strip() for name in args.configs.split(",") if name.strip()]
+    for name in names:
+        if name not in CONFIGS:
+            parser.error(f"未知配置: {name}")
+
+    summary, details = {}, {}
+    for name in names:
+        runs, imports = [], []
+        for _ in range(args.rounds):
+            timings, modules, error = _run(name, repo)
+            if error:
+                summary[name] = error
+                break
+            runs.append(timings)
+            imports.append(modules)
+        else:
+            summary[name] = {step: float(np.median([run[step] for run in runs])) for step in STEPS}
+            # 各模块取中位数；某次没有导入的模块记为 0
+            names_seen = set().union(*imports)
+            details[name] = {module: float(np.median([m.get(module, 0) for m in imports]))
+                             for module in names_seen}
+
+    print(f"每种配置启动 {args.rounds} 次，取中位数 (ms)")
+    print(f"{'配置':<20} {'import main':>12} {'创建处理器':>10} {'创建助手':>10} {'就绪':>10}")
+    for name in names:
+        result = summary[name]
+        if isinstance(result, str):
+            print(f"{name:<20} 启动失败: {result}")
+            continue
+        print(f"{name:<20} " + " ".join(f"{result[step] * 1000:{w}.0f}"
+                                        for step, w in zip(STEPS, (12, 10, 10, 10))))
+
+    for name in names:
+        if name not in details:
+            continue
+        own, third_party = _top_modules(details[name], args.top)
+        print(f"\n[{name}] 模块导入耗时（含依赖，ms）")
+        for module, seconds in sorted(own.items(), key=lambda item: -item[1]):
+            print(f"  {module:<40} {seconds * 1000:8.1f}")
+        print("  第三方包:")
+        for module, seconds in third_party.items():
+            print(f"  {module:<40} {seconds * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
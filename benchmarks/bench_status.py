@@ -0,0 +1,63 @@
+"""状态显示方式对按键注入的影响
+
+用假键盘驱动 KeyboardManager 完成一次完整听写（录音 → 转录 → 提交结果），
+对比把状态文本粘贴到输入框（field）与输入框外显示（terminal / socket）时
+注入的按键事件数、剪贴板写入次数和提交耗时；socket 方式同时校验监听方收到的状态。
+
+    python -m benchmarks.bench_status
+"""
+import json
+import os
+import socket
+import time
+
+from .fake_keyboard import fake_keyboard
+
+KEY_DELAY = 0.002
+TEXT = "好的，我明天上午把报告发给你"
+
+
+def _dictation(sink_spec):
+    from src.keyboard import listener as listener_module
+    from src.keyboard.inputState import InputState
+    from src.status import create_status_sink
+
+    with fake_keyboard(listener_module, key_delay=KEY_DELAY) as (controller, clipboard):
+        noop = lambda: None
+        keyboard = listener_module.KeyboardManager(noop, noop, noop, noop, noop)
+        keyboard.status_sink = create_status_sink(sink_spec, keyboard_manager=keyboard)
+        start = time.perf_counter()
+        keyboard.state = InputState.RECORDING
+        keyboard.state = InputState.PROCESSING
+        keyboard.type_text(TEXT)
+        elapsed = time.perf_counter() - start
+        keyboard.status_sink.close()
+        return len(controller.events), clipboard.copies, keyboard.total_saved_events, elapsed
+
+
+def main():
+    os.environ.setdefault("TRANSCRIPTIONS_BUTTON", "alt")
+    os.environ.setdefault("TRANSLATIONS_BUTTON", "shift")
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.settimeout(0.5)
+    os.environ["STATUS_SOCKET_ADDR"] = "127.0.0.1:%d" % listener.getsockname()[1]
+
+    print(f"{'显示方式':>8} {'按键事件':>8} {'剪贴板写入':>10} {'节省事件':>8} {'耗时(ms)':>9}")
+    for spec in ("field", "terminal", "socket"):
+        events, copies, saved, elapsed = _dictation(spec)
+        print(f"{spec:>8} {events:8d} {copies:10d} {saved:8d} {elapsed * 1000:9.1f}")
+
+    states = []
+    try:
+        while True:
+            states.append(json.loads(listener.recv(4096))["state"])
+    except socket.timeout:
+        pass
+    listener.close()
+    print(f"socket 监听方收到的状态: {' → '.join(states)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""流式分段转录 vs 整段上传：松开按键到拿到文本的延迟对比
+
+使用本地替身服务和虚拟麦克风，无需网络和录音设备。整段与流式的结果都必须与期望的词序列一致，
+流式的尾延迟（松开按键后只剩最后一个分段）不能超过 MAX_STREAM_LATENCY，否则以非零状态退出：
+
+    python -m benchmarks.bench_streaming
+"""
+import os
+import sys
+import time
+
+from .stub_server import StubServer, synth_utterance
+from .virtual_input import virtual_microphone
+
+SAMPLE_RATE = 16000
+SEGMENT_SECONDS = 2.0
+# 替身服务处理最后一个分段最多 0.15 + 0.15 × 2 秒，其余为停止录音、编码与拼接的余量；与录音时长无关
+MAX_STREAM_LATENCY = 0.8
+
+
+def _record_and_transcribe(recorder, processor, audio_seconds, streaming):
+    from src.transcription.streaming import StreamingTranscriber
+
+    recorder.stream_segment_seconds = SEGMENT_SECONDS if streaming else 0
+    stream = StreamingTranscriber(processor) if streaming else None
+    recorder.on_segment = stream.submit if stream else None
+
+    recorder.start_recording()
+    time.sleep(audio_seconds)
+    released = time.perf_counter()
+    audio = recorder.stop_recording()
+    text, error = processor.process_audio(audio, stream=stream)
+    assert error is None, error
+    return text, time.perf_counter() - released
+
+
+def main():
+    with StubServer(base_latency=0.15, realtime_factor=0.15) as server:
+        os.environ["LOCAL_SENSEVOICE_URL"] = f"{server.url}/v1/audio/transcriptions"
+        os.environ.setdefault("TRANSLATE_API_URL", f"{server.url}/v1/chat/completions")
+        os.environ.setdefault("TRANSLATE_MODEL", "stub")
+        os.environ.setdefault("WARM_STREAM", "false")  # 每次录音重新打开虚拟麦克风，从头播放测试音频
+
+        from src.audio import recorder as recorder_module
+        from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
+
+        processor = SenseVoiceSmallProcessor()
+        failures = []
+        print(f"{'时长(s)':>8} {'整段(s)':>8} {'流式(s)':>8}  拼接一致")
+        for n_words in (5, 10, 20):
+            words = [k % 10 for k in range(n_words)]
+            audio = synth_utterance(words, SAMPLE_RATE)
+            seconds = len(audio) / SAMPLE_RATE
+            expected = " ".join(f"w{k}" for k in words)
+            with virtual_microphone(recorder_module.sd, audio, SAMPLE_RATE):
+                recorder = recorder_module.AudioRecorder()
+                batch_text, batch_latency = _record_and_transcribe(recorder, processor, seconds, streaming=False)
+                stream_text, stream_latency = _record_and_transcribe(recorder, processor, seconds, streaming=True)
+            ok = batch_text == expected and stream_text == expected
+            print(f"{seconds:8.1f} {batch_latency:8.2f} {stream_latency:8.2f}  {'✓' if ok else '✗ ' + stream_text}")
+            if not ok:
+                failures.append(f"{seconds:g}秒: 拼接结果不一致")
+            if stream_latency > MAX_STREAM_LATENCY:
+                failures.append(f"{seconds:g}秒: 流式尾延迟 {stream_latency:.2f}秒，超过 {MAX_STREAM_LATENCY}秒")
+
+    if failures:
+        print("失败: " + "; ".join(failures))
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
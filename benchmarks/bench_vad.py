@@ -0,0 +1,79 @@
+"""语音活动检测（VAD）裁剪效果与速度
+
+合成带开头/结尾静音、长停顿和底噪的"语音"，检查裁剪掉的时长、
+词序列是否完整保留、全静音片段是否被识别为无语音，以及处理速度。
+任何一个场景的裁剪时长、语音检测或词序列与预期不符，或速度低于 MIN_SPEED 时以非零状态退出。
+
+    python -m benchmarks.bench_vad
+"""
+import sys
+import time
+
+import numpy as np
+
+from src.audio.vad import VoiceActivityGate
+from .stub_server import decode_utterance, synth_utterance
+
+SAMPLE_RATE = 16000
+BLOCK = 160
+MIN_SPEED = 50.0  # 最低实时倍数
+
+
+def _silence(seconds, rng, level=0.002):
+    return rng.normal(0, level, (int(seconds * SAMPLE_RATE), 1)).astype(np.float32)
+
+
+def _to_int16(audio):
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+def _gate(audio):
+    gate = VoiceActivityGate(SAMPLE_RATE)
+    parts = [gate.process(audio[i:i + BLOCK]) for i in range(0, len(audio), BLOCK)]
+    parts.append(gate.flush())
+    return np.concatenate(parts), gate
+
+
+def main():
+    rng = np.random.default_rng(0)
+    words = [1, 2, 3, 4]
+    # 场景: (音频, 至少裁剪的秒数, 应检测到语音)；静音段之间保留停顿上限和首尾余量，不要求全部裁掉
+    cases = {
+        "紧凑语音": (np.concatenate([_silence(0.1, rng), synth_utterance(words, SAMPLE_RATE)]), 0.0, True),
+        "首尾静音": (np.concatenate([_silence(1.5, rng), synth_utterance(words, SAMPLE_RATE), _silence(1.0, rng)]),
+                     1.5, True),
+        "长停顿": (np.concatenate([_silence(0.5, rng), synth_utterance(words[:2], SAMPLE_RATE), _silence(3.0, rng),
+                                  synth_utterance(words[2:], SAMPLE_RATE), _silence(0.5, rng)]), 2.0, True),
+        "全静音": (_silence(4.0, rng), 4.0, False),
+    }
+    failures = []
+    print(f"{'场景':>6} {'原时长(s)':>9} {'裁剪(s)':>8} {'检测到语音':>9} {'词序列':>6}")
+    for name, (audio, min_removed, has_speech) in cases.items():
+        audio = _to_int16(audio)
+        kept, gate = _gate(audio)
+        decoded = decode_utterance(kept.astype(np.float32) / 32768, SAMPLE_RATE) if len(kept) else []
+        expected = words if has_speech else []
+        ok = (gate.removed_seconds >= min_removed - 0.01 and gate.speech_detected == has_speech
+              and decoded == expected)
+        print(f"{name:>6} {len(audio) / SAMPLE_RATE:9.1f} {gate.removed_seconds:8.2f} "
+              f"{'是' if gate.speech_detected else '否':>9} {'✓' if decoded == expected else '✗ ' + str(decoded):>6}"
+              f"  {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append(name)
+
+    audio = _to_int16(np.concatenate([cases["长停顿"][0]] * 10))
+    start = time.perf_counter()
+    _gate(audio)
+    speed = len(audio) / SAMPLE_RATE / (time.perf_counter() - start)
+    print(f"速度: {speed:.0f}x 实时（{BLOCK} 样本/块）")
+    if speed < MIN_SPEED:
+        failures.append(f"速度 {speed:.0f}x 低于 {MIN_SPEED:g}x")
+
+    if failures:
+        print(f"失败: {', '.join(failures)}")
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""按住检测的 CPU 唤醒次数：10ms 轮询线程与定时器服务对比
+
+用假键盘驱动 KeyboardManager，分别在空闲和按住热键（超过阈值开始录音）两种情况下
+统计一段时间内进程的主动上下文切换次数（每次线程休眠后被唤醒计一次）和 CPU 时间。
+
+    python -m benchmarks.bench_wakeups
+"""
+import os
+import resource
+import threading
+import time
+
+from .fake_keyboard import fake_keyboard
+
+SECONDS = 2.0
+
+
+def legacy_start_duration_check(keyboard):
+    """旧实现：按住期间每 10ms 轮询一次是否达到阈值"""
+    from src.keyboard.inputState import InputState
+
+    if keyboard.is_checking_duration:
+        return
+
+    def check_duration():
+        while keyboard.is_checking_duration and keyboard.option_pressed:
+            if (not keyboard.has_triggered and keyboard.option_press_time and
+                    time.time() - keyboard.option_press_time >= keyboard.PRESS_DURATION_THRESHOLD):
+                if keyboard.state.can_start_recording:
+                    keyboard.state = InputState.RECORDING
+                    keyboard.has_triggered = True
+            time.sleep(0.01)
+
+    keyboard.is_checking_duration = True
+    threading.Thread(target=check_duration, daemon=True).start()
+
+
+def _measure(held, legacy):
+    from pynput.keyboard import Key
+
+    from src.keyboard import listener as listener_module
+    from src.keyboard.inputState import InputState
+
+    with fake_keyboard(listener_module):
+        noop = lambda: None
+        keyboard = listener_module.KeyboardManager(noop, noop, noop, noop, noop)
+        if legacy:
+            keyboard.start_duration_check = lambda: legacy_start_duration_check(keyboard)
+            keyboard._cancel_duration_check = lambda: setattr(keyboard, "is_checking_duration", False)
+
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        if held:
+            keyboard.on_press(Key.alt)
+        time.sleep(SECONDS)
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        triggered = keyboard.state == InputState.RECORDING
+        if held:
+            keyboard.on_release(Key.alt)
+        keyboard.reset_state()
+
+    wakeups = after.ru_nvcsw - before.ru_nvcsw
+    cpu = (after.ru_utime + after.ru_stime) - (before.ru_utime + before.ru_stime)
+    return wakeups, cpu, triggered
+
+
+def main():
+    os.environ.setdefault("TRANSCRIPTIONS_BUTTON", "alt")
+    os.environ.setdefault("TRANSLATIONS_BUTTON", "shift")
+    os.environ["STATUS_SINK"] = "none"
+
+    print(f"{'实现':>6} {'场景':>4} {'唤醒次数':>8} {'CPU(ms)':>8}  触发录音")
+    for legacy in (True, False):
+        for held in (False, True):
+            wakeups, cpu, triggered = _measure(held, legacy)
+            name = "轮询" if legacy else "定时器"
+            scene = "按住" if held else "空闲"
+            print(f"{name:>6} {scene:>4} {wakeups:8d} {cpu * 1000:8.1f}  {'是' if triggered else '否'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""开始录音的延迟：每次打开输入流与常驻输入流对比
+
+虚拟麦克风模拟 80ms 的输入流打开耗时（PortAudio 打开设备通常需要数十到数百毫秒），
+连续录音多次，测量 start_recording 调用本身的耗时、从开始录音到收到首个采样的耗时，
+以及开始录音时查询设备列表的次数。
+
+    python -m benchmarks.bench_warm_start
+"""
+import os
+import time
+
+import numpy as np
+
+from .stub_server import synth_utterance
+from .virtual_input import virtual_microphone
+
+SAMPLE_RATE = 48000
+OPEN_LATENCY = 0.08
+ROUNDS = 5
+
+
+def _run(warm):
+    from src.audio import recorder as recorder_module
+    from src.utils.config import Config, set_config
+
+    os.environ["WARM_STREAM"] = "true" if warm else "false"
+    set_config(Config.from_env())
+    audio = synth_utterance(list(range(20)), SAMPLE_RATE)
+    with virtual_microphone(recorder_module.sd, audio, SAMPLE_RATE, open_latency=OPEN_LATENCY):
+        recorder = recorder_module.AudioRecorder()
+        recorder.min_record_duration = 0
+
+        queries = []
+        query_devices = recorder_module.sd.query_devices
+        recorder_module.sd.query_devices = lambda *a, **k: queries.append(1) or query_devices(*a, **k)
+
+        call_times, first_sample = [], []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            recorder.start_recording()
+            call_times.append(time.perf_counter() - start)
+            time.sleep(0.3)
+            recorder.stop_recording()
+            first_sample.append(recorder.start_latency)
+        recorder_module.sd.query_devices = query_devices
+        recorder.close()
+    return np.median(call_times), np.median(first_sample), len(queries)
+
+
+def main():
+    os.environ.setdefault("DEVICE_CHECK_INTERVAL", "0")
+    print(f"{'输入流':>6} {'start_recording(ms)':>20} {'首个采样(ms)':>12} {'设备查询次数':>12}")
+    for warm in (False, True):
+        call, first, queries = _run(warm)
+        print(f"{'常驻' if warm else '每次打开':>6} {call * 1000:20.1f} {first * 1000:12.1f} {queries:12d}")
+
+
+if __name__ == "__main__":
+    main()
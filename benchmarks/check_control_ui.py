@@ -0,0 +1,179 @@
+"""检查控制界面：主程序繁忙或无响应时界面不卡顿，修改 .env 只触发一次重新加载
+
+替身主程序是进程内的控制端口（ControlServer），命令处理可以人为延迟；主程序进程用一个
+sleep 子进程代替。用 5ms 的心跳定时器测量界面事件循环的最长卡顿：
+    恢复 - 主程序处理 resume 需要 0.5 秒，界面不等待回复
+    暂停 - 控制端口接受连接但从不回复，暂停失败后结束主程序并回收进程，界面不等待
+    修改 .env - 保存设置后界面不再发送 reload 命令（运行中的主程序由自身的 .env 监控重新加载）
+    拒绝     - 主程序回复 {"ok": false}，界面不能显示为已恢复/已暂停
+任何一项失败时以非零状态退出。在无显示环境中自动使用 Qt 的 offscreen 平台：
+
+    python -m benchmarks.check_control_ui
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BUSY_SECONDS = 0.5  # 小于控制命令的超时（1 秒），超时会被当作主程序无响应而重启
+MAX_STALL = 0.1  # 允许的最长卡顿（秒）
+
+
+def _free_addr():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return "127.0.0.1:%d" % sock.getsockname()[1]
+
+
+def _sleeper():
+    return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+
+
+class Heartbeat:
+    """5ms 心跳，记录两次心跳之间的最长间隔"""
+
+    def __init__(self):
+        from PyQt5.QtCore import QTimer
+
+        self.worst = 0.0
+        self.last = time.perf_counter()
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._beat)
+        self.timer.start(5)
+
+    def _beat(self):
+        now = time.perf_counter()
+        self.worst = max(self.worst, now - self.last)
+        self.last = now
+
+    def reset(self):
+        self.worst, self.last = 0.0, time.perf_counter()
+
+
+def _spin(app, until, timeout):
+    """运行事件循环直到 until() 为真或超时，返回 until() 的结果"""
+    from PyQt5.QtCore import QEventLoop
+
+    deadline = time.perf_counter() + timeout
+    while not until() and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+        time.sleep(0.001)
+    return until()
+
+
+def main():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    repo = os.getcwd()
+    sys.path.insert(0, repo)
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)  # 控制界面会清空 logs/app.log 并监控当前目录下的 .env
+    with open(".env", "w") as f:
+        f.write("SILICONFLOW_API_KEY=sk-old\n")
+    os.environ["STATUS_SOCKET_ADDR"] = _free_addr()
+    os.environ["CONTROL_SOCKET_ADDR"] = _free_addr()
+
+    from dotenv import load_dotenv
+    from PyQt5.QtWidgets import QApplication
+
+    import control_ui
+    from src.control import ControlServer
+
+    # 不带路径的 load_dotenv 会找 control_ui.py 旁边的 .env，这里改为读取临时目录中的
+    control_ui.load_dotenv = lambda override=False: load_dotenv(".env", override=override)
+    app = QApplication.instance() or QApplication([])
+    window = control_ui.ControlUI()
+    beat = Heartbeat()
+    failures = []
+    received = []
+
+    refuse = []  # 非空时 resume/pause 抛出异常，控制端口回复 {"ok": false}
+
+    def busy_resume():
+        received.append("resume")
+        if refuse:
+            raise RuntimeError(refuse[0])
+        time.sleep(BUSY_SECONDS)
+        return {}
+
+    def pause():
+        received.append("pause")
+        if refuse:
+            raise RuntimeError(refuse[0])
+        return {}
+
+    server = ControlServer(window.control_addr, {
+        "resume": busy_resume,
+        "pause": pause,
+        "reload": lambda: received.append("reload") or {},
+    })
+    try:
+        # 恢复：主程序繁忙
+        window.process = _sleeper()
+        beat.reset()
+        window.start_main()
+        clicked = beat.worst
+        resumed = _spin(app, lambda: window.status_label.text() == "空闲", BUSY_SECONDS + 2)
+        ok = resumed and beat.worst < MAX_STALL
+        print(f"恢复（主程序繁忙 {BUSY_SECONDS:g}秒）: 点击耗时 {clicked * 1000:.0f}ms, "
+              f"最长卡顿 {beat.worst * 1000:.0f}ms, 已恢复 {resumed}  {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append("恢复")
+
+        # 修改 .env：界面只刷新显示，不发送 reload
+        window.api_key_input.setText("sk-new")
+        window.save_settings()
+        _spin(app, lambda: False, 0.5)
+        ok = "reload" not in received and window.api_key == "sk-new"
+        print(f"保存设置: 发送 reload {received.count('reload')} 次  {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append("保存设置")
+
+        # 拒绝：主程序回复失败时界面保持原来的状态
+        _spin(app, lambda: window.status_label.text() == "空闲", 1)
+        refuse.append("正在重新加载")
+        window.stop_main()
+        pause_kept = _spin(app, lambda: window.status_label.text() == "暂停失败", 2) and window.stop_btn.isEnabled()
+        refuse.clear()
+        pauses = received.count("pause")
+        window.stop_main()
+        _spin(app, lambda: received.count("pause") > pauses, 2)
+        refuse.append("正在重新加载")
+        window.start_main()
+        resume_kept = _spin(app, lambda: window.status_label.text() == "恢复失败", 2) and window.start_btn.isEnabled()
+        refuse.clear()
+        ok = pause_kept and resume_kept and window.process is not None
+        print(f"拒绝: 暂停失败后仍在运行 {pause_kept}, 恢复失败后仍为暂停 {resume_kept}  {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append("拒绝")
+
+        # 暂停：控制端口不应答
+        server.close()
+        with socket.create_server(("127.0.0.1", 0)) as silent:
+            window.control_addr = "127.0.0.1:%d" % silent.getsockname()[1]
+            process = window.process
+            beat.reset()
+            window.stop_main()
+            clicked = beat.worst
+            reaped = process is not None and _spin(app, lambda: process.poll() is not None and window._exiting is None, 10)
+        ok = reaped and window.process is None and beat.worst < MAX_STALL
+        print(f"暂停（主程序无响应）: 点击耗时 {clicked * 1000:.0f}ms, 最长卡顿 {beat.worst * 1000:.0f}ms, "
+              f"进程已回收 {reaped}  {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append("暂停")
+            if process is not None and process.poll() is None:
+                process.kill()
+    finally:
+        server.close()
+        window.close()
+        os.chdir(repo)
+
+    if failures:
+        print(f"失败: {', '.join(failures)}")
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
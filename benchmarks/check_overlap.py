@@ -0,0 +1,158 @@
+"""检查重叠听写：上一次听写的结果在下一次录音期间返回时，不能打断正在进行的录音
+
+转录在流水线工作线程中进行，上一次转录尚未完成时就可以开始新的录音。
+上一次听写的结果、错误或重置如果在新录音期间到达，状态必须保持为录音中，
+松开热键时仍要停止录音。分两部分检查，任何一项失败时以非零状态退出：
+    键盘管理器 - 用回调记录开始/停止，逐一投递过期的文本、流式文本、错误、警告和重置
+    端到端     - 虚拟麦克风 + 慢速假后端驱动 VoiceAssistant，上一次的结果（或异常）
+                 在第二次录音期间返回，检查第二次录音被正常停止并交给后端
+
+    python -m benchmarks.check_overlap
+"""
+import os
+import sys
+import threading
+import time
+
+from .fake_keyboard import fake_keyboard
+from .stub_server import synth_utterance
+from .virtual_input import virtual_microphone
+
+SAMPLE_RATE = 16000
+BACKEND_SECONDS = 1.0
+
+
+def _stale_deliveries(keyboard, dictation):
+    """(说明, 投递上一次听写结果的函数)"""
+    return [
+        ("文本", lambda: keyboard.type_text("上一次的结果", dictation=dictation)),
+        ("流式文本", lambda: keyboard.type_text(iter(["上一次", "的结果"]), dictation=dictation)),
+        ("错误", lambda: keyboard.type_text(None, "❌ 上一次出错", dictation=dictation)),
+        ("空结果", lambda: keyboard.type_text("", dictation=dictation)),
+        ("流水线异常", lambda: keyboard.show_error("❌ 流水线异常", dictation)),
+        ("重置", lambda: keyboard.reset_state(dictation)),
+    ]
+
+
+def _hold(keyboard, key):
+    """按下热键并立即达到按住阈值（不等待定时器）"""
+    keyboard.on_press(key)
+    keyboard._on_hold_threshold()
+
+
+def check_keyboard_manager():
+    from pynput.keyboard import Key
+
+    from src.keyboard import listener as listener_module
+    from src.keyboard.inputState import InputState
+
+    failures = []
+    with fake_keyboard(listener_module):
+        for label, _ in _stale_deliveries(None, None):
+            calls = []
+            keyboard = listener_module.KeyboardManager(
+                on_record_start=lambda: calls.append("start"),
+                on_record_stop=lambda: calls.append("stop"),
+                on_translate_start=lambda: calls.append("translate_start"),
+                on_translate_stop=lambda: calls.append("translate_stop"),
+                on_reset_state=lambda: None,
+            )
+            deliver = dict(_stale_deliveries(keyboard, keyboard.dictation_id + 1))[label]
+
+            _hold(keyboard, Key.alt)
+            keyboard.on_release(Key.alt)  # 第一次听写进入处理
+            _hold(keyboard, Key.alt)  # 第二次听写开始录音
+            deliver()  # 第一次听写的结果此时才到达
+            state_during = keyboard.state
+            keyboard.on_release(Key.alt)
+            keyboard.type_text("本次结果", dictation=keyboard.dictation_id)
+
+            ok = (calls == ["start", "stop", "start", "stop"] and state_during == InputState.RECORDING
+                  and keyboard.state == InputState.IDLE)
+            print(f"  {label:<8} 录音中状态 {state_during.name:<10} 回调 {calls}  {'✓' if ok else '✗'}")
+            if not ok:
+                failures.append(f"键盘管理器/{label}")
+    return failures
+
+
+class SlowProcessor:
+    """假转录后端：第一次调用慢速返回 first（文本或异常），之后立即返回"""
+
+    def __init__(self, first):
+        self.first = first
+        self.calls = 0
+        self.done = threading.Event()
+
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt="", stream=None):
+        self.calls += 1
+        if audio_buffer is not None:
+            audio_buffer.close()
+        if self.calls == 1:
+            time.sleep(BACKEND_SECONDS)
+            if isinstance(self.first, Exception):
+                raise self.first
+            return self.first
+        self.done.set()
+        return "第二次的结果", None
+
+
+def check_assistant():
+    from pynput.keyboard import Key
+
+    import main
+    from src.audio import recorder as recorder_module
+    from src.keyboard import listener as listener_module
+    from src.keyboard.inputState import InputState
+
+    failures = []
+    audio = synth_utterance(list(range(30)), SAMPLE_RATE)
+    cases = [
+        ("文本", ("第一次的结果", None)),
+        ("错误", (None, "❌ 第一次出错")),
+        ("异常", RuntimeError("第一次异常")),
+    ]
+    for label, first in cases:
+        with virtual_microphone(recorder_module.sd, audio, SAMPLE_RATE), fake_keyboard(listener_module):
+            processor = SlowProcessor(first)
+            assistant = main.VoiceAssistant(processor)
+            keyboard = assistant.keyboard_manager
+            try:
+                _hold(keyboard, Key.alt)
+                time.sleep(1.2)
+                keyboard.on_release(Key.alt)
+                _hold(keyboard, Key.alt)
+                time.sleep(BACKEND_SECONDS + 0.5)  # 第一次的结果在第二次录音期间返回
+                state_during = keyboard.state
+                keyboard.on_release(Key.alt)
+                finished = processor.done.wait(5)
+                assistant.capture_engine.submit(time.perf_counter).result()
+                recording = assistant.audio_recorder.recording
+            finally:
+                assistant.close()
+        ok = state_during == InputState.RECORDING and finished and not recording
+        print(f"  {label:<8} 录音中状态 {state_during.name:<10} 第二次已转录 {finished!s:<5} "
+              f"录音器已停止 {not recording!s:<5}  {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append(f"端到端/{label}")
+    return failures
+
+
+def main():
+    os.environ.setdefault("TRANSCRIPTIONS_BUTTON", "alt")
+    os.environ.setdefault("TRANSLATIONS_BUTTON", "shift")
+    os.environ.setdefault("STATUS_SINK", "none")
+    os.environ.setdefault("DEVICE_CHECK_INTERVAL", "0")
+    os.environ.setdefault("METRICS_PATH", "")
+
+    print("键盘管理器：上一次听写的结果在第二次录音期间到达")
+    failures = check_keyboard_manager()
+    print("端到端：")
+    failures += check_assistant()
+    if failures:
+        print(f"失败: {', '.join(failures)}")
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""反复超时后检查调用耗时是否受截止时间限制、线程与 socket 是否堆积
+
+替身服务在子进程中运行，被测进程反复发起请求并超时。分两种服务端：
+    迟迟不响应   - 以远超截止时间的延迟响应，对比旧的"每次调用起一个线程"的超时装饰器
+    缓慢返回数据 - 立即返回响应头，之后逐字节缓慢发送响应体，每次读取都不会触发读取超时
+Deadline 的每次调用都必须在 API_TIMEOUT 加少量余量内以超时结束，且线程数、socket 数
+不随轮次增加；任何一项不满足时以非零状态退出（旧装饰器一行仅作对比）。
+
+    python -m benchmarks.check_timeouts
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+from .stub_server import synth_utterance
+
+ROUNDS = 20
+API_TIMEOUT = 0.3
+SERVER_LATENCY = 3.0
+DRIP_INTERVAL = 0.05  # 每字节间隔，整个响应体需要 1 秒以上
+SLACK = 0.15  # 允许超出截止时间的余量（秒）
+
+
+def _open_sockets():
+    """当前进程打开的 socket 数（仅 Linux/macOS 可用的 /dev/fd 统计）"""
+    fd_dir = "/proc/self/fd" if os.path.isdir("/proc/self/fd") else "/dev/fd"
+    count = 0
+    for fd in os.listdir(fd_dir):
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).startswith("socket:"):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def _legacy_timeout(seconds, func):
+    """旧实现：单独起线程执行，超时后放弃该线程"""
+    result, done = [None], threading.Event()
+
+    def target():
+        try:
+            result[0] = func()
+        except Exception:
+            pass
+        finally:
+            done.set()
+
+    threading.Thread(target=target, daemon=True).start()
+    if not done.wait(seconds):
+        raise TimeoutError
+
+
+def _start_server(*args):
+    """在子进程中启动替身服务，返回 (进程, 转录接口地址)"""
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.stub_server", *args],
+                              stdout=subprocess.PIPE, text=True)
+    return server, server.stdout.readline().strip() + "/v1/audio/transcriptions"
+
+
+def _check_deadline(label, url, audio):
+    """用 Deadline 反复请求 url，返回失败项列表"""
+    from src.audio.encoder import AudioEncoder
+    from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
+
+    processor = SenseVoiceSmallProcessor(url=url)
+    base_threads, base_sockets = threading.active_count(), _open_sockets()
+    errors, slowest = 0, 0.0
+    for i in range(ROUNDS):
+        start = time.perf_counter()
+        text, error = processor.process_audio(AudioEncoder.encode(audio, 16000))
+        slowest = max(slowest, time.perf_counter() - start)
+        errors += error is not None
+    threads, sockets = threading.active_count() - base_threads, _open_sockets() - base_sockets
+    print(f"{label:>10} {ROUNDS:5d} {threads:+5d} {sockets:+7d}  超时 {errors}/{ROUNDS}, 最长 {slowest:.2f}秒")
+
+    failures = []
+    if errors != ROUNDS:
+        failures.append(f"{label}: 只有 {errors}/{ROUNDS} 次超时")
+    if slowest > API_TIMEOUT + SLACK:
+        failures.append(f"{label}: 最长耗时 {slowest:.2f}秒，超过截止时间 {API_TIMEOUT}秒")
+    if threads > 0 or sockets > 0:
+        failures.append(f"{label}: 线程 {threads:+d}、socket {sockets:+d} 在反复超时后堆积")
+    return failures
+
+
+def main():
+    slow_server, slow_url = _start_server("--latency", str(SERVER_LATENCY))
+    drip_server, drip_url = _start_server("--latency", "0", "--realtime-factor", "0",
+                                          "--drip-interval", str(DRIP_INTERVAL))
+    os.environ["API_TIMEOUT"] = str(API_TIMEOUT)
+    os.environ.setdefault("TRANSLATE_API_URL", slow_url)
+    os.environ.setdefault("TRANSLATE_MODEL", "stub")
+
+    from src.audio.encoder import AudioEncoder
+
+    failures = []
+    try:
+        audio = synth_utterance([1, 2, 3])
+        print(f"{'实现':>10} {'轮次':>5} {'线程':>5} {'socket':>7}")
+
+        client = httpx.Client()
+        base_threads, base_sockets = threading.active_count(), _open_sockets()
+        for i in range(ROUNDS):
+            buffer = AudioEncoder.encode(audio, 16000)
+            try:
+                _legacy_timeout(API_TIMEOUT, lambda: client.post(slow_url, files={"file": ("a.flac", buffer)},
+                                                                 timeout=None))
+            except TimeoutError:
+                pass
+        print(f"{'旧装饰器':>10} {ROUNDS:5d} {threading.active_count() - base_threads:+5d} "
+              f"{_open_sockets() - base_sockets:+7d}")
+
+        time.sleep(SERVER_LATENCY + 0.5)  # 等旧实现遗留的线程自行结束，再统计新实现
+        client.close()
+        failures += _check_deadline("Deadline", slow_url, audio)
+        failures += _check_deadline("缓慢返回", drip_url, audio)
+    finally:
+        for server in (slow_server, drip_server):
+            server.terminate()
+            server.wait()
+
+    if failures:
+        print("失败: " + "; ".join(failures))
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import time
+from contextlib import contextmanager
+
+
+class FakeController:
+    """模拟 pynput Controller，记录所有合成的按键事件
+
+    Args:
+        key_delay: 每个按键事件模拟的系统耗时（秒）
+    """
+
+    def __init__(self, key_delay=0.0, clipboard=None):
+        self.key_delay = key_delay
+        self.clipboard = clipboard
+        self.events = []
+        self.typed = []  # 通过 type() 直接输入的文本
+        self.entered = []  # 输入框依次收到的文本：直接输入的和（按住修饰键按 v）粘贴的
+        self._held = set()
+
+    def press(self, key):
+        self.events.append(("press", key, time.perf_counter()))
+        if key == "v" and self._held and self.clipboard is not None:
+            self.entered.append(self.clipboard.text)
+        if not isinstance(key, str):
+            self._held.add(key)
+        if self.key_delay:
+            time.sleep(self.key_delay)
+
+    def release(self, key):
+        self.events.append(("release", key, time.perf_counter()))
+        self._held.discard(key)
+        if self.key_delay:
+            time.sleep(self.key_delay)
+
+    @contextmanager
+    def pressed(self, *keys):
+        for key in keys:
+            self.press(key)
+        try:
+            yield
+        finally:
+            for key in reversed(keys):
+                self.release(key)
+
+    def type(self, text):
+        self.typed.append(text)
+        self.entered.append(text)
+        for char in text:
+            self.press(char)
+            self.release(char)
+
+
+class FakeClipboard:
+    """内存剪贴板，替代 pyperclip"""
+
+    def __init__(self, text=""):
+        self.text = text
+        self.copies = 0
+
+    def copy(self, text):
+        self.text = text
+        self.copies += 1
+
+    def paste(self):
+        return self.text
+
+
+@contextmanager
+def fake_keyboard(listener_module, key_delay=0.0, clipboard_text="原始剪贴板"):
+    """把 KeyboardManager 使用的 Controller 和 pyperclip 替换为假实现
+
+    需在构造 KeyboardManager 之前进入，返回 (controller, clipboard)。
+    """
+    clipboard = FakeClipboard(clipboard_text)
+    controller = FakeController(key_delay, clipboard)
+    original = listener_module.Controller, listener_module.pyperclip
+    listener_module.Controller = lambda: controller
+    listener_module.pyperclip = clipboard
+    try:
+        yield controller, clipboard
+    finally:
+        listener_module.Controller, listener_module.pyperclip = original
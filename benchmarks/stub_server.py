@@ -0,0 +1,265 @@
+import io
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import soundfile as sf
+
+# 合成语音的"词表"：第 k 个词是频率为 BASE_FREQ + k * FREQ_STEP 的正弦音
+BASE_FREQ = 200
+FREQ_STEP = 100
+WORD_SECONDS = 0.4
+GAP_SECONDS = 0.2
+
+
+def synth_utterance(words, sample_rate=16000, word_seconds=WORD_SECONDS, gap_seconds=GAP_SECONDS):
+    """合成一段由正弦音组成的"语音"，每个词之间插入静音"""
+    t = np.arange(int(word_seconds * sample_rate)) / sample_rate
+    gap = np.zeros(int(gap_seconds * sample_rate), dtype=np.float32)
+    pieces = []
+    for k in words:
+        tone = 0.3 * np.sin(2 * np.pi * (BASE_FREQ + k * FREQ_STEP) * t)
+        pieces.append(tone.astype(np.float32))
+        pieces.append(gap)
+    return np.concatenate(pieces).reshape(-1, 1)
+
+
+def decode_utterance(audio, sample_rate):
+    """把合成语音"识别"回词序列：按能量找出发声段，用主频还原词编号"""
+    audio = np.asarray(audio, dtype=np.float32).reshape(len(audio), -1).mean(axis=1)
+    window = int(sample_rate * 0.02)
+    n_windows = len(audio) // window
+    if n_windows == 0:
+        return []
+    energy = np.square(audio[:n_windows * window]).reshape(n_windows, window).mean(axis=1)
+    voiced = energy > 1e-4
+    words = []
+    start = None
+    for i, v in enumerate(np.append(voiced, False)):
+        if v and start is None:
+            start = i
+        elif not v and start is not None:
+            chunk = audio[start * window:i * window]
+            if len(chunk) >= 4 * window:  # 忽略被切分点截下的零碎片段
+                spectrum = np.abs(np.fft.rfft(chunk))
+                freq = np.argmax(spectrum) * sample_rate / len(chunk)
+                words.append(int(round((freq - BASE_FREQ) / FREQ_STEP)))
+            start = None
+    return words
+
+
+def _parse_multipart(body, content_type):
+    """极简 multipart/form-data 解析，返回 {字段名: 字节}"""
+    boundary = re.search(r'boundary="?([^";]+)"?', content_type).group(1).encode()
+    fields = {}
+    for part in body.split(b"--" + boundary):
+        if b"\r\n\r\n" not in part:
+            continue
+        header, _, value = part.partition(b"\r\n\r\n")
+        match = re.search(rb'name="([^"]+)"', header)
+        if match:
+            fields[match.group(1).decode()] = value[:-2] if value.endswith(b"\r\n") else value
+    return fields
+
+
+class StubServer:
+    """本地替身服务，模拟 SenseVoice / OpenAI 兼容的音频转录与对话补全接口
+
+    Args:
+        base_latency: 每个请求的固定延迟（秒）
+        realtime_factor: 每秒音频额外消耗的处理时间（秒）
+        jitter: 在固定延迟上叠加的随机抖动上限（秒）
+        tail_probability / tail_latency: 以一定概率额外等待，模拟长尾延迟
+        token_latency: 流式对话补全中每个片段之间的间隔（秒）
+        llm_latency: 对话补全的固定延迟（秒），默认与 base_latency 相同
+        drip_interval: 非零时响应体逐字节发送、每字节间隔该秒数，模拟持续缓慢返回数据的服务端
+    """
+
+    def __init__(self, base_latency=0.2, realtime_factor=0.1, port=0, jitter=0.0,
+                 tail_probability=0.0, tail_latency=0.0, seed=None, token_latency=0.0, llm_latency=None,
+                 drip_interval=0.0):
+        self.base_latency = base_latency
+        self.drip_interval = drip_interval
+        self.llm_latency = base_latency if llm_latency is None else llm_latency
+        self.token_latency = token_latency
+        self.realtime_factor = realtime_factor
+        self.jitter = jitter
+        self.tail_probability = tail_probability
+        self.tail_latency = tail_latency
+        self._rng = np.random.default_rng(seed)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.requests += 1
+                if self.path.endswith(("/audio/transcriptions", "/audio/translations")):
+                    fields = _parse_multipart(body, self.headers["Content-Type"])
+                    text = server.transcribe(fields.get("file", b""))
+                    if fields.get("response_format") == b"text":
+                        self._send(text.encode(), "text/plain; charset=utf-8")
+                        return
+                    payload = {"text": text}
+                elif self.path.endswith("/chat/completions"):
+                    request = json.loads(body)
+                    if request.get("stream"):
+                        self._send_stream(server.complete_stream(request))
+                        return
+                    payload = server.complete(request)
+                else:
+                    self.send_error(404)
+                    return
+                self._send(json.dumps(payload).encode(), "application/json")
+
+            def _send(self, data, content_type):
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    if not server.drip_interval:
+                        self.wfile.write(data)
+                        return
+                    for i in range(len(data)):
+                        self.wfile.write(data[i:i + 1])
+                        self.wfile.flush()
+                        time.sleep(server.drip_interval)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 客户端已超时断开
+
+            def _send_stream(self, events):
+                """以分块传输发送 SSE 事件；每个事件再切成 5 字节的小块，刻意拆开多字节字符"""
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for event in events:
+                        data = f"data: {event}\n\n".encode()
+                        for i in range(0, len(data), 5):
+                            piece = data[i:i + 5]
+                            self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+                            self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+    def delay(self, audio_seconds=0.0, base_latency=None):
+        """按配置计算本次请求的模拟延迟"""
+        if base_latency is None:
+            base_latency = self.base_latency
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+            tail = self.tail_latency if self._rng.random() < self.tail_probability else 0.0
+        return base_latency + self.realtime_factor * audio_seconds + jitter + tail
+
+    def transcribe(self, audio_bytes):
+        """模拟识别：按音频时长等待，再返回解码出的词序列"""
+        audio, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+        time.sleep(self.delay(len(audio) / sample_rate))
+        return " ".join(f"w{k}" for k in decode_utterance(audio, sample_rate))
+
+    def _reply(self, request):
+        """按系统提示词中要求的步骤对用户输入做简单变换"""
+        messages = request.get("messages", [])
+        system = " ".join(m["content"] for m in messages if m["role"] == "system").lower()
+        text = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        if "optimize" in system or "fix obvious" in system:
+            text = text[:1].upper() + text[1:]
+        if "into english" in system:
+            text = f"[en] {text}"
+        if "punctuation" in system and not text.endswith((".", "。", "!", "?")):
+            text += "."
+        return text
+
+    def complete(self, request):
+        """模拟对话补全：等待首个片段延迟和全部片段的生成时间后一次性返回"""
+        text = self._reply(request)
+        time.sleep(self.delay(base_latency=self.llm_latency) + self.token_latency * max((len(text) - 1) // 3, 0))
+        return {
+            "id": f"stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def complete_stream(self, request):
+        """模拟流式对话补全：首个片段前等待固定延迟，之后每 3 个字符一个片段"""
+        text = self._reply(request)
+        time.sleep(self.delay(base_latency=self.llm_latency))
+        for i in range(0, len(text), 3):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            chunk = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": request.get("model", "stub"),
+                     "choices": [{"index": 0, "delta": {"content": text[i:i + 3]}, "finish_reason": None}]}
+            yield json.dumps(chunk, ensure_ascii=False)
+        yield "[DONE]"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """以独立进程运行替身服务，便于把服务端线程与被测进程隔离"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地 ASR / LLM 替身服务")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.2, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--realtime-factor", type=float, default=0.1, help="每秒音频额外处理时间（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机抖动上限（秒）")
+    parser.add_argument("--tail-probability", type=float, default=0.0, help="长尾延迟出现的概率")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="长尾延迟（秒）")
+    parser.add_argument("--drip-interval", type=float, default=0.0, help="响应体逐字节发送的间隔（秒）")
+    args = parser.parse_args()
+
+    server = StubServer(base_latency=args.latency, realtime_factor=args.realtime_factor, port=args.port,
+                        jitter=args.jitter, tail_probability=args.tail_probability, tail_latency=args.tail_latency,
+                        drip_interval=args.drip_interval)
+    print(server.url, flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class VirtualInputStream:
+    """模拟 sd.InputStream：按真实时间节奏把预先准备的音频块送进回调"""
+
+    def __init__(self, audio, samplerate, channels=1, callback=None, blocksize=0, dtype="float32", **kwargs):
+        audio = np.asarray(audio)
+        if np.dtype(dtype) == np.int16 and audio.dtype != np.int16:
+            audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        self.audio = audio.astype(dtype, copy=False)
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize or int(samplerate * 0.01)
+        self.dtype = dtype
+        self._running = False
+        self._thread = None
+
+    def _run(self):
+        position = 0
+        next_time = time.perf_counter()
+        while self._running:
+            block = self.audio[position:position + self.blocksize]
+            if len(block) < self.blocksize:
+                block = np.concatenate([block, np.zeros((self.blocksize - len(block),) + self.audio.shape[1:], dtype=self.audio.dtype)])
+            position += self.blocksize
+            self.callback(block, len(block), None, None)
+            next_time += self.blocksize / self.samplerate
+            time.sleep(max(next_time - time.perf_counter(), 0))
+
+    @property
+    def active(self):
+        return self._running
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+
+@contextmanager
+def virtual_microphone(sd, audio, sample_rate, name="virtual-mic", open_latency=0.0):
+    """把 sounddevice 模块替换成虚拟输入源，audio 为 (frames, channels) 数组
+
+    open_latency 模拟 PortAudio 打开输入流的耗时（秒）。
+    """
+    device = {"name": name, "default_samplerate": float(sample_rate), "max_input_channels": audio.shape[1]}
+    original = sd.InputStream, sd.query_devices
+
+    def query_devices(device_id=None, kind=None):
+        return device if kind or device_id is not None else [device]
+
+    def input_stream(**kwargs):
+        if open_latency:
+            time.sleep(open_latency)
+        return VirtualInputStream(audio, **kwargs)
+
+    sd.InputStream = input_stream
+    sd.query_devices = query_devices
+    try:
+        yield
+    finally:
+        sd.InputStream, sd.query_devices = original
+
+
+class AudioCue:
+    """可重复触发的音频源：平时输出静音，play() 之后从头播放一段音频"""
+
+    def __init__(self, channels=1):
+        self.channels = channels
+        self._audio = None
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def play(self, audio):
+        """audio 为 (frames, channels) 的 float32 数组"""
+        with self._lock:
+            self._audio = np.asarray(audio, dtype=np.float32).reshape(len(audio), -1)
+            self._position = 0
+
+    def read(self, frames):
+        block = np.zeros((frames, self.channels), dtype=np.float32)
+        with self._lock:
+            if self._audio is not None:
+                chunk = self._audio[self._position:self._position + frames]
+                block[:len(chunk)] = chunk
+                self._position += frames
+                if self._position >= len(self._audio):
+                    self._audio = None
+        return block
+
+
+class CuedInputStream(VirtualInputStream):
+    """从 AudioCue 读取音频的输入流，常驻输入流模式下也能在每次听写时重新播放"""
+
+    def __init__(self, cue, samplerate, channels=1, callback=None, blocksize=0, dtype="float32", **kwargs):
+        super().__init__(np.zeros((0, channels), dtype=np.float32), samplerate, channels=channels,
+                         callback=callback, blocksize=blocksize, dtype=dtype)
+        self.cue = cue
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while self._running:
+            block = self.cue.read(self.blocksize)
+            if np.dtype(self.dtype) == np.int16:
+                block = (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+            self.callback(block, len(block), None, None)
+            next_time += self.blocksize / self.samplerate
+            time.sleep(max(next_time - time.perf_counter(), 0))
+
+
+@contextmanager
+def cued_microphone(sd, sample_rate, channels=1, name="virtual-mic"):
+    """把 sounddevice 模块替换成可触发的虚拟输入源，返回 AudioCue"""
+    cue = AudioCue(channels)
+    device = {"name": name, "default_samplerate": float(sample_rate), "max_input_channels": channels}
+    original = sd.InputStream, sd.query_devices
+
+    def query_devices(device_id=None, kind=None):
+        return device if kind or device_id is not None else [device]
+
+    sd.InputStream = lambda **kwargs: CuedInputStream(cue, **kwargs)
+    sd.query_devices = query_devices
+    try:
+        yield cue
+    finally:
+        sd.InputStream, sd.query_devices = original
@@ -2,20 +2,59 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QPlainTextEdit, QLineEdit,
     QHBoxLayout, QLabel, QGroupBox, QGraphicsDropShadowEffect
 )
-from PyQt5.QtCore import QFileSystemWatcher, QTimer
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 from PyQt5.QtGui import QDesktopServices, QColor
+from PyQt5.QtNetwork import QAbstractSocket, QHostAddress, QTcpServer, QUdpSocket
+import json
+import logging
 import os
 from dotenv import load_dotenv
 import subprocess
 import os
+import time
+from src.control import DEFAULT_CONTROL_ADDR, send_command
+from src.status.sinks import DEFAULT_SOCKET_ADDR
+from src.utils.logStream import LogLineBuffer, LogStreamHandler
 from src.utils.logger import logger
 
 
+class CommandSignals(QObject):
+    """控制命令的结果，从工作线程发出、在界面线程中处理"""
+    replied = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class CommandTask(QRunnable):
+    """在线程池中向主程序发送一条控制命令，界面线程不等待连接和回复"""
+
+    def __init__(self, command, addr, timeout):
+        super().__init__()
+        self.command = command
+        self.addr = addr
+        self.timeout = timeout
+        self.signals = CommandSignals()
+
+    def run(self):
+        try:
+            reply = send_command(self.command, self.addr, timeout=self.timeout)
+        except (OSError, ValueError) as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.replied.emit(reply)
+
+
 class ControlUI(QWidget):
+    LOG_FRAME_MS = 16  # 日志视图每帧最多刷新一次
+    LOG_REBUILD_LINES = 100  # 需要裁掉的旧行超过该数量时整体重绘日志视图
+    LOG_DUTY_FACTOR = 4  # 两次刷新的间隔至少是上次刷新耗时的 4 倍，日志再多也只占界面线程约 1/5 的时间
+    READY_POLL_MS = 20  # 启动主程序后查询控制端口的间隔
+    SHUTDOWN_TIMEOUT = 3  # 等待主程序退出的时间（秒），超时后强制结束
+    EXIT_POLL_MS = 50  # 等待主程序退出时检查进程状态的间隔
+
     def __init__(self):
         super().__init__()
         
-        # 初始化环境变量监控
+        # 初始化环境变量监控：只刷新界面上的设置，运行中的主程序由自身的 .env 监控重新加载
         self.env_watcher = QFileSystemWatcher(['.env'])
         self.env_watcher.fileChanged.connect(self.reload_env)
         
@@ -33,23 +72,41 @@ class ControlUI(QWidget):
         # 初始化UI
         self.init_ui()
         
-        # 加载环境变量
-        self.reload_env()
-        
-        # 初始化进程
+        # 初始化进程：主程序启动后常驻，关闭只是暂停听写，再次启动时立即恢复
         self.process = None
+        self.control_addr = os.getenv("CONTROL_SOCKET_ADDR", DEFAULT_CONTROL_ADDR)
+        self._spawned_at = None
+        self.ready_timer = QTimer(self)
+        self.ready_timer.timeout.connect(self.check_ready)
+        self._ready_probe = False  # 就绪查询是否正在进行
+        self._commands = set()  # 正在进行的控制命令，保持引用直到收到结果
+        self._exiting = None  # 正在等待退出的主程序进程
+        self._after_exit = None  # 该进程退出后要执行的操作（例如重新启动）
         
-        # 初始化日志监控
-        self.log_watcher = QFileSystemWatcher(['logs/app.log'])
-        self.log_watcher.fileChanged.connect(self.update_log_view)
+        # 加载环境变量
+        self.reload_env()
         
-        # 记录日志文件读取位置
-        self._log_file_pos = 0
+        # 主程序通过本地 TCP 连接推送日志，收到的行按帧合并后再追加到日志视图
+        self.log_buffer = LogLineBuffer(int(os.getenv("LOG_VIEW_MAX_LINES", "2000")))
+        self.log_view.setMaximumBlockCount(self.log_buffer.max_lines)
+        self.log_server = QTcpServer(self)
+        self.log_server.newConnection.connect(self.accept_log_connection)
+        self.log_server.listen(QHostAddress.LocalHost, 0)
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.setSingleShot(True)
+        self.log_flush_timer.timeout.connect(self.update_log_view)
+        self.log_connections = []
+        self._log_flush_ms = 0.0
+        # 控制界面自身的日志（主程序的启动、恢复耗时等）也显示在日志视图中
+        self.ui_log_handler = LogStreamHandler(f"127.0.0.1:{self.log_server.serverPort()}")
+        self.ui_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(self.ui_log_handler)
         
-        # 初始化定时器
-        self.log_timer = QTimer()
-        self.log_timer.timeout.connect(self.update_log_view)
-        self.log_timer.start(500)  # 每500ms更新一次
+        # 接收主程序通过 UDP 发送的状态（STATUS_SINK 包含 socket 时）
+        self.status_socket = QUdpSocket(self)
+        host, _, port = os.getenv("STATUS_SOCKET_ADDR", DEFAULT_SOCKET_ADDR).rpartition(":")
+        self.status_socket.bind(QHostAddress(host or "127.0.0.1"), int(port))
+        self.status_socket.readyRead.connect(self.update_status)
         
     def init_ui(self):
         """初始化界面"""
@@ -254,6 +311,10 @@ class ControlUI(QWidget):
         
         layout.addLayout(button_layout)
         
+        # 创建状态显示（录音、转录、错误等状态不再输入到目标输入框）
+        self.status_label = QLabel("未启动")
+        layout.addWidget(self.status_label)
+        
         # 创建日志显示区域
         self.log_view = QPlainTextEdit()
         self.log_view.setReadOnly(True)
@@ -302,12 +363,30 @@ class ControlUI(QWidget):
         return True
 
     def reload_env(self):
-        """重新加载.env文件"""
+        """重新加载.env文件
+
+        只更新界面；运行中的主程序按 CONFIG_WATCH_INTERVAL 检查 .env 并自行重新加载，
+        这里不再另外发送 reload 命令，一次修改只触发一次重新加载
+        """
         load_dotenv(override=True)
         self.api_key = os.getenv('SILICONFLOW_API_KEY', '')
         # 更新UI中的API Key显示
         self.api_key_input.setText(self.api_key)
 
+    def send_async(self, command, on_reply=None, on_error=None, timeout=1.0):
+        """在线程池中发送控制命令，回复或错误在界面线程中交给回调，界面不会因主程序繁忙而卡住"""
+        task = CommandTask(command, self.control_addr, timeout)
+        self._commands.add(task.signals)
+
+        def done(callback, result):
+            self._commands.discard(task.signals)
+            if callback is not None:
+                callback(result)
+
+        task.signals.replied.connect(lambda reply: done(on_reply, reply))
+        task.signals.failed.connect(lambda error: done(on_error, error))
+        QThreadPool.globalInstance().start(task)
+
     def open_key_url(self):
         """打开获取API Key的URL"""
         QDesktopServices.openUrl("https://cloud.siliconflow.cn/account/ak")
@@ -352,50 +431,232 @@ class ControlUI(QWidget):
             self.log_view.setPlainText("请先输入SILICONFLOW API Key")
             return
             
+        if self.process is not None and self.process.poll() is not None:
+            # 主程序已退出：重新启动
+            self.shutdown_main()
+
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
         if self.process is None:
-            logger.info("启动主程序")
-            self.process = subprocess.Popen(["python", "main.py"])
-            self.start_btn.setEnabled(False)
-            self.stop_btn.setEnabled(True)
-            
-            # 初始化日志显示
-            self.update_log_view()
-    
-    def stop_main(self):
-        """停止main.py"""
-        if self.process is not None:
-            logger.info("停止主程序")
-            self.process.terminate()
-            self.process = None
+            if self._exiting is not None:
+                self._after_exit = self.spawn_main  # 等上一个主程序退出、释放控制端口后再启动
+            else:
+                self.spawn_main()
+            return
+
+        start = time.perf_counter()
+        process = self.process
+
+        def resumed(reply):
+            if not reply.get("ok"):
+                # 主程序在运行但拒绝恢复：保持暂停状态，可以再次点击启动
+                logger.error(f"恢复听写失败: {reply.get('error')}")
+                if self.process is process:
+                    self.start_btn.setEnabled(True)
+                    self.stop_btn.setEnabled(False)
+                    self.status_label.setText("恢复失败")
+                return
+            logger.info(f"已恢复听写，耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+            if self.stop_btn.isEnabled():
+                self.status_label.setText("空闲")
+
+        def resume_failed(error):
+            if self.process is not process:
+                return
+            logger.error(f"恢复听写失败，重新启动主程序: {error}")
+            self.shutdown_main(on_exit=self.spawn_main)
+
+        self.send_async("resume", resumed, resume_failed)
+
+    def spawn_main(self):
+        """启动常驻的主程序进程"""
+        logger.info("启动主程序")
+        # 让主程序把状态发送给控制界面
+        env = os.environ.copy()
+        sinks = env.get("STATUS_SINK", "terminal")
+        if "socket" not in sinks:
+            env["STATUS_SINK"] = f"{sinks},socket"
+        # 让主程序把日志推送到控制界面，并监听控制端口
+        env["LOG_STREAM_ADDR"] = f"127.0.0.1:{self.log_server.serverPort()}"
+        env["CONTROL_SOCKET_ADDR"] = self.control_addr
+        self.process = subprocess.Popen(["python", "main.py"], env=env)
+        self._spawned_at = time.perf_counter()
+        self.status_label.setText("启动中...")
+        self.ready_timer.start(self.READY_POLL_MS)
+
+    def check_ready(self):
+        """主程序的控制端口可以连接时，记录启动耗时（上一次查询尚未返回时跳过本次）"""
+        if self.process is None or self.process.poll() is not None:
+            self.ready_timer.stop()
+            logger.error("主程序启动失败")
+            self.shutdown_main()
             self.start_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
+            self.status_label.setText("启动失败")
+            return
+        if self._ready_probe:
+            return
+        self._ready_probe = True
+        self.send_async("stats", self._on_ready, self._on_not_ready, timeout=0.2)
+
+    def _on_not_ready(self, error):
+        self._ready_probe = False  # 控制端口尚未监听，下次定时器触发时重试
+
+    def _on_ready(self, stats):
+        """主程序已就绪"""
+        self._ready_probe = False
+        if not self.ready_timer.isActive():
+            return  # 查询期间主程序已被停止
+        self.ready_timer.stop()
+        logger.info(
+            f"主程序已就绪，启动耗时 {(time.perf_counter() - self._spawned_at) * 1000:.0f}ms"
+            f"（进程内 {stats.get('startup_ms')}ms）"
+        )
+        if self.stop_btn.isEnabled():
+            self.status_label.setText("空闲")
+        else:
+            # 启动过程中点了关闭
+            self.stop_main()
+
+    def stop_main(self):
+        """暂停听写，主程序保持运行，再次启动时无需重新加载"""
+        if self.process is None:
+            return
+        if not self.ready_timer.isActive():
+            process = self.process
+
+            def paused(reply):
+                if reply.get("ok"):
+                    logger.info("暂停听写")
+                    return
+                # 主程序在运行但拒绝暂停：听写仍在进行，恢复为运行中的状态
+                logger.error(f"暂停听写失败: {reply.get('error')}")
+                if self.process is process and self.start_btn.isEnabled():
+                    self.start_btn.setEnabled(False)
+                    self.stop_btn.setEnabled(True)
+                    self.status_label.setText("暂停失败")
+
+            def pause_failed(error):
+                if self.process is not process:
+                    return
+                logger.error(f"暂停听写失败，结束主程序: {error}")
+                self.shutdown_main()
+                self.status_label.setText("未启动")
+
+            self.send_async("pause", paused, pause_failed)
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.status_label.setText("已暂停" if self.process is not None else "未启动")
+        self.setWindowTitle('主程序控制')
+
+    def shutdown_main(self, on_exit=None, wait=False):
+        """结束主程序，进程退出后调用 on_exit，避免留下僵尸进程
+
+        默认不阻塞界面：退出命令在线程池中发送，之后定时检查进程是否退出，超时后强制结束；
+        wait=True 时同步等待（关闭窗口时使用）
+        """
+        self.ready_timer.stop()
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            if on_exit is not None:
+                on_exit()
+            return
+        logger.info("停止主程序")
+        if wait:
+            try:
+                send_command("shutdown", self.control_addr)
+            except (OSError, ValueError):
+                process.terminate()
+            try:
+                process.wait(timeout=self.SHUTDOWN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                logger.warning("主程序未及时退出，强制结束")
+                process.kill()
+                process.wait()
+            return
+        self._exiting, self._after_exit = process, on_exit
+        self.send_async("shutdown", on_error=lambda error: process.terminate())
+        self._wait_exit(process, time.perf_counter() + self.SHUTDOWN_TIMEOUT)
+
+    def _wait_exit(self, process, deadline):
+        """定时检查主程序是否已退出，超过 deadline 仍未退出时强制结束"""
+        if process is not self._exiting:
+            return  # 关闭窗口时已同步结束
+        if process.poll() is None:
+            if time.perf_counter() < deadline:
+                QTimer.singleShot(self.EXIT_POLL_MS, lambda: self._wait_exit(process, deadline))
+                return
+            logger.warning("主程序未及时退出，强制结束")
+            process.kill()
+            process.wait()
+        callback, self._exiting, self._after_exit = self._after_exit, None, None
+        if callback is not None:
+            callback()
+
+    def closeEvent(self, event):
+        """关闭窗口时结束主程序（包括正在等待退出的进程）"""
+        self.shutdown_main(wait=True)
+        exiting, self._exiting, self._after_exit = self._exiting, None, None
+        if exiting is not None:
+            try:
+                exiting.wait(timeout=self.SHUTDOWN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                exiting.kill()
+                exiting.wait()
+        logger.removeHandler(self.ui_log_handler)
+        self.ui_log_handler.close()
+        super().closeEvent(event)
+
+    def update_status(self):
+        """显示主程序发送的最新状态"""
+        message = None
+        while self.status_socket.hasPendingDatagrams():
+            datagram, _, _ = self.status_socket.readDatagram(self.status_socket.pendingDatagramSize())
+            try:
+                message = json.loads(datagram.decode("utf-8")).get("message") or "空闲"
+            except ValueError:
+                continue
+        if message is not None:
+            self.status_label.setText(message)
+            self.setWindowTitle(f'主程序控制 - {message}')
+    
+    def accept_log_connection(self):
+        """主程序（重新）启动后连接日志端口"""
+        while self.log_server.hasPendingConnections():
+            connection = self.log_server.nextPendingConnection()
+            connection.readyRead.connect(self.receive_log)
+            connection.disconnected.connect(self.receive_log)
+            self.log_connections.append(connection)
+
+    def receive_log(self):
+        """有日志到达：数据留在套接字缓冲中，读取和显示推迟到下一帧统一处理"""
+        # 刷新之前不再接收 readyRead，日志再密集，每帧也只唤醒一次
+        for connection in self.log_connections:
+            connection.blockSignals(True)
+        if not self.log_flush_timer.isActive():
+            self.log_flush_timer.start(max(self.LOG_FRAME_MS, int(self._log_flush_ms * self.LOG_DUTY_FACTOR)))
     
     def update_log_view(self):
-        """实时更新日志显示"""
-        try:
-            with open('logs/app.log', 'r') as f:
-                # 跳转到上次读取位置
-                f.seek(self._log_file_pos)
-                
-                # 读取新增内容
-                new_content = f.read()
-                
-                # 更新文件位置
-                self._log_file_pos = f.tell()
-                
-                # 如果文件被清空或轮转，重置位置
-                if self._log_file_pos > os.path.getsize('logs/app.log'):
-                    self._log_file_pos = 0
-                    new_content = f.read()
-                
-                # 追加新内容到日志视图
-                if new_content:
-                    self.log_view.appendPlainText(new_content)
-                    self.log_view.verticalScrollBar().setValue(
-                        self.log_view.verticalScrollBar().maximum()
-                    )
-        except FileNotFoundError:
-            self.log_view.setPlainText('日志文件不存在')
+        """把这一帧内收到的日志一次性追加到日志视图"""
+        start = time.perf_counter()
+        for connection in list(self.log_connections):
+            connection.blockSignals(False)
+            self.log_buffer.feed(bytes(connection.readAll()))
+            if connection.state() == QAbstractSocket.UnconnectedState:
+                # 主程序已退出
+                self.log_connections.remove(connection)
+                connection.deleteLater()
+        text, count = self.log_buffer.drain()
+        if self.log_view.blockCount() + count - self.log_buffer.max_lines > self.LOG_REBUILD_LINES:
+            # 视图需要裁掉大量旧行：逐块删除的开销与行数成正比，不如整体重绘
+            self.log_view.setPlainText(self.log_buffer.text())
+        elif count:
+            self.log_view.appendPlainText(text)
+        if count:
+            self.log_view.verticalScrollBar().setValue(
+                self.log_view.verticalScrollBar().maximum()
+            )
+        self._log_flush_ms = (time.perf_counter() - start) * 1000
 
 if __name__ == "__main__":
     app = QApplication([])
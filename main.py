@@ -1,15 +1,33 @@
 import os
 import sys
+import threading
+import time
+from functools import partial
 
-from dotenv import load_dotenv
+PROCESS_START = time.perf_counter()  # 用于统计启动到可以听写的耗时
 
-load_dotenv()
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+
+ENV_PATH = find_dotenv() or ".env"  # 热更新时重新读取的配置文件
+# 启动时由父进程指定、与 .env 不同的环境变量（例如控制界面追加的 STATUS_SINK=...,socket），
+# load_dotenv 不会覆盖它们，重新加载 .env 时同样保留
+_env_file = dotenv_values(ENV_PATH) if os.path.exists(ENV_PATH) else {}
+PINNED_ENV = {k: v for k, v in os.environ.items() if _env_file.get(k) != v}
+load_dotenv(ENV_PATH)
 
 from src.audio.recorder import AudioRecorder
+from src.control import ControlServer
 from src.keyboard.listener import KeyboardManager, check_accessibility_permissions
-from src.transcription.whisper import WhisperProcessor
+from src.llm.cache import cache_stats, flush_cache, log_cache_stats
+from src.pipeline import PipelineEngine
+from src.status import create_status_sink
+from src.transcription import registry
+from src.utils.config import ConfigWatcher, get_config, read_env_file, set_config
+from src.utils.httpClient import close_stale, connection_stats, log_connection_stats
 from src.utils.logger import logger
-from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
+from src.utils.scheduler import get_scheduler
+from src.utils.tracing import Trace, get_metrics
+from src.transcription.streaming import StreamingTranscriber
 
 
 def check_microphone_permissions():
@@ -28,81 +46,325 @@ def check_microphone_permissions():
 class VoiceAssistant:
     def __init__(self, audio_processor):
         self.audio_recorder = AudioRecorder()
+        # 进程内后端直接接收 PCM，录音时不再编码
+        self.audio_recorder.raw_output = getattr(audio_processor, "accepts_pcm", False)
         self.audio_processor = audio_processor
+        self.stream_session = None  # 流式模式下的当前转录会话
+        self.trace = None  # 当前听写的计时记录
+        self.control = None  # 本地控制端口，设置 CONTROL_SOCKET_ADDR 时启用
+        self.startup_seconds = None  # 进程启动到可以听写的耗时
+        self.resume_seconds = None  # 最近一次恢复听写的耗时
+        self.dictations = 0
+        self.config_watcher = None  # 监控 .env 的修改，CONFIG_WATCH_INTERVAL 为 0 时不启用
+        self._reload_lock = threading.Lock()
+        self._pending_processor = None  # 等待录音结束后切换的转录后端
+        self._recorder_stale = False  # 录音相关配置已修改，录音结束后重建录音器
+        # 按键回调只投递任务：录音的开始/停止与耗时的转录处理分别在两个工作线程中执行，
+        # 上一次转录还在进行时也能立即开始新的录音
+        self.capture_engine = PipelineEngine("capture")
+        self.engine = PipelineEngine("pipeline")
         self.keyboard_manager = KeyboardManager(
             on_record_start=self.start_transcription_recording,
             on_record_stop=self.stop_transcription_recording,
             on_translate_start=self.start_translation_recording,
             on_translate_stop=self.stop_translation_recording,
-            on_reset_state=self.reset_state
+            on_reset_state=self.reset_state,
+            on_key_down=self.arm_recording,
+            on_key_cancel=self.disarm_recording
         )
     
+    def arm_recording(self):
+        """按下热键：开始预录，按住阈值期间说的话不会丢失"""
+        self.capture_engine.submit(self._arm, on_error=self._on_pipeline_error)
+
+    def disarm_recording(self):
+        """短按松开：丢弃预录音频"""
+        self.capture_engine.submit(self._disarm, on_error=self._on_pipeline_error)
+
+    def _arm(self):
+        self.audio_recorder.arm()
+
+    def _disarm(self):
+        self.audio_recorder.disarm()
+        self._apply_pending()
+    
     def start_transcription_recording(self):
         """开始录音（转录模式）"""
-        self.audio_recorder.start_recording()
+        self.capture_engine.submit(self._start_recording, "transcriptions", on_error=self._on_pipeline_error)
     
     def stop_transcription_recording(self):
         """停止录音并处理（转录模式）"""
-        audio = self.audio_recorder.stop_recording()
-        if audio == "TOO_SHORT":
-            logger.warning("录音时长太短，状态将重置")
-            self.keyboard_manager.reset_state()
-        elif audio:
-            result = self.audio_processor.process_audio(
-                audio,
-                mode="transcriptions",
-                prompt=""
-            )
-            # 解构返回值
-            text, error = result if isinstance(result, tuple) else (result, None)
-            self.keyboard_manager.type_text(text, error)
-        else:
-            logger.error("没有录音数据，状态将重置")
-            self.keyboard_manager.reset_state()
+        self._submit_stop("transcriptions")
     
     def start_translation_recording(self):
         """开始录音（翻译模式）"""
-        self.audio_recorder.start_recording()
+        self.capture_engine.submit(self._start_recording, "translations", on_error=self._on_pipeline_error)
     
     def stop_translation_recording(self):
         """停止录音并处理（翻译模式）"""
-        audio = self.audio_recorder.stop_recording()
+        self._submit_stop("translations")
+
+    def _submit_stop(self, mode):
+        # 在按键回调中执行，此时键盘管理器的听写编号就是要停止的这次听写
+        dictation = self.keyboard_manager.dictation_id
+        self.capture_engine.submit(self._stop_recording, mode, time.perf_counter(), dictation,
+                                   on_error=partial(self._on_pipeline_error, dictation=dictation))
+
+    def _on_pipeline_error(self, error, dictation=None):
+        """流水线任务失败时提示错误并恢复状态（只影响出错的这次听写）"""
+        self.keyboard_manager.show_error(f"❌ {error}", dictation)
+
+    def _start_recording(self, mode):
+        """开始录音，启用流式模式时同时创建流式转录会话（在录音工作线程中执行）"""
+        self.trace = Trace(mode)
+        with self.trace.activate():
+            if self.audio_recorder.stream_segment_seconds > 0:
+                self.stream_session = StreamingTranscriber(self.audio_processor, mode=mode)
+                self.audio_recorder.on_segment = self.stream_session.submit
+            self.audio_recorder.start_recording()
+
+    def _stop_recording(self, mode, released=None, dictation=None):
+        """停止录音（在录音工作线程中执行），有效录音交给处理流水线"""
+        trace, self.trace = self.trace or Trace(mode), None
+        trace.released = released
+        with trace.activate():
+            audio = self.audio_recorder.stop_recording()
+        stream, self.stream_session = self.stream_session, None
+        self.audio_recorder.on_segment = None
+        processor = self.audio_processor  # 录音期间不会切换后端，这段音频交给录音时的后端
+
         if audio == "TOO_SHORT":
             logger.warning("录音时长太短，状态将重置")
-            self.keyboard_manager.reset_state()
-        elif audio:
-            result = self.audio_processor.process_audio(
-                    audio,
-                    mode="translations",
-                    prompt=""
-                )
-            text, error = result if isinstance(result, tuple) else (result, None)
-            self.keyboard_manager.type_text(text,error)
+            if stream is not None:
+                stream.close()
+            trace.finish("too_short")
+            self.keyboard_manager.reset_state(dictation)
+        elif audio == "NO_SPEECH":
+            logger.warning("没有检测到语音，状态将重置")
+            if stream is not None:
+                stream.close()
+            trace.finish("no_speech")
+            self.keyboard_manager.reset_state(dictation)
+        elif audio or (stream is not None and stream.has_segments):
+            self.engine.submit(self._process_recording, processor, audio, stream, mode, trace, dictation,
+                               on_error=partial(self._on_pipeline_error, dictation=dictation))
         else:
             logger.error("没有录音数据，状态将重置")
-            self.keyboard_manager.reset_state()
+            if stream is not None:
+                stream.close()
+            trace.finish("no_audio")
+            self.keyboard_manager.reset_state(dictation)
+        self._apply_pending()
+
+    def _process_recording(self, processor, audio, stream, mode, trace, dictation=None):
+        """转录 → 后处理 → 输入文本（在处理工作线程中执行）"""
+        outcome = "error"
+        try:
+            with trace.activate():
+                result = processor.process_audio(
+                    audio,
+                    mode=mode,
+                    prompt="",
+                    stream=stream
+                )
+                # 解构返回值
+                text, error = result if isinstance(result, tuple) else (result, None)
+                self.keyboard_manager.type_text(text, error, dictation)
+            outcome = "error" if error else "ok"
+        finally:
+            trace.finish(outcome)
+            self.dictations += 1
+        log_connection_stats()
+        log_cache_stats()
 
     def reset_state(self):
         """重置状态"""
         self.keyboard_manager.reset_state()
+
+    def pause(self):
+        """暂停听写：忽略热键并放弃正在进行的录音，转录后端和录音设备保持就绪"""
+        if not self.keyboard_manager.paused:
+            self.keyboard_manager.set_paused(True)
+            self.capture_engine.submit(self._cancel_recording, on_error=self._on_pipeline_error)
+            logger.info("听写已暂停")
+        return self.status()
+
+    def _cancel_recording(self):
+        """丢弃未完成的录音（在录音工作线程中执行）"""
+        if self.audio_recorder.recording:
+            audio = self.audio_recorder.stop_recording()
+            if hasattr(audio, "close"):
+                audio.close()
+            if self.stream_session is not None:
+                self.stream_session.close()
+            self.stream_session, self.audio_recorder.on_segment = None, None
+            trace, self.trace = self.trace, None
+            if trace is not None:
+                trace.finish("cancelled")
+        else:
+            self.audio_recorder.disarm()
+        self._apply_pending()
+        self.keyboard_manager.reset_state()
+
+    def resume(self):
+        """恢复听写"""
+        start_time = time.perf_counter()
+        if self.keyboard_manager.paused:
+            self.keyboard_manager.set_paused(False)
+            self.resume_seconds = time.perf_counter() - start_time
+            logger.info(f"听写已恢复，耗时 {self.resume_seconds * 1000:.2f}ms")
+        return self.status()
+
+    def status(self):
+        """当前状态"""
+        return {
+            "state": "paused" if self.keyboard_manager.paused else "running",
+            "input_state": self.keyboard_manager.state.name,
+            "pid": os.getpid(),
+            "platform": get_config().service_platform,
+        }
+
+    def stats(self):
+        """启动与恢复耗时、听写次数、各阶段耗时统计、连接池统计和结果缓存命中统计"""
+        return {
+            **self.status(),
+            "startup_ms": round(self.startup_seconds * 1000, 1) if self.startup_seconds is not None else None,
+            "resume_ms": round(self.resume_seconds * 1000, 3) if self.resume_seconds is not None else None,
+            "uptime_s": round(time.perf_counter() - PROCESS_START, 1),
+            "dictations": self.dictations,
+            "histograms": get_metrics().snapshot(),
+            "connections": connection_stats(),
+            "cache": cache_stats(),
+        }
+
+    def reload_config(self):
+        """重新读取 .env，只重建配置发生变化的组件
+
+        新配置先完整解析并创建好新的转录后端，成功后才替换；任何一步失败都恢复原配置，
+        正在进行的录音和转录不受影响。录音进行中时，后端和录音器的切换推迟到录音结束。
+        """
+        with self._reload_lock:
+            start_time = time.perf_counter()
+            old = get_config()
+            new, values = read_env_file(ENV_PATH, PINNED_ENV)
+            names, components = new.changes(old)
+            if not names:
+                return {"changed": []}
+
+            set_config(new)
+            try:
+                processor = None
+                if "processor" in components:
+                    processor = registry.create_audio_processor(new)
+                status_sink = None
+                if "status" in components:
+                    status_sink = create_status_sink(keyboard_manager=self.keyboard_manager)
+            except Exception:
+                set_config(old)
+                raise
+
+            if processor is not None:
+                self._pending_processor = processor
+            elif components & {"tuning", "symbol", "translate", "cache", "http"}:
+                # 超时、后处理开关、连接池和缓存在现有后端上更新，不重新加载本地模型；
+                # 等待切换的后端也要更新，它是按上一次的配置创建的
+                for target in (self.audio_processor, self._pending_processor):
+                    if target is not None:
+                        target.apply_config(new)
+            if "recorder" in components:
+                self._recorder_stale = True
+            if processor is not None or self._recorder_stale:
+                self.capture_engine.submit(self._apply_pending, on_error=self._on_pipeline_error)
+            if "keyboard" in components:
+                self.keyboard_manager.apply_config(new)
+            if status_sink is not None:
+                old_sink, self.keyboard_manager.status_sink = self.keyboard_manager.status_sink, status_sink
+                old_sink.close()
+            if "metrics" in components:
+                get_metrics().configure(new.metrics_path, new.metrics_window, new.metrics_snapshot_every,
+                                        new.metrics_max_bytes)
+            if "config" in components:
+                self._start_config_watcher()
+            if "http" in components:
+                # 旧连接池可能还有请求在进行，等到请求超时后再关闭
+                get_scheduler().call_later(new.api_timeout, close_stale)
+            os.environ.update(values)
+
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"已重新加载配置 ({elapsed * 1000:.1f}ms): {', '.join(names)}")
+            return {"changed": names, "components": sorted(components), "reload_ms": round(elapsed * 1000, 2)}
+
+    def _apply_pending(self):
+        """切换到新的转录后端、按新配置重建录音器（在录音工作线程中执行）
+
+        正在录音或预录时什么也不做，录音结束后会再次调用
+        """
+        if self.audio_recorder.recording or self.audio_recorder.armed:
+            return
+        processor, self._pending_processor = self._pending_processor, None
+        if processor is not None:
+            self.audio_processor = processor
+            self.audio_recorder.raw_output = getattr(processor, "accepts_pcm", False)
+            logger.info(f"转录后端已切换为 {get_config().service_platform}")
+        if self._recorder_stale:
+            self._recorder_stale = False
+            recorder = AudioRecorder()
+            recorder.raw_output = getattr(self.audio_processor, "accepts_pcm", False)
+            old_recorder, self.audio_recorder = self.audio_recorder, recorder
+            old_recorder.close()
+            logger.info("录音器已按新配置重建")
+
+    def _start_config_watcher(self):
+        """按当前配置启动（或停止）.env 监控"""
+        if self.config_watcher is not None:
+            self.config_watcher.close()
+            self.config_watcher = None
+        if get_config().config_watch_interval > 0:
+            self.config_watcher = ConfigWatcher(ENV_PATH, self.reload_config)
+
+    def shutdown(self):
+        """退出主程序：先回复调用方，再停止键盘监听让 run() 返回"""
+        logger.info("收到退出命令")
+        get_scheduler().call_later(0.05, self.keyboard_manager.stop_listening)
+        return {}
+
+    def close(self):
+        """释放录音设备、工作线程、控制端口和配置监控"""
+        if self.control is not None:
+            self.control.close()
+        if self.config_watcher is not None:
+            self.config_watcher.close()
+        self.capture_engine.shutdown()
+        self.engine.shutdown()
+        self.audio_recorder.close()
+        flush_cache()
     
-    def run(self):
-        """运行语音助手"""
-        logger.info("=== 语音助手已启动 ===")
-        self.keyboard_manager.start_listening()
+    def run(self, control_addr=None):
+        """运行语音助手，control_addr 不为空时同时监听本地控制端口"""
+        self.startup_seconds = time.perf_counter() - PROCESS_START
+        logger.info(f"=== 语音助手已启动 (启动耗时 {self.startup_seconds * 1000:.0f}ms) ===")
+        if control_addr:
+            self.control = ControlServer(control_addr, {
+                "start": self.resume,
+                "pause": self.pause,
+                "resume": self.resume,
+                "status": self.status,
+                "stats": self.stats,
+                "shutdown": self.shutdown,
+                "reload": self.reload_config,
+            })
+        self._start_config_watcher()
+        try:
+            self.keyboard_manager.start_listening()
+        finally:
+            self.close()
 
 def main():
-    # 判断是 Whisper 还是 SiliconFlow
-    service_platform = os.getenv("SERVICE_PLATFORM", "siliconflow")
-    if service_platform == "groq":
-        audio_processor = WhisperProcessor()
-    elif service_platform == "siliconflow":
-        audio_processor = SenseVoiceSmallProcessor()
-    else:
-        raise ValueError(f"无效的服务平台: {service_platform}")
+    audio_processor = registry.create_audio_processor(get_config())
     try:
         assistant = VoiceAssistant(audio_processor)
-        assistant.run()
+        # 由控制界面启动时常驻运行，通过控制端口暂停/恢复，不必每次重新启动进程
+        assistant.run(control_addr=os.getenv("CONTROL_SOCKET_ADDR"))
     except Exception as e:
         error_msg = str(e)
         if "Input event monitoring will not be possible" in error_msg:
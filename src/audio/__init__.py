@@ -1,7 +1,15 @@
 """音频处理模块
 提供音频录制和处理功能
-"""
 
-from .recorder import AudioRecorder
+AudioRecorder 依赖音频设备（sounddevice），按需导入：批量转录等不录音的场景
+只使用编码和重采样，不需要加载 PortAudio
+"""
 
 __all__ = ['AudioRecorder']
+
+
+def __getattr__(name):
+    if name == 'AudioRecorder':
+        from .recorder import AudioRecorder
+        return AudioRecorder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
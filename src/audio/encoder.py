@@ -0,0 +1,96 @@
+import io
+
+import soundfile as sf
+
+from ..utils.logger import logger
+
+# 编码格式: (soundfile 容器格式, 子格式, 上传文件名)
+CODECS = {
+    "wav": ("WAV", "PCM_16", "audio.wav"),
+    "flac": ("FLAC", "PCM_16", "audio.flac"),
+    "ogg": ("OGG", "VORBIS", "audio.ogg"),
+    "opus": ("OGG", "OPUS", "audio.opus"),
+}
+
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def resolve_codec(codec, sample_rate):
+    """检查编码格式是否可用，不可用时回退到 FLAC"""
+    codec = (codec or "flac").lower()
+    if codec not in CODECS:
+        logger.warning(f"未知的音频编码格式: {codec}，使用 flac")
+        return "flac"
+    container, subtype, _ = CODECS[codec]
+    if subtype not in sf.available_subtypes(container):
+        logger.warning(f"当前 libsndfile 不支持 {codec}，使用 flac")
+        return "flac"
+    if codec == "opus" and sample_rate not in OPUS_SAMPLE_RATES:
+        logger.warning(f"Opus 不支持 {sample_rate}Hz 采样率，使用 flac")
+        return "flac"
+    return codec
+
+
+def payload_size(audio_buffer):
+    """返回待上传音频的字节数"""
+    return len(audio_buffer.getbuffer())
+
+
+class PcmBuffer:
+    """未编码的单声道 int16 音频，供进程内的转录后端直接使用，省去编码和解码"""
+
+    def __init__(self, samples, sample_rate):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.name = "audio.pcm"
+
+    @property
+    def seconds(self):
+        return len(self.samples) / self.sample_rate
+
+    def close(self):
+        self.samples = None
+
+
+class AudioEncoder:
+    """增量音频编码器
+
+    录音过程中每收到一个音频块就立即编码写入内存缓冲，
+    松开按键时只需收尾即可得到完整的上传数据。
+    """
+
+    def __init__(self, sample_rate, channels=1, codec="flac"):
+        self.codec = resolve_codec(codec, sample_rate)
+        container, subtype, self.filename = CODECS[self.codec]
+        self.sample_rate = sample_rate
+        self.frames = 0
+        self._buffer = io.BytesIO()
+        self._file = sf.SoundFile(
+            self._buffer, mode="w", samplerate=sample_rate, channels=channels,
+            format=container, subtype=subtype
+        )
+
+    def write(self, block):
+        """编码一个音频块"""
+        self._file.write(block)
+        self.frames += len(block)
+
+    def finish(self):
+        """结束编码，返回可直接上传的字节流（带 name 属性用于上传文件名）"""
+        self._file.close()
+        self._buffer.seek(0)
+        self._buffer.name = self.filename
+        return self._buffer
+
+    def close(self):
+        """放弃编码结果"""
+        if not self._file.closed:
+            self._file.close()
+        self._buffer.close()
+
+    @classmethod
+    def encode(cls, audio, sample_rate, codec="flac"):
+        """一次性编码整段音频"""
+        encoder = cls(sample_rate, channels=audio.shape[1] if audio.ndim > 1 else 1, codec=codec)
+        encoder.write(audio)
+        return encoder.finish()
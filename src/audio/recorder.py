@@ -1,23 +1,73 @@
-import io
 import sounddevice as sd
 import numpy as np
-import queue
-import soundfile as sf
-import os
-import tempfile
+import threading
+from .encoder import AudioEncoder, PcmBuffer
+from .resampler import TARGET_SAMPLE_RATE, Resampler
+from .ringBuffer import RingBuffer
+from .vad import VoiceActivityGate
+from ..utils.config import get_config
 from ..utils.logger import logger
+from ..utils.tracing import add_span, span
 import time
 
+
 class AudioRecorder:
     def __init__(self):
+        config = get_config()
         self.recording = False
-        self.audio_queue = queue.Queue()
-        self.sample_rate = 16000
+        self.sample_rate = TARGET_SAMPLE_RATE  # 设备采集采样率
+        self.target_rate = TARGET_SAMPLE_RATE  # 上传给后端的采样率（单声道 int16）
+        self.channels = 1
+        self.resampler = Resampler(self.sample_rate, self.target_rate)
         # self.temp_dir = tempfile.mkdtemp()
         self.current_device = None
         self.record_start_time = None
         self.min_record_duration = 1.0  # 最小录音时长（秒）
+        # 流式分段时长（秒），0 表示关闭流式模式
+        self.stream_segment_seconds = config.stream_segment_seconds
+        self.on_segment = None  # 流式模式下每切出一段音频时的回调
+        self._pending = []  # 尚未切分发送的音频块
+        self._pending_frames = 0
+        self._consume_thread = None
+        self._consume_wakeup = threading.Event()  # 停止录音时立即唤醒消费线程
+        # 上传音频的编码格式 (wav / flac / ogg / opus)
+        self.codec = config.audio_codec.lower()
+        self._encoder = None
+        self.raw_output = False  # 为 True 时返回未编码的 PcmBuffer（进程内转录后端）
+        # 环形缓冲区容量（秒），消费线程落后超过该时长时最旧的音频会被覆盖
+        self.ring_seconds = config.ring_buffer_seconds
+        self.ring = None
+        self._read_pos = 0  # 已被消费线程处理到的帧序号
+        self._callback_status = None  # 回调线程中记录的最近一次异常状态
+        self._status_count = 0
+        # 上传前的语音活动检测：裁剪首尾静音、压缩长停顿、全静音时跳过后端请求
+        self.vad = None
+        if config.vad_enabled:
+            self.vad = VoiceActivityGate(
+                self.target_rate,
+                threshold_db=config.vad_threshold_db,
+                max_pause_ms=config.vad_max_pause_ms
+            )
+        # 常驻输入流：启动时打开并一直运行，由 recording 状态决定是否写入，开始录音时不再打开设备
+        self.warm_stream = config.warm_stream
+        self.stream = None
+        self._stream_lock = threading.RLock()  # 开始/停止录音与后台切换设备互斥
+        self._in_callback = False  # 回调是否正在写入环形缓冲区
+        self._start_perf = None  # 调用 start_recording 的时间
+        self._first_sample_perf = None  # 本次录音收到第一个采样块的时间
+        self.start_latency = None  # 最近一次从开始录音到收到首个采样的耗时（秒）
+        # 预录缓冲：按下热键时开始写入环形缓冲区，确认录音后把按住阈值期间的音频拼接到开头
+        self.preroll_seconds = config.preroll_seconds
+        self.armed = False
+        # 后台检测默认输入设备的变化，不在开始录音时查询
+        self.device_check_interval = config.device_check_interval
+        self._device_changed = False
+        self._monitor_stop = threading.Event()
         self._check_audio_devices()
+        if self.warm_stream:
+            self._open_stream()
+        if self.device_check_interval > 0:
+            threading.Thread(target=self._device_monitor, name="device-monitor", daemon=True).start()
         # logger.info(f"初始化完成，临时文件目录: {self.temp_dir}")
         logger.info(f"初始化完成")
     
@@ -50,6 +100,10 @@ class AudioRecorder:
             if abs(default_input['default_samplerate'] - self.sample_rate) > 100:
                 self.sample_rate = int(default_input['default_samplerate'])
                 logger.info(f"调整采样率为: {self.sample_rate}Hz")
+            self.resampler = Resampler(self.sample_rate, self.target_rate)
+            self.ring = RingBuffer(int(self.sample_rate * self.ring_seconds), channels=self.channels)
+            if not self.resampler.passthrough:
+                logger.info(f"上传前重采样: {self.sample_rate}Hz -> {self.target_rate}Hz")
             
             # 列出所有可用设备
             self._list_audio_devices()
@@ -74,59 +128,238 @@ class AudioRecorder:
             logger.error(f"检查设备变化时出错: {e}")
             return False
     
+    def _device_monitor(self):
+        """后台线程：定期检查默认输入设备，空闲时立即切换，录音中则推迟到下次开始录音"""
+        while not self._monitor_stop.wait(self.device_check_interval):
+            try:
+                name = sd.query_devices(kind='input')['name']
+            except Exception as e:
+                logger.error(f"检查设备变化时出错: {e}")
+                continue
+            if name == self.current_device:
+                continue
+            with self._stream_lock:
+                if self.recording:
+                    self._device_changed = True
+                else:
+                    self._apply_device_change()
+
+    def _apply_device_change(self):
+        """切换到新的默认设备并重新打开常驻输入流，调用方需持有 _stream_lock"""
+        self._device_changed = False
+        try:
+            if self._check_device_changed() and self.warm_stream:
+                self._close_stream()
+                self._open_stream()
+        except Exception as e:
+            logger.error(f"切换音频设备失败: {e}")
+
+    def _open_stream(self):
+        """打开并启动输入流"""
+        self.stream = sd.InputStream(
+            channels=self.channels,
+            samplerate=self.sample_rate,
+            dtype='int16',
+            callback=self._audio_callback,
+            device=None,  # 使用默认设备
+            latency='low'  # 使用低延迟模式
+        )
+        self.stream.start()
+        logger.info(f"音频流已启动 (设备: {self.current_device})")
+
+    def _close_stream(self):
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+
+    def close(self):
+        """停止后台设备检测并关闭输入流"""
+        self._monitor_stop.set()
+        with self._stream_lock:
+            self.recording = False
+            self._close_stream()
+
+    def arm(self):
+        """按下热键：开始预录，此时还不确定是否会开始录音"""
+        if self.preroll_seconds <= 0:
+            return
+        with self._stream_lock:
+            if self.recording or self.armed:
+                return
+            self.ring.reset()
+            self._read_pos = 0
+            self.armed = True
+            if self.stream is None or not getattr(self.stream, "active", True):
+                # 未启用常驻输入流时，在按住阈值期间提前打开输入流
+                self._close_stream()
+                self._open_stream()
+
+    def disarm(self):
+        """短按未触发录音：丢弃预录音频"""
+        with self._stream_lock:
+            if not self.armed:
+                return
+            self.armed = False
+            if not self.warm_stream and not self.recording:
+                self._close_stream()
+
     def start_recording(self):
         """开始录音"""
+        with self._stream_lock:
+            self._start_recording()
+
+    def _start_recording(self):
         if not self.recording:
             try:
-                # 检查设备是否发生变化
-                self._check_device_changed()
+                # 录音期间检测到的设备变化推迟到这里处理
+                if self._device_changed:
+                    self._apply_device_change()
                 
                 logger.info("开始录音...")
-                self.recording = True
+                self._start_perf = time.perf_counter()
+                self._first_sample_perf = None
+                self.start_latency = None
                 self.record_start_time = time.time()
-                self.audio_data = []
-                
-                def audio_callback(indata, frames, time, status):
-                    if status:
-                        logger.warning(f"音频录制状态: {status}")
-                    if self.recording:
-                        self.audio_queue.put(indata.copy())
+                self._pending = []
+                self._pending_frames = 0
+                # 非流式模式下边录边编码，流式模式下每个分段单独编码
+                self._encoder = None
+                if not self.streaming_enabled and not self.raw_output:
+                    self._encoder = AudioEncoder(self.target_rate, codec=self.codec)
+                self.resampler.reset()
+                if self.vad is not None:
+                    self.vad.reset()
+                if self.armed:
+                    # 保留按下热键以来的预录音频（最多 preroll_seconds 秒）
+                    preroll_frames = int(self.preroll_seconds * self.sample_rate)
+                    self._read_pos = max(self.ring.written - preroll_frames, self.ring.oldest)
+                    if self.ring.written > self._read_pos:
+                        self._first_sample_perf = self._start_perf
+                    logger.info(f"预录音频: {(self.ring.written - self._read_pos) / self.sample_rate:.2f}秒")
+                else:
+                    self.ring.reset()
+                    self._read_pos = 0
+                self._callback_status = None
+                self._status_count = 0
+                self._consume_wakeup.clear()
                 
-                self.stream = sd.InputStream(
-                    channels=1,
-                    samplerate=self.sample_rate,
-                    callback=audio_callback,
-                    device=None,  # 使用默认设备
-                    latency='low'  # 使用低延迟模式
-                )
-                self.stream.start()
-                logger.info(f"音频流已启动 (设备: {self.current_device})")
+                # 状态全部重置后再打开闸门，回调从这里开始写入
+                self.recording = True
+                self.armed = False
+                if self.stream is None or not getattr(self.stream, "active", True):
+                    # 未启用常驻输入流，或常驻输入流已失效（例如设备被拔出）
+                    self._close_stream()
+                    self._open_stream()
+
+                self._consume_thread = threading.Thread(target=self._consume_worker, daemon=True)
+                self._consume_thread.start()
             except Exception as e:
                 self.recording = False
                 logger.error(f"启动录音失败: {e}")
                 raise
     
+    def _audio_callback(self, indata, frames, time_info, status):
+        """音频回调（实时线程）：只写入环形缓冲区，不分配内存、不写日志"""
+        self._in_callback = True
+        if status:
+            self._callback_status = status
+            self._status_count += 1
+        if self.recording:
+            if self._first_sample_perf is None:
+                self._first_sample_perf = time.perf_counter()
+            self.ring.write(indata)
+        elif self.armed:
+            self.ring.write(indata)
+        self._in_callback = False
+
+    def _report_callback_status(self):
+        """在非实时线程中输出回调记录的异常状态"""
+        if self._status_count:
+            logger.warning(f"音频录制状态: {self._callback_status} (共 {self._status_count} 次)")
+            self._status_count = 0
+
+    def _report_start_latency(self):
+        """输出从开始录音到收到首个采样的耗时"""
+        if self.start_latency is None and self._first_sample_perf is not None:
+            self.start_latency = self._first_sample_perf - self._start_perf
+            logger.info(f"开始录音到首个采样: {self.start_latency * 1000:.1f}毫秒")
+
+    def _wait_callback_idle(self):
+        """常驻输入流不会停止：等待正在进行的回调写完，之后回调不会再写入"""
+        deadline = time.perf_counter() + 0.1
+        while self._in_callback and time.perf_counter() < deadline:
+            time.sleep(0.0005)
+
     def stop_recording(self):
-        """停止录音并返回音频数据"""
+        """停止录音并返回编码后的音频数据"""
+        stop_time = time.perf_counter()
+        with self._stream_lock:
+            if self.recording:
+                add_span("capture", self._start_perf, stop_time)
+            with span("stop"):
+                return self._stop_recording()
+
+    def _stop_recording(self):
         if not self.recording:
             return None
             
         logger.info("停止录音...")
         self.recording = False
-        self.stream.stop()
-        self.stream.close()
+        self._consume_wakeup.set()
+        if self.warm_stream:
+            self._wait_callback_idle()
+        else:
+            self._close_stream()
+        if self._consume_thread is not None:
+            self._consume_thread.join()
+            self._consume_thread = None
+        self._report_callback_status()
+        self._report_start_latency()
+        encoder, self._encoder = self._encoder, None
         
         # 检查录音时长
         if self.record_start_time:
             record_duration = time.time() - self.record_start_time
             if record_duration < self.min_record_duration:
                 logger.warning(f"录音时长太短 ({record_duration:.1f}秒 < {self.min_record_duration}秒)")
+                if encoder is not None:
+                    encoder.close()
                 return "TOO_SHORT"
         
-        # 收集所有音频数据
-        audio_data = []
-        while not self.audio_queue.empty():
-            audio_data.append(self.audio_queue.get())
+        # 收集剩余的音频数据（流式模式下只剩最后的尾段），读取的是环形缓冲区的视图
+        audio_data = self._pending
+        self._pending = []
+        remaining = [
+            self._prepare(self.ring.read(self._read_pos)),
+            self._prepare(self.resampler.flush(), resampled=True),
+        ]
+        if self.vad is not None:
+            remaining.append(self.vad.flush())
+        self._read_pos = self.ring.written
+        for block in remaining:
+            if encoder is not None:
+                encoder.write(block)
+            else:
+                audio_data.append(block)
+
+        if self.vad is not None:
+            total = self.vad.input_samples / self.target_rate
+            logger.info(f"静音裁剪: 去除 {self.vad.removed_seconds:.1f}秒 / 共 {total:.1f}秒")
+            if not self.vad.speech_detected:
+                logger.warning("没有检测到语音，跳过转录")
+                if encoder is not None:
+                    encoder.close()
+                return "NO_SPEECH"
+
+        if encoder is not None:
+            if encoder.frames == 0:
+                encoder.close()
+                logger.warning("没有收集到音频数据")
+                return None
+            logger.info(f"音频数据长度: {encoder.frames} 采样点")
+            with span("encode", codec=self.codec):
+                return encoder.finish()
         
         if not audio_data:
             logger.warning("没有收集到音频数据")
@@ -136,9 +369,73 @@ class AudioRecorder:
         audio = np.concatenate(audio_data)
         logger.info(f"音频数据长度: {len(audio)} 采样点")
 
-        # 将 numpy 数组转换为字节流
-        audio_buffer = io.BytesIO()
-        sf.write(audio_buffer, audio, self.sample_rate, format='WAV')
-        audio_buffer.seek(0)  # 将缓冲区指针移动到开始位置
-        
-        return audio_buffer
\ No newline at end of file
+        with span("encode", codec="pcm" if self.raw_output else self.codec):
+            return self._package(audio)
+
+    def _package(self, audio):
+        """把 16kHz 单声道 int16 音频打包成交给转录后端的数据"""
+        if self.raw_output:
+            return PcmBuffer(audio, self.target_rate)
+        return AudioEncoder.encode(audio, self.target_rate, codec=self.codec)
+
+    @property
+    def streaming_enabled(self):
+        """是否启用流式分段"""
+        return self.stream_segment_seconds > 0 and self.on_segment is not None
+
+    def _find_cut_point(self, audio, search_frames):
+        """在音频末尾 search_frames 范围内寻找能量最低的位置作为切分点"""
+        window = max(int(self.target_rate * 0.02), 1)  # 20ms 窗口
+        start = max(len(audio) - search_frames, 0)
+        tail = audio[start:].reshape(-1).astype(np.float32)
+        n_windows = len(tail) // window
+        if n_windows < 2:
+            return len(audio)
+        energy = np.square(tail[:n_windows * window]).reshape(n_windows, window).mean(axis=1)
+        return start + int(np.argmin(energy)) * window + window // 2
+
+    def _prepare(self, block, resampled=False):
+        """把采集到的音频转换为 16kHz 单声道 int16，并做静音裁剪"""
+        if not resampled:
+            block = self.resampler.process(block)
+        if self.vad is not None:
+            block = self.vad.process(block)
+        return block
+
+    def _consume_worker(self):
+        """录音过程中持续消费音频块：增量编码，或在流式模式下切分音频段"""
+        while self.recording:
+            self._consume_wakeup.wait(0.02)
+            self._report_callback_status()
+            self._report_start_latency()
+            end = self.ring.written
+            if end <= self._read_pos:
+                continue
+            block = self._prepare(self.ring.read(self._read_pos, end))
+            self._read_pos = end
+            if self._encoder is not None:
+                self._encoder.write(block)
+            elif self.streaming_enabled:
+                self._append_segment_block(block)
+            else:
+                self._pending.append(block)
+
+    def _append_segment_block(self, block):
+        """流式模式：累积音频块，达到分段时长后切出一段交给 on_segment"""
+        self._pending.append(block)
+        self._pending_frames += len(block)
+        segment_frames = int(self.stream_segment_seconds * self.target_rate)
+        if self._pending_frames < segment_frames:
+            return
+
+        search_frames = min(self.target_rate, segment_frames // 2)  # 在最后 1 秒内寻找静音切分点
+        audio = np.concatenate(self._pending)
+        cut = self._find_cut_point(audio, search_frames)
+        remainder = audio[cut:]
+        self._pending = [remainder] if len(remainder) else []
+        self._pending_frames = len(remainder)
+        logger.info(f"流式分段: {cut} 采样点")
+        try:
+            self.on_segment(self._package(audio[:cut]))
+        except Exception as e:
+            logger.error(f"提交音频分段失败: {e}")
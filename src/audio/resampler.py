@@ -0,0 +1,110 @@
+"""重采样
+
+把设备原生采样率、任意通道数的音频转换为后端使用的 16kHz 单声道 int16。
+录音器和批量转录共用，不依赖音频设备（sounddevice）。
+"""
+from math import gcd
+
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000  # Whisper / SenseVoice 使用的采样率
+
+
+class Resampler:
+    """流式多相 FIR 重采样器
+
+    把设备原生采样率、任意通道数的音频块转换为 16kHz 单声道 int16，
+    逐块处理并保留滤波器历史，块与块之间无缝衔接。
+    """
+
+    def __init__(self, in_rate, out_rate=TARGET_SAMPLE_RATE, zero_crossings=16, beta=8.0):
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        g = gcd(self.in_rate, self.out_rate)
+        self.up = self.out_rate // g
+        self.down = self.in_rate // g
+        self.passthrough = self.up == self.down
+
+        if not self.passthrough:
+            # 在上采样后的频率上设计 Kaiser 窗 sinc 低通滤波器，截止于较低奈奎斯特频率的 95%
+            factor = max(self.up, self.down)
+            half = zero_crossings * factor
+            n = np.arange(-half, half + 1)
+            cutoff = 0.5 * 0.95 / factor
+            h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(len(n), beta) * self.up
+            self.taps = -(-len(h) // self.up)  # 每个相位的抽头数
+            h = np.pad(h, (0, self.taps * self.up - len(h)))
+            # phases[p, j] 对应 h[p + j * up]
+            self.phases = h.reshape(self.taps, self.up).T.astype(np.float32).copy()
+            self.delay = half  # 线性相位滤波器的群延迟（上采样域）
+        self.reset()
+
+    def reset(self):
+        """清空滤波器状态，准备处理新的录音"""
+        self._in_count = 0
+        self._out_count = 0
+        if not self.passthrough:
+            self._history = np.zeros(self.taps - 1, dtype=np.float32)
+
+    @staticmethod
+    def _to_mono(block):
+        block = np.asarray(block)
+        scale = 32768.0 if block.dtype == np.int16 else 1.0
+        if block.ndim > 1:
+            block = block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+        block = block.astype(np.float32, copy=False)
+        return block / scale if scale != 1.0 else block
+
+    @staticmethod
+    def _to_int16(audio):
+        # 与 _to_mono 使用相同的比例，四舍五入而不是向零截断，int16 经过往返不变
+        return np.clip(np.rint(audio * 32768.0), -32768, 32767).astype(np.int16)
+
+    def _filter(self, block):
+        """对单声道 float32 块做多相滤波，返回新产生的输出样本"""
+        x = np.concatenate([self._history, block])
+        x_start = self._in_count - (self.taps - 1)  # x[0] 对应的全局输入下标
+        self._in_count += len(block)
+        self._history = x[len(x) - (self.taps - 1):]
+
+        last = ((self._in_count - 1) * self.up - self.delay) // self.down
+        if last < self._out_count:
+            return np.zeros(0, dtype=np.float32)
+        n = np.arange(self._out_count, last + 1)
+        self._out_count = last + 1
+
+        m = n * self.down + self.delay
+        base = m // self.up - x_start
+        idx = base[:, None] - np.arange(self.taps)[None, :]
+        return np.einsum("ij,ij->i", self.phases[m % self.up], x[idx])
+
+    def process(self, block):
+        """处理一个音频块，返回 16kHz 单声道 int16"""
+        block = np.asarray(block)
+        if self.passthrough and block.dtype == np.int16 and (block.ndim == 1 or block.shape[1] == 1):
+            # 已经是目标格式：原样复制（输入可能是设备回调中会被复用的缓冲区）
+            return block.reshape(-1).copy()
+        mono = self._to_mono(block)
+        if self.passthrough:
+            return self._to_int16(mono)
+        # 长音频分批计算，限制中间矩阵的内存占用
+        step = max(4096 * self.down // self.up, 1)
+        outputs = [self._filter(mono[i:i + step]) for i in range(0, len(mono), step)]
+        return self._to_int16(np.concatenate(outputs)) if outputs else np.zeros(0, dtype=np.int16)
+
+    def flush(self):
+        """补零输出滤波器延迟中剩余的样本，使输出时长与输入一致"""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.int16)
+        expected = -(-self._in_count * self.up // self.down)
+        padding = -(-self.delay // self.up) + 1
+        out = self._filter(np.zeros(padding, dtype=np.float32))
+        out = out[:max(expected - (self._out_count - len(out)), 0)]
+        self._out_count = expected
+        return self._to_int16(out)
+
+
+def resample(audio, in_rate, out_rate=TARGET_SAMPLE_RATE):
+    """一次性把整段音频转换为 out_rate 单声道 int16"""
+    resampler = Resampler(in_rate, out_rate)
+    return np.concatenate([resampler.process(audio), resampler.flush()])
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class RingBuffer:
+    """预分配的 int16 环形缓冲区
+
+    音频回调线程是唯一的写入方，写入时只做 np.copyto，不分配新的数组；
+    读取方通过全局帧序号读取，未跨越环尾时直接返回视图（零拷贝）。
+    """
+
+    def __init__(self, capacity, channels=1, dtype=np.int16):
+        self.capacity = int(capacity)
+        self.channels = channels
+        self.buffer = np.zeros((self.capacity, channels), dtype=dtype)
+        self.written = 0  # 累计写入的帧数（单调递增）
+
+    def reset(self):
+        """丢弃所有数据（不释放内存）"""
+        self.written = 0
+
+    def write(self, block):
+        """写入一个音频块，容量不足时覆盖最旧的数据"""
+        n = len(block)
+        if n >= self.capacity:
+            block = block[n - self.capacity:]
+            self.written += n - self.capacity
+            n = self.capacity
+        pos = self.written % self.capacity
+        first = min(n, self.capacity - pos)
+        np.copyto(self.buffer[pos:pos + first], block[:first])
+        if first < n:
+            np.copyto(self.buffer[:n - first], block[first:])
+        self.written += n  # 数据写完后再更新序号，读取方看到的序号之前的数据一定完整
+
+    @property
+    def oldest(self):
+        """仍保留在缓冲区中的最早帧序号"""
+        return max(self.written - self.capacity, 0)
+
+    def read(self, start, end=None):
+        """读取 [start, end) 区间的帧，已被覆盖的部分会被跳过
+
+        未跨越环尾时返回缓冲区视图，调用方需在下一次覆盖前用完。
+        """
+        end = self.written if end is None else min(end, self.written)
+        start = max(start, self.oldest)
+        if end <= start:
+            return self.buffer[:0]
+        a = start % self.capacity
+        b = a + (end - start)
+        if b <= self.capacity:
+            return self.buffer[a:b]
+        return np.concatenate([self.buffer[a:], self.buffer[:b - self.capacity]])
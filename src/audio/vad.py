@@ -0,0 +1,124 @@
+import numpy as np
+
+
+class VoiceActivityGate:
+    """基于能量的语音活动检测（VAD）门限
+
+    逐块处理 16kHz 单声道 int16 音频，按 20ms 帧向量化计算能量：
+    - 裁掉开头和结尾的静音（各保留少量余量）
+    - 把过长的停顿压缩到 max_pause_ms
+    - 全程没有检测到语音时 speech_detected 为 False，调用方可跳过后端请求
+    """
+
+    def __init__(self, sample_rate=16000, threshold_db=-45.0, frame_ms=20,
+                 pad_ms=200, max_pause_ms=600, hangover_ms=200):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.pad_frames = max(pad_ms // frame_ms, 0)
+        self.max_pause_frames = max(max_pause_ms // frame_ms, 1)
+        self.hangover_frames = max(hangover_ms // frame_ms, 0)
+        self.reset()
+
+    def reset(self):
+        """清空状态，准备处理新的录音"""
+        self._carry = np.zeros(0, dtype=np.int16)  # 不足一帧的剩余样本
+        self._silence = []  # 尚未决定去留的静音帧
+        self._silence_frames = 0
+        self._frame_index = 0
+        self._last_speech = None  # 最近一个语音帧的全局帧序号
+        self._started = False  # 是否已经输出过语音
+        self.input_samples = 0
+        self.output_samples = 0
+
+    @property
+    def speech_detected(self):
+        return self._last_speech is not None
+
+    @property
+    def removed_seconds(self):
+        """被裁掉的音频时长（秒）"""
+        return (self.input_samples - self.output_samples) / self.sample_rate
+
+    def _active_mask(self, frames):
+        """向量化计算每帧是否处于语音段（含语音结束后的拖尾帧）"""
+        energy = np.mean(np.square(frames, dtype=np.float32), axis=1) / (32768.0 ** 2)
+        speech = 10 * np.log10(energy + 1e-12) > self.threshold_db
+
+        index = self._frame_index + np.arange(len(frames))
+        previous = -np.inf if self._last_speech is None else self._last_speech
+        last_speech = np.maximum.accumulate(np.where(speech, index, -np.inf))
+        last_speech = np.maximum(last_speech, previous)
+        if speech.any():
+            self._last_speech = int(last_speech[-1])
+        self._frame_index += len(frames)
+        return (index - last_speech) <= self.hangover_frames
+
+    def _flush_silence(self):
+        """语音重新出现时，决定之前累积的静音保留多少"""
+        if not self._silence:
+            return []
+        silence = np.concatenate(self._silence)
+        self._silence = []
+        self._silence_frames = 0
+        n_frames = len(silence) // self.frame
+        if not self._started:
+            # 开头静音：只保留语音起点前的 pad
+            keep = min(self.pad_frames, n_frames)
+            return [silence[len(silence) - keep * self.frame:]]
+        if n_frames <= self.max_pause_frames:
+            return [silence]
+        # 过长的停顿：保留首尾各一半，去掉中间部分
+        half = self.max_pause_frames // 2 * self.frame
+        return [silence[:half], silence[len(silence) - half:]]
+
+    def _append_silence(self, samples):
+        self._silence.append(samples)
+        self._silence_frames += len(samples) // self.frame
+        # 静音过长时只保留首尾，避免长时间沉默占用内存
+        limit = self.max_pause_frames + self.pad_frames
+        if self._silence_frames > 2 * limit:
+            silence = np.concatenate(self._silence)
+            head = silence[:limit * self.frame] if self._started else silence[:0]
+            self._silence = [head, silence[len(silence) - limit * self.frame:]]
+            self._silence_frames = (len(head) // self.frame) + limit
+
+    def process(self, block):
+        """处理一个音频块，返回确定保留的音频"""
+        block = np.asarray(block, dtype=np.int16).reshape(-1)
+        self.input_samples += len(block)
+        samples = np.concatenate([self._carry, block]) if len(self._carry) else block
+        n_frames = len(samples) // self.frame
+        self._carry = samples[n_frames * self.frame:]
+        if n_frames == 0:
+            return np.zeros(0, dtype=np.int16)
+
+        frames = samples[:n_frames * self.frame].reshape(n_frames, self.frame)
+        active = self._active_mask(frames)
+
+        # 按连续的语音/静音区间处理，而不是逐帧循环
+        boundaries = np.flatnonzero(np.diff(active.astype(np.int8))) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [n_frames]])
+        output = []
+        for start, end in zip(starts, ends):
+            run = frames[start:end].reshape(-1)
+            if active[start]:
+                output.extend(self._flush_silence())
+                output.append(run)
+                self._started = True
+            else:
+                self._append_silence(run)
+
+        if not output:
+            return np.zeros(0, dtype=np.int16)
+        result = np.concatenate(output)
+        self.output_samples += len(result)
+        return result
+
+    def flush(self):
+        """录音结束：丢弃结尾静音（拖尾帧已随语音输出）"""
+        self._silence = []
+        self._silence_frames = 0
+        self._carry = np.zeros(0, dtype=np.int16)
+        return np.zeros(0, dtype=np.int16)
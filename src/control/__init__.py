@@ -0,0 +1,8 @@
+"""控制模块
+常驻主程序的本地控制端口：控制界面通过它暂停、恢复听写和查询状态，
+不必每次重新启动进程
+"""
+
+from .server import DEFAULT_CONTROL_ADDR, ControlServer, send_command
+
+__all__ = ['DEFAULT_CONTROL_ADDR', 'ControlServer', 'send_command']
@@ -0,0 +1,77 @@
+import json
+import socket
+import threading
+
+from ..utils.logger import logger
+from ..utils.logStream import parse_addr
+
+DEFAULT_CONTROL_ADDR = "127.0.0.1:47801"
+
+
+class ControlServer:
+    """主程序的本地控制端口（TCP，仅监听本机）
+
+    每行一个命令，每个命令回复一行 JSON。命令由 handlers 提供：{命令: 无参函数}，
+    函数返回的字典原样回复给调用方；未知命令和函数抛出的异常以
+    {"ok": false, "error": ...} 回复。空闲时监听线程阻塞在 accept 上，不会定时唤醒。
+    """
+
+    def __init__(self, addr, handlers):
+        self.handlers = handlers
+        self._sock = socket.create_server(parse_addr(addr))
+        self.addr = "%s:%d" % self._sock.getsockname()[:2]
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, name="control-server", daemon=True)
+        self._thread.start()
+        logger.info(f"控制端口已监听: {self.addr}")
+
+    def _serve(self):
+        while not self._closed:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break  # 端口已关闭
+            threading.Thread(target=self._handle, args=(conn,), name="control-conn", daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            with conn, conn.makefile("rb") as reader:
+                for line in reader:
+                    command = line.decode("utf-8", errors="replace").strip()
+                    if command:
+                        reply = self.dispatch(command)
+                        conn.sendall((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+        except OSError:
+            pass  # 调用方已断开
+
+    def dispatch(self, command):
+        handler = self.handlers.get(command)
+        if handler is None:
+            return {"ok": False, "error": f"未知命令: {command}"}
+        try:
+            return {"ok": True, **(handler() or {})}
+        except Exception as e:
+            logger.error(f"控制命令 {command} 执行失败: {e}", exc_info=True)
+            return {"ok": False, "error": str(e)}
+
+    def close(self):
+        self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)  # 唤醒阻塞在 accept 上的线程
+        except OSError:
+            pass
+        self._sock.close()
+
+
+def send_command(command, addr=DEFAULT_CONTROL_ADDR, timeout=1.0):
+    """向主程序发送一条控制命令并返回回复
+
+    主程序未运行时抛出 OSError（连接被拒绝或超时）
+    """
+    with socket.create_connection(parse_addr(addr), timeout=timeout) as sock:
+        sock.sendall(command.encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError("主程序关闭了控制连接")
+    return json.loads(line)
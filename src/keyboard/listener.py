@@ -1,14 +1,44 @@
 from pynput.keyboard import Controller, Key, Listener
 import pyperclip
+from ..status import create_status_sink
+from ..utils.config import get_config
 from ..utils.logger import logger
+from ..utils.scheduler import get_scheduler
+from ..utils.tracing import add_span, span
 import time
+import threading
 from .inputState import InputState
-import os
+from collections.abc import Iterator
+
+
+class CountingController:
+    """包装 pynput Controller，统计注入到目标应用的按键事件数"""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.events = 0
+
+    def press(self, key):
+        self.events += 1
+        self.controller.press(key)
+
+    def release(self, key):
+        self.events += 1
+        self.controller.release(key)
+
+    def pressed(self, *keys):
+        self.events += 2 * len(keys)
+        return self.controller.pressed(*keys)
+
+    def type(self, text):
+        self.events += 2 * len(text)
+        self.controller.type(text)
 
 
 class KeyboardManager:
-    def __init__(self, on_record_start, on_record_stop, on_translate_start, on_translate_stop, on_reset_state):
-        self.keyboard = Controller()
+    def __init__(self, on_record_start, on_record_stop, on_translate_start, on_translate_stop, on_reset_state,
+                 status_sink=None, on_key_down=None, on_key_cancel=None):
+        self.keyboard = CountingController(Controller())
         self.option_pressed = False
         self.shift_pressed = False
         self.temp_text_length = 0  # 用于跟踪临时文本的长度
@@ -17,9 +47,25 @@ class KeyboardManager:
         self.warning_message = None  # 用于跟踪警告信息
         self.option_press_time = None  # 记录 Option 按下的时间戳
         self.PRESS_DURATION_THRESHOLD = 0.5  # 按键持续时间阈值（秒）
-        self.is_checking_duration = False  # 用于控制定时器线程
+        self.is_checking_duration = False  # 按住阈值定时器是否已安排
+        self.scheduler = get_scheduler()  # 按住检测、消息清除、剪贴板恢复共用的定时器服务
+        self._hold_call = None  # 按住达到阈值时触发的定时任务
+        self._clear_call = None  # 清除警告/错误消息的定时任务
         self.has_triggered = False  # 用于防止重复触发
         self._original_clipboard = None  # 保存原始剪贴板内容
+        self._result_wait_start = None  # 松开按键、开始等待结果的时间
+        self.first_char_latency = None  # 最近一次听写的首字延迟（秒）
+        self._restore_call = None  # 后台恢复剪贴板的定时任务
+        # 状态显示（默认显示在输入框之外），以及本次听写注入/节省的按键事件数
+        self.status_sink = status_sink or create_status_sink(keyboard_manager=self)
+        self._dictation_events_start = 0
+        self.saved_events = 0
+        self.total_saved_events = 0
+        # 当前听写的编号：上一次听写的结果可能在下一次录音期间才返回，
+        # 只有仍然拥有状态的听写才能把状态改回空闲或显示错误
+        self.dictation_id = 0
+        self.paused = False  # 暂停时忽略热键，监听与录音设备保持常驻
+        self.listener = None
         
         
         # 回调函数
@@ -28,10 +74,13 @@ class KeyboardManager:
         self.on_translate_start = on_translate_start
         self.on_translate_stop = on_translate_stop
         self.on_reset_state = on_reset_state
+        self.on_key_down = on_key_down  # 按下热键（尚未达到按住阈值）
+        self.on_key_cancel = on_key_cancel  # 短按松开，未触发录音
 
         
-        # 状态管理
+        # 状态管理（按键监听线程与流水线工作线程都会修改状态）
         self._state = InputState.IDLE
+        self._state_lock = threading.RLock()
         self._state_messages = {
             InputState.IDLE: "",
             InputState.RECORDING: "🎤 正在录音...",
@@ -42,8 +91,18 @@ class KeyboardManager:
             InputState.WARNING: lambda msg: f"⚠️ {msg}"  # 警告消息使用函数动态生成
         }
 
+        self.apply_config(get_config())
+
+    def apply_config(self, config):
+        """应用热键与文本输入相关的配置，重新加载 .env 时直接调用，不必重建键盘管理器"""
+        self.stream_batch_interval = config.stream_batch_ms / 1000  # 流式输入的批次间隔
+        self.direct_type_max_chars = config.direct_type_max_chars  # 不超过该长度的结果直接按键输入
+        self.direct_type_non_ascii = config.direct_type_non_ascii  # 中文等非 ASCII 文本也直接按键输入
+        self.clipboard_restore_delay = config.clipboard_restore_delay  # 粘贴后延迟恢复剪贴板（秒）
+        self.keep_original_clipboard = config.keep_original_clipboard  # 输入完成后恢复原剪贴板内容
+
         # 获取系统平台
-        sysetem_platform = os.getenv("SYSTEM_PLATFORM")
+        sysetem_platform = config.system_platform
         if sysetem_platform == "win" :
             self.sysetem_platform = Key.ctrl
             logger.info("配置到Windows平台")
@@ -53,14 +112,14 @@ class KeyboardManager:
         
 
         # 获取转录和翻译按钮
-        transcriptions_button = os.getenv("TRANSCRIPTIONS_BUTTON")
+        transcriptions_button = config.transcriptions_button
         try:
             self.transcriptions_button = Key[transcriptions_button]
             logger.info(f"配置到转录按钮：{transcriptions_button}")
         except KeyError:
             logger.error(f"无效的转录按钮配置：{transcriptions_button}")
 
-        translations_button = os.getenv("TRANSLATIONS_BUTTON")
+        translations_button = config.translations_button
         try:
             self.translations_button = Key[translations_button]
             logger.info(f"配置到翻译按钮(与转录按钮组合)：{translations_button}")
@@ -78,6 +137,11 @@ class KeyboardManager:
     @state.setter
     def state(self, new_state):
         """设置新状态并更新UI"""
+        with self._state_lock:
+            self._set_state(new_state)
+
+    def _set_state(self, new_state):
+        """状态切换的具体处理，调用方需持有 _state_lock"""
         if new_state != self._state:
             self._state = new_state
             
@@ -88,72 +152,117 @@ class KeyboardManager:
             match new_state:
                 case InputState.RECORDING :
                     # 录音状态
-                    self.temp_text_length = 0
-                    self.type_temp_text(message)
+                    self._begin_dictation()
+                    self._show_status(new_state, message)
                     self.on_record_start()
                     
                 
                 case InputState.RECORDING_TRANSLATE:
                     # 翻译,录音状态
-                    self.temp_text_length = 0
-                    self.type_temp_text(message)
+                    self._begin_dictation()
+                    self._show_status(new_state, message)
                     self.on_translate_start()
 
                 case InputState.PROCESSING:
-                    self._delete_previous_text()
-                    self.type_temp_text(message)
+                    self._result_wait_start = time.perf_counter()
+                    self._show_status(new_state, message)
                     self.processing_text = message
                     self.on_record_stop()
 
                 case InputState.TRANSLATING:
                     # 翻译状态
-                    self._delete_previous_text()                 
-                    self.type_temp_text(message)
+                    self._result_wait_start = time.perf_counter()
+                    self._show_status(new_state, message)
                     self.processing_text = message
                     self.on_translate_stop()
                 
                 case InputState.WARNING:
                     # 警告状态
                     message = message(self.warning_message)
-                    self._delete_previous_text()
-                    self.type_temp_text(message)
+                    self._show_status(new_state, message)
                     self.warning_message = None
                     self._schedule_message_clear()     
                 
                 case InputState.ERROR:
                     # 错误状态
                     message = message(self.error_message)
-                    self._delete_previous_text()
-                    self.type_temp_text(message)
+                    self._show_status(new_state, message)
                     self.error_message = None
                     self._schedule_message_clear()  
             
                 case InputState.IDLE:
                     # 空闲状态，清除所有临时文本
                     self.processing_text = None
+                    self.status_sink.clear()
+                    self._end_dictation()
                 
                 case _:
                     # 其他状态
-                    self.type_temp_text(message)
+                    self._show_status(new_state, message)
+
+    def _show_status(self, state, message):
+        """显示状态；不在输入框中显示时，记录因此少注入的按键事件"""
+        self.status_sink.show(state, message)
+        if not self.status_sink.in_field:
+            # 输入框内显示需要粘贴（4 个事件）并在之后逐字符退格删除（每字符 2 个事件）
+            self.saved_events += 4 + 2 * len(message)
+
+    def _begin_dictation(self):
+        self.dictation_id += 1
+        self._dictation_events_start = self.keyboard.events
+        self.saved_events = 0
+
+    def _end_dictation(self):
+        """一次听写结束，输出注入和节省的按键事件数"""
+        injected = self.keyboard.events - self._dictation_events_start
+        if not injected and not self.saved_events:
+            return
+        self.total_saved_events += self.saved_events
+        logger.info(f"本次听写注入按键事件 {injected} 个，状态显示节省 {self.saved_events} 个"
+                    f"（累计节省 {self.total_saved_events} 个）")
+        self._dictation_events_start = self.keyboard.events
+        self.saved_events = 0
     
     def _schedule_message_clear(self):
-        """计划清除消息"""
-        def clear_message():
-            time.sleep(2)  # 警告消息显示2秒
-            self.state = InputState.IDLE
-        
-        import threading
-        threading.Thread(target=clear_message, daemon=True).start()
+        """计划清除消息：2 秒后回到空闲状态"""
+        if self._clear_call is not None:
+            self._clear_call.cancel()
+        self._clear_call = self.scheduler.call_later(2, self._clear_message)
+
+    def _clear_message(self):
+        # 消息显示期间已经开始新的录音时不再清除
+        with self._state_lock:
+            self._clear_call = None
+            if self._state in (InputState.WARNING, InputState.ERROR):
+                self._set_state(InputState.IDLE)
     
-    def show_warning(self, warning_message):
-        """显示警告消息"""
-        self.warning_message = warning_message
-        self.state = InputState.WARNING
+    def _is_stale(self, dictation):
+        """dictation 之后已经开始了新的听写（dictation 为 None 表示不区分听写）"""
+        return dictation is not None and dictation != self.dictation_id
+
+    def _finish_dictation(self, dictation=None):
+        """听写完成：仍拥有状态时回到空闲"""
+        with self._state_lock:
+            if not self._is_stale(dictation):
+                self._set_state(InputState.IDLE)
+
+    def show_warning(self, warning_message, dictation=None):
+        """显示警告消息；dictation 已被新的听写取代时只记录日志"""
+        with self._state_lock:
+            if self._is_stale(dictation):
+                logger.warning(f"上一次听写: {warning_message}")
+                return
+            self.warning_message = warning_message
+            self._set_state(InputState.WARNING)
     
-    def show_error(self, error_message):
-        """显示错误消息"""
-        self.error_message = error_message
-        self.state = InputState.ERROR
+    def show_error(self, error_message, dictation=None):
+        """显示错误消息；dictation 已被新的听写取代时只记录日志，不打断正在进行的录音"""
+        with self._state_lock:
+            if self._is_stale(dictation):
+                logger.error(f"上一次听写: {error_message}")
+                return
+            self.error_message = error_message
+            self._set_state(InputState.ERROR)
     
     def _save_clipboard(self):
         """保存当前剪贴板内容"""
@@ -162,60 +271,166 @@ class KeyboardManager:
 
     def _restore_clipboard(self):
         """恢复原始剪贴板内容"""
+        self._cancel_clipboard_restore()
         if self._original_clipboard is not None:
             pyperclip.copy(self._original_clipboard)
             self._original_clipboard = None
 
-    def type_text(self, text, error_message=None):
+    def _schedule_clipboard_restore(self):
+        """粘贴后在后台延迟恢复剪贴板：目标应用异步读取剪贴板，立即恢复可能粘贴出旧内容"""
+        self._cancel_clipboard_restore()
+        self._restore_call = self.scheduler.call_later(self.clipboard_restore_delay, self._restore_clipboard)
+
+    def _cancel_clipboard_restore(self):
+        call, self._restore_call = self._restore_call, None
+        if call is not None:
+            call.cancel()
+
+    def _paste(self, text):
+        """通过剪贴板粘贴文本（模拟 Ctrl/Cmd + V）"""
+        # 新的粘贴会覆盖剪贴板，取消尚未执行的恢复，由本次提交重新安排
+        self._cancel_clipboard_restore()
+        pyperclip.copy(text)
+        with self.keyboard.pressed(self.sysetem_platform):
+            self.keyboard.press('v')
+            self.keyboard.release('v')
+
+    def _can_type(self, text):
+        """能否直接模拟按键输入：中文等非 ASCII 字符的按键会被输入法拦截成拼音或候选词，默认改为粘贴"""
+        return self.direct_type_non_ascii or text.isascii()
+
+    def _commit_text(self, text):
+        """把最终结果提交到输入框，不做固定等待
+
+        短的 ASCII 文本直接模拟按键输入，不经过剪贴板；其余通过剪贴板粘贴，
+        粘贴按键注入后即视为完成，剪贴板的恢复推迟到后台进行。
+        """
+        if len(text) <= self.direct_type_max_chars and self._can_type(text):
+            self.keyboard.type(text)
+            if self.keep_original_clipboard:
+                self._restore_clipboard()
+            else:
+                pyperclip.copy(text)
+        else:
+            self._paste(text)
+            if self.keep_original_clipboard:
+                self._schedule_clipboard_restore()
+
+    def type_text(self, text, error_message=None, dictation=None):
         """将文字输入到当前光标位置
         
         Args:
             text: 要输入的文本或包含文本和错误信息的元组
             error_message: 错误信息
+            dictation: 结果所属听写的编号（dictation_id），用于判断是否仍拥有状态
         """
         # 如果text是元组，说明是从process_audio返回的结果
         if isinstance(text, tuple):
             text, error_message = text
             
         if error_message:
-            self.show_error(error_message)
+            self.show_error(error_message, dictation)
+            return
+
+        if isinstance(text, Iterator):
+            self.type_stream(text, dictation)
             return
             
         if not text:
             # 如果没有文本且不是错误，可能是录音时长不足
             if self.state in (InputState.PROCESSING, InputState.TRANSLATING):
-                self.show_warning("录音时长过短，请至少录制1秒")
+                self.show_warning("录音时长过短，请至少录制1秒", dictation)
             return
             
         try:
             logger.info("正在输入转录文本...")
-            self._delete_previous_text()
-            
-            # 先输入文本和完成标记
-            self.type_temp_text(text+" ✅")
-            
-            # 等待一小段时间确保文本已输入
-            time.sleep(0.5)
-            
-            # 删除完成标记（2个字符：空格和✅）
-            self.temp_text_length = 2
-            self._delete_previous_text()
-            
-            # 将转录结果复制到剪贴板
-            if os.getenv("KEEP_ORIGINAL_CLIPBOARD", "true").lower() != "true":
-                pyperclip.copy(text)
-            else:
-                # 恢复原始剪贴板内容
-                self._restore_clipboard()
-            
+            with span("inject", chars=len(text)):
+                self._delete_previous_text()
+                self._commit_text(text)
+            self._record_first_char()
             logger.info("文本输入完成")
             
             # 清理处理状态
-            self.state = InputState.IDLE
+            self._finish_dictation(dictation)
         except Exception as e:
             logger.error(f"文本输入失败: {e}")
-            self.show_error(f"❌ 文本输入失败: {e}")
+            self.show_error(f"❌ 文本输入失败: {e}", dictation)
     
+    def type_stream(self, chunks, dictation=None):
+        """边接收边输入流式结果
+
+        片段按 stream_batch_interval 合并成批次。ASCII 批次用按键直接输入，不经过剪贴板；
+        含中文等非 ASCII 字符的批次通过剪贴板粘贴，相邻两次粘贴至少间隔 stream_batch_interval，
+        避免目标应用还未读取剪贴板时内容就被后一批覆盖。
+        """
+        typed = []
+        pending = []
+        last_flush = 0.0
+        last_paste = None
+
+        def flush():
+            nonlocal last_paste
+            if not typed:
+                self._delete_previous_text()  # 第一批到达时才删除状态文本
+            batch = "".join(pending)
+            pending.clear()
+            if self._can_type(batch):
+                self.keyboard.type(batch)
+            else:
+                if last_paste is not None:
+                    wait = self.stream_batch_interval - (time.perf_counter() - last_paste)
+                    if wait > 0:
+                        time.sleep(wait)  # 只有最后一批可能紧跟在上一次粘贴之后
+                self._paste(batch)
+                last_paste = time.perf_counter()
+            typed.append(batch)
+            if len(typed) == 1:
+                self._record_first_char()
+
+        try:
+            logger.info("正在流式输入文本...")
+            with span("inject_stream"):  # 包含等待 LLM 流式输出的时间
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    pending.append(chunk)
+                    now = time.perf_counter()
+                    # 第一批立即输入，之后按间隔合并
+                    if not typed or now - last_flush >= self.stream_batch_interval:
+                        flush()
+                        last_flush = now
+                if pending:
+                    flush()
+        except Exception as e:
+            logger.error(f"流式输入失败: {e}")
+            self.show_error(f"❌ 流式输入失败: {e}", dictation)
+            return
+
+        text = "".join(typed)
+        if not text:
+            if self.state in (InputState.PROCESSING, InputState.TRANSLATING):
+                self.show_warning("录音时长过短，请至少录制1秒", dictation)
+            return
+
+        logger.info(f"流式输入完成: {text}（{len(typed)} 批）")
+        if not self.keep_original_clipboard:
+            pyperclip.copy(text)
+        elif last_paste is not None:
+            self._schedule_clipboard_restore()
+        else:
+            self._restore_clipboard()
+        self._finish_dictation(dictation)
+
+    def _record_first_char(self):
+        """记录从松开按键到第一个字符出现在输入框的延迟"""
+        if self._result_wait_start is None:
+            return
+        now = time.perf_counter()
+        self.first_char_latency = now - self._result_wait_start
+        add_span("first_char", self._result_wait_start, now)
+        self._result_wait_start = None
+        logger.info(f"首字延迟: {self.first_char_latency:.2f}秒")
+
     def _delete_previous_text(self):
         """删除之前输入的临时文本"""
         if self.temp_text_length > 0:
@@ -230,55 +445,56 @@ class KeyboardManager:
         if not text:
             return
             
-        # 将文本复制到剪贴板
-        pyperclip.copy(text)
-
-        # 模拟 Ctrl + V 粘贴文本
-        with self.keyboard.pressed(self.sysetem_platform):
-            self.keyboard.press('v')
-            self.keyboard.release('v')
+        # 通过剪贴板粘贴文本
+        self._paste(text)
 
         # 更新临时文本长度
         self.temp_text_length = len(text)
     
     def start_duration_check(self):
-        """开始检查按键持续时间"""
+        """开始检查按键持续时间：在达到阈值的时刻触发一次，松开按键时取消"""
         if self.is_checking_duration:
             return
+        self.is_checking_duration = True
+        self._hold_call = self.scheduler.call_later(self.PRESS_DURATION_THRESHOLD, self._on_hold_threshold)
 
-        def check_duration():
-            while self.is_checking_duration and self.option_pressed:
-                current_time = time.time()
-                if (not self.has_triggered and 
-                    self.option_press_time and 
-                    (current_time - self.option_press_time) >= self.PRESS_DURATION_THRESHOLD):
-                    
-                    # 达到阈值时触发相应功能
-                    if self.option_pressed and self.shift_pressed and self.state.can_start_recording:
-                        self.state = InputState.RECORDING_TRANSLATE
-                        # self.on_translate_start()
-                        self.has_triggered = True
-                    elif self.option_pressed and not self.shift_pressed and self.state.can_start_recording:
-                        self.state = InputState.RECORDING
-                        # self.on_record_start()
-                        self.has_triggered = True
-                
-                time.sleep(0.01)  # 短暂休眠以降低 CPU 使用率
+    def _cancel_duration_check(self):
+        self.is_checking_duration = False
+        call, self._hold_call = self._hold_call, None
+        if call is not None:
+            call.cancel()
 
-        self.is_checking_duration = True
-        import threading
-        threading.Thread(target=check_duration, daemon=True).start()
+    def _on_hold_threshold(self):
+        """按键按住达到阈值时触发相应功能"""
+        with self._state_lock:
+            self._hold_call = None
+            self.is_checking_duration = False
+            if not self.option_pressed or self.has_triggered or not self._state.can_start_recording:
+                return
+            if self.shift_pressed:
+                self._set_state(InputState.RECORDING_TRANSLATE)
+            else:
+                self._set_state(InputState.RECORDING)
+            self.has_triggered = True
 
     def on_press(self, key):
         """按键按下时的回调"""
+        if self.paused:
+            return
         try:
             if key == self.transcriptions_button: #Key.f8:  # Option 键按下
-                # 在开始任何操作前保存剪贴板内容
+                # 在开始任何操作前保存剪贴板内容；上次听写的剪贴板恢复尚未执行时，
+                # 取消它并沿用已保存的原始内容，留到本次提交后再恢复
+                self._cancel_clipboard_restore()
                 if self._original_clipboard is None:
                     self._original_clipboard = pyperclip.paste()
                     
+                # 按键自动重复时不重新计时
+                if not self.option_pressed:
+                    self.option_press_time = time.time()
+                    if self.on_key_down is not None and self.state.can_start_recording:
+                        self.on_key_down()
                 self.option_pressed = True
-                self.option_press_time = time.time()
                 self.start_duration_check()
             elif key == self.translations_button:
                 self.shift_pressed = True
@@ -287,19 +503,29 @@ class KeyboardManager:
 
     def on_release(self, key):
         """按键释放时的回调"""
+        if self.paused:
+            return
         try:
             if key == self.transcriptions_button:# Key.f8:  # Option 键释放
-                self.shift_pressed = False
-                self.option_pressed = False
-                self.option_press_time = None
-                self.is_checking_duration = False
+                # 与按住阈值定时任务互斥，避免松开的同时开始录音
+                with self._state_lock:
+                    self.shift_pressed = False
+                    self.option_pressed = False
+                    self.option_press_time = None
+                    self._cancel_duration_check()
                 
-                if self.has_triggered:
-                    if self.state == InputState.RECORDING_TRANSLATE:
-                        self.state = InputState.TRANSLATING
-                    elif self.state == InputState.RECORDING:
-                        self.state = InputState.PROCESSING
-                    self.has_triggered = False
+                    if self.has_triggered:
+                        if self.state == InputState.RECORDING_TRANSLATE:
+                            self.state = InputState.TRANSLATING
+                        elif self.state == InputState.RECORDING:
+                            self.state = InputState.PROCESSING
+                        self.has_triggered = False
+                    else:
+                        if self.on_key_cancel is not None:
+                            self.on_key_cancel()
+                        if self.state == InputState.IDLE and self._original_clipboard is not None:
+                            # 短按未触发录音：重新安排被按下时取消的剪贴板恢复
+                            self._schedule_clipboard_restore()
             elif key == self.translations_button:#Key.f7:
                 self.shift_pressed = False
                 if (self.state == InputState.RECORDING_TRANSLATE and 
@@ -313,10 +539,33 @@ class KeyboardManager:
     def start_listening(self):
         """开始监听键盘事件"""
         with Listener(on_press=self.on_press, on_release=self.on_release) as listener:
+            self.listener = listener
             listener.join()
+        self.listener = None
+
+    def stop_listening(self):
+        """停止监听键盘事件，start_listening 随之返回"""
+        if self.listener is not None:
+            self.listener.stop()
+
+    def set_paused(self, paused):
+        """暂停或恢复响应热键；暂停时放弃正在按住的热键"""
+        with self._state_lock:
+            self.paused = paused
+            if paused:
+                self.option_pressed = False
+                self.shift_pressed = False
+                self.option_press_time = None
+                self._cancel_duration_check()
 
-    def reset_state(self):
-        """重置所有状态和临时文本"""
+    def reset_state(self, dictation=None):
+        """重置所有状态和临时文本；dictation 已被新的听写取代时不做任何事"""
+        with self._state_lock:
+            if self._is_stale(dictation):
+                return
+            self._reset_state()
+
+    def _reset_state(self):
         # 清除临时文本
         self._delete_previous_text()
         
@@ -327,14 +576,14 @@ class KeyboardManager:
         self.option_pressed = False
         self.shift_pressed = False
         self.option_press_time = None
-        self.is_checking_duration = False
+        self._cancel_duration_check()
         self.has_triggered = False
         self.processing_text = None
         self.error_message = None
         self.warning_message = None
         
         # 设置为空闲状态
-        self.state = InputState.IDLE
+        self._set_state(InputState.IDLE)
 
 def check_accessibility_permissions():
     """检查是否有辅助功能权限并提供指导"""
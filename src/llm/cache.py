@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from ..utils.config import get_config
+from ..utils.logger import logger
+from ..utils.scheduler import get_scheduler
+
+
+def normalize_text(text):
+    """归一化输入文本：统一全半角、去掉首尾空白、合并连续空白"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ResultCache:
+    """LLM 后处理结果的 LRU 缓存
+
+    以 (操作, 模型, 提示词, 归一化文本) 为键，按条目数和 TTL 淘汰，
+    可选持久化到磁盘 JSON 文件，重启后仍然有效。写入后延迟 SAVE_DELAY 秒在后台保存，
+    期间的多次写入合并为一次；退出前调用 flush() 保存尚未写入的修改。
+    """
+
+    SAVE_DELAY = 1.0
+
+    def __init__(self, max_entries=512, ttl=7 * 24 * 3600, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (写入时间, 结果)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 同一时刻只有一个线程写文件，后拿到锁的写入更新的快照
+        self._save_call = None  # 已安排的延迟保存
+        if path:
+            self._load()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(operation, model, prompt, text):
+        raw = json.dumps([operation, model, prompt, normalize_text(text)], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, operation, model, prompt, text):
+        """查询缓存，未命中或已过期时返回 None"""
+        if not self.enabled:
+            return None
+        key = self.make_key(operation, model, prompt, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, operation, model, prompt, text, result):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if not self.enabled or not isinstance(result, str) or not result:
+            return
+        key = self.make_key(operation, model, prompt, text)
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path and self._save_call is None:
+                self._save_call = get_scheduler().call_later(self.SAVE_DELAY, self.flush)
+
+    def flush(self):
+        """把尚未保存的修改写入磁盘"""
+        with self._save_lock:
+            with self._lock:
+                call, self._save_call = self._save_call, None
+                if call is None:
+                    return
+                call.cancel()
+                snapshot = list(self._entries.items())
+            self._save(snapshot)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"读取结果缓存失败: {e}")
+            return
+        if not isinstance(data, list):
+            logger.warning(f"结果缓存格式无效，忽略: {self.path}")
+            return
+        now = time.time()
+        skipped = 0
+        for entry in data[-self.max_entries:]:
+            # 被截断或手动修改过的文件中格式不对的条目直接跳过
+            try:
+                key, created, result = entry
+                fresh = now - created <= self.ttl
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            if not isinstance(key, str) or not isinstance(result, str):
+                skipped += 1
+            elif fresh:
+                self._entries[key] = (created, result)
+        if skipped:
+            logger.warning(f"结果缓存中有 {skipped} 条格式无效，已跳过")
+        logger.info(f"已加载结果缓存: {len(self._entries)} 条")
+
+    def _save(self, snapshot):
+        """原子写入：先写同目录下的唯一临时文件再替换，多个进程共用同一缓存文件时也不会互相覆盖临时文件"""
+        tmp_path = None
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory or ".", delete=False,
+                                             prefix=f"{os.path.basename(self.path)}.", suffix=".tmp") as f:
+                tmp_path = f.name
+                json.dump([[key, created, result] for key, (created, result) in snapshot], f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"保存结果缓存失败: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """获取进程内共享的结果缓存（按当前配置）；缓存配置修改后返回新建的缓存"""
+    global _cache
+    config = get_config()
+    settings = (config.llm_cache_size, config.llm_cache_ttl, config.llm_cache_path)
+    with _cache_lock:
+        if _cache is None or _cache[0] != settings:
+            if _cache is not None:
+                _cache[1].flush()
+            _cache = (settings, ResultCache(max_entries=settings[0], ttl=settings[1], path=settings[2]))
+        return _cache[1]
+
+
+def cache_stats():
+    """当前结果缓存的条目数与命中统计，尚未用到 LLM 后处理时返回 None"""
+    cache = _cache[1] if _cache is not None else None
+    return cache.stats() if cache is not None and cache.enabled else None
+
+
+def log_cache_stats():
+    """输出结果缓存统计"""
+    stats = cache_stats()
+    if stats is not None:
+        logger.info(f"结果缓存: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, "
+                    f"命中率 {stats['hit_rate']:.0%}, 条目 {stats['entries']} 条")
+
+
+def flush_cache():
+    """退出前保存结果缓存中尚未写入磁盘的修改"""
+    if _cache is not None:
+        _cache[1].flush()
@@ -0,0 +1,41 @@
+import codecs
+import json
+
+
+def iter_sse_data(byte_chunks):
+    """解析 Server-Sent Events 字节流，逐个返回 data 字段
+
+    网络分块可能把一个多字节字符拆到两块中，这里用增量解码器解码，
+    不完整的字节会留到下一块再拼接，而不是被替换成乱码。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    data = []
+    for chunk in byte_chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line = line.rstrip("\r")
+            if not line:
+                # 空行表示一个事件结束
+                if data:
+                    yield "\n".join(data)
+                    data = []
+            elif line.startswith("data:"):
+                data.append(line[5:].lstrip(" "))
+    buffer += decoder.decode(b"", final=True)
+    if buffer.startswith("data:"):
+        data.append(buffer[5:].lstrip(" "))
+    if data:
+        yield "\n".join(data)
+
+
+def iter_chat_deltas(byte_chunks):
+    """从 OpenAI 兼容的流式对话补全响应中逐段返回新增文本"""
+    for data in iter_sse_data(byte_chunks):
+        if data == "[DONE]":
+            return
+        choices = json.loads(data).get("choices") or [{}]
+        content = (choices[0].get("delta") or {}).get("content")
+        if content:
+            yield content
@@ -1,14 +1,47 @@
 from openai import OpenAI
-import dotenv
-import os
+from ..utils.config import get_config
+from ..utils.httpClient import get_client
+from .cache import get_cache
 from ..utils.logger import logger
+from ..utils.tracing import span
 
-dotenv.load_dotenv()
+# 合并后处理时各步骤的指令，按固定顺序拼接成一个系统提示词
+# 翻译不在其中：groq 由 Whisper 的 translations 接口直接输出英文，硅基流动使用单独配置的
+# 翻译服务（TRANSLATE_API_URL，见 translate.py），与这里的 LLM 不是同一个接口
+FUSED_STEPS = {
+    "add_symbol": "Add appropriate punctuation.",
+    "optimize": "Fix obvious speech recognition errors based on your knowledge; if the input is fine, keep it unchanged.",
+}
 
 class SymbolProcessor:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("GROQ_API_KEY"), base_url=os.getenv("GROQ_BASE_URL"))
-        self.model = os.getenv("GROQ_ADD_SYMBOL_MODEL", "llama3-8b-8192")
+        config = get_config()
+        base_url = config.groq_base_url
+        self.client = OpenAI(
+            api_key=config.groq_api_key,
+            base_url=base_url,
+            http_client=get_client(base_url or "https://api.openai.com/v1")
+        )
+        self.model = config.symbol_model
+        self.cache = get_cache()
+
+    def _complete(self, operation, system_prompt, text):
+        """调用对话补全接口，相同的输入直接返回缓存结果"""
+        cached = self.cache.get(operation, self.model, system_prompt, text)
+        if cached is not None:
+            logger.info(f"命中结果缓存: {operation}")
+            return cached
+        with span(f"llm:{operation}"):
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": text}
+                ]
+            )
+        result = response.choices[0].message.content
+        self.cache.put(operation, self.model, system_prompt, text, result)
+        return result
 
     def add_symbol(self, text):
         """为输入的文本添加合适的标点符号"""
@@ -18,14 +51,7 @@ class SymbolProcessor:
         """
         try:
             logger.info(f"正在添加标点符号...")
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ]
-        )
-            return response.choices[0].message.content
+            return self._complete("add_symbol", system_prompt, text)
         except Exception as e:
             return text, e
         
@@ -57,13 +83,73 @@ class SymbolProcessor:
         """
         try:
             logger.info(f"正在优化识别结果...")
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ]
-        )
-            return response.choices[0].message.content
+            return self._complete("optimize_result", system_prompt, text)
+        except Exception as e:
+            return text, e
+
+    def process(self, text, steps):
+        """在一次请求中完成所有启用的后处理步骤（添加标点、优化）
+
+        Args:
+            text: 识别结果
+            steps: 启用的步骤，取值见 FUSED_STEPS
+
+        Returns:
+            str: 处理后的文本；请求失败时返回原文
+        """
+        steps, system_prompt = self._fused_prompt(steps)
+        if not steps or not text:
+            return text
+        try:
+            logger.info(f"正在合并后处理: {', '.join(steps)}...")
+            return self._complete("+".join(steps), system_prompt, text)
+        except Exception as e:
+            logger.error(f"合并后处理失败: {e}")
+            return text
+
+    def process_stream(self, text, steps):
+        """流式版本的 process：逐段返回结果，请求失败且尚未输出任何内容时返回原文"""
+        steps, system_prompt = self._fused_prompt(steps)
+        operation = "+".join(steps)
+        cached = self.cache.get(operation, self.model, system_prompt, text) if steps and text else None
+        if not steps or not text or cached is not None:
+            yield cached if cached is not None else text
+            return
+
+        pieces = []
+        try:
+            logger.info(f"正在流式合并后处理: {', '.join(steps)}...")
+            with span(f"llm:{operation}", stream=True):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": text}
+                    ],
+                    stream=True
+                )
+                for event in response:
+                    delta = event.choices[0].delta.content if event.choices else None
+                    if delta:
+                        pieces.append(delta)
+                        yield delta
         except Exception as e:
-            return text, e
\ No newline at end of file
+            logger.error(f"流式后处理失败: {e}")
+            if not pieces:
+                yield text
+            return
+        self.cache.put(operation, self.model, system_prompt, text, "".join(pieces))
+
+    def _fused_prompt(self, steps):
+        """按固定顺序筛选启用的步骤，并拼接成一个系统提示词"""
+        steps = [step for step in FUSED_STEPS if step in steps]
+        instructions = "\n".join(f"{i}. {FUSED_STEPS[step]}" for i, step in enumerate(steps, 1))
+        system_prompt = f"""
+        You are a speech recognition post-processor.
+        Apply the following steps to the user's input in a single pass and output only the final text:
+        {instructions}
+        Do not change the user's language.
+        Do not add any explanation.
+        Do not answer the user's question.
+        """
+        return steps, system_prompt
@@ -1,37 +1,40 @@
-import os
-import requests
-from dotenv import load_dotenv
-# from src.utils.logger import logger
-
-load_dotenv()
+from ..utils.config import get_config
+from ..utils.httpClient import get_client
+from .cache import get_cache
+from .stream import iter_chat_deltas
+from ..utils.logger import logger
+from ..utils.tracing import span
 
 class TranslateProcessor:
     def __init__(self):
-        self.url = os.getenv("TRANSLATE_API_URL")
+        config = get_config()
+        self.url = config.translate_api_url
         assert self.url, "未设置 TRANSLATE_API_URL 环境变量"
+        self.client = get_client(self.url)
         
-        self.api_key = os.getenv("TRANSLATE_API_KEY")
+        self.api_key = config.translate_api_key
         self.headers = {
             "Content-Type": "application/json"
         }
         if self.api_key:
             self.headers['Authorization'] = f"Bearer {self.api_key}"
             
-        self.model = os.getenv("TRANSLATE_MODEL")
+        self.model = config.translate_model
         assert self.model, "未设置 TRANSLATE_MODEL 环境变量"
+        self.cache = get_cache()
 
-    def translate(self, text):
-        system_prompt = """
+    SYSTEM_PROMPT = """
         You are a translation assistant.
         Please translate the user's input into English.
         """
 
+    def _payload(self, text, stream=False):
         payload = {
             "model": self.model,
             "messages":[
                 {
                     "role": "system",
-                    "content": system_prompt
+                    "content": self.SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -39,10 +42,43 @@ class TranslateProcessor:
                 }
             ]
         }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def translate(self, text):
+        """翻译成英文，请求失败时抛出异常（由 process_audio 作为错误返回）"""
+        cached = self.cache.get("translate", self.model, self.SYSTEM_PROMPT, text)
+        if cached is not None:
+            return cached
+
+        with span("translate"):
+            response = self.client.post(self.url, headers=self.headers, json=self._payload(text))
+        # logger.info(f"调用翻译 API: {self.url}, model: {self.model}, 状态码: {response.status_code}, api_key: {self.api_key}")
+        # logger.info(f"翻译 API 响应: {response.text}")
+        response.raise_for_status()
+        result = response.json().get('choices', [{}])[0].get('message', {}).get('content', '')
+        self.cache.put("translate", self.model, self.SYSTEM_PROMPT, text, result)
+        return result
+
+    def translate_stream(self, text):
+        """流式翻译：逐段返回译文，请求失败且尚未输出任何内容时返回原文"""
+        cached = self.cache.get("translate", self.model, self.SYSTEM_PROMPT, text)
+        if cached is not None:
+            yield cached
+            return
+
+        pieces = []
         try:
-            response = requests.request("POST", self.url, headers=self.headers, json=payload)
-            # logger.info(f"调用翻译 API: {self.url}, model: {self.model}, 状态码: {response.status_code}, api_key: {self.api_key}")
-            # logger.info(f"翻译 API 响应: {response.text}")
-            return response.json().get('choices', [{}])[0].get('message', {}).get('content', '')
+            with span("translate", stream=True), \
+                    self.client.stream("POST", self.url, headers=self.headers, json=self._payload(text, stream=True)) as response:
+                response.raise_for_status()
+                for delta in iter_chat_deltas(response.iter_bytes()):
+                    pieces.append(delta)
+                    yield delta
         except Exception as e:
-            return text, e
+            logger.error(f"流式翻译失败: {e}")
+            if not pieces:
+                yield text
+            return
+        self.cache.put("translate", self.model, self.SYSTEM_PROMPT, text, "".join(pieces))
@@ -0,0 +1,7 @@
+"""流水线模块
+在按键监听线程之外执行录音、编码、转录、后处理和文本输入
+"""
+
+from .engine import PipelineEngine
+
+__all__ = ['PipelineEngine']
@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.logger import logger
+
+
+class PipelineEngine:
+    """后台流水线引擎
+
+    按键回调只负责投递任务并立即返回，任务由专用工作线程按投递顺序执行，
+    这样 录音 → 编码 → 转录 → 后处理 → 输入 的整个过程都不会阻塞系统键盘钩子。
+    """
+
+    def __init__(self, name="pipeline"):
+        self.name = name
+        # 单个工作线程保证"开始录音"一定先于"停止录音"执行
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        """尚未完成的任务数"""
+        with self._lock:
+            return self._pending
+
+    def submit(self, func, *args, on_error=None, **kwargs):
+        """投递任务，返回 Future；任务抛出的异常会被记录并交给 on_error"""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def job():
+            waited = time.perf_counter() - submitted_at
+            if waited > 0.1:
+                logger.info(f"任务 {func.__name__} 排队 {waited:.2f}秒")
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"流水线任务 {func.__name__} 出错: {e}", exc_info=True)
+                if on_error is not None:
+                    on_error(e)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+        return self._executor.submit(job)
+
+    def shutdown(self, wait=True):
+        """停止接收新任务，wait 为 True 时等待已投递的任务完成"""
+        self._executor.shutdown(wait=wait)
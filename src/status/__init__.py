@@ -0,0 +1,9 @@
+"""状态显示模块
+把录音、转录、错误等状态显示在输入框之外（终端标题、本地套接字等），
+不再向用户的输入框粘贴和删除临时文本
+"""
+
+from .sinks import FieldStatusSink, MultiStatusSink, NullStatusSink, SocketStatusSink, TerminalStatusSink, create_status_sink
+
+__all__ = ['FieldStatusSink', 'MultiStatusSink', 'NullStatusSink', 'SocketStatusSink', 'TerminalStatusSink',
+           'create_status_sink']
@@ -0,0 +1,136 @@
+import json
+import socket
+import sys
+import time
+
+from ..utils.config import get_config
+from ..utils.logger import logger
+
+DEFAULT_SOCKET_ADDR = "127.0.0.1:47800"
+
+
+class NullStatusSink:
+    """不显示任何状态"""
+
+    in_field = False  # 是否通过向输入框注入按键来显示状态
+
+    def show(self, state, message):
+        pass
+
+    def clear(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TerminalStatusSink(NullStatusSink):
+    """在终端显示状态：交互式终端中写入窗口标题，不与日志输出混在一起；否则写入日志"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self.is_tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+
+    def show(self, state, message):
+        if self.is_tty:
+            self.stream.write(f"\x1b]0;{message}\x07")
+            self.stream.flush()
+        else:
+            logger.info(f"状态: {message}")
+
+    def clear(self):
+        if self.is_tty:
+            self.stream.write("\x1b]0;Whisper Input\x07")
+            self.stream.flush()
+
+
+class SocketStatusSink(NullStatusSink):
+    """把状态以 JSON 数据报发送到本地 UDP 端口，供控制界面等工具显示
+
+    UDP 发送不会阻塞，没有监听方时数据报直接丢弃。
+    """
+
+    def __init__(self, addr=DEFAULT_SOCKET_ADDR):
+        host, _, port = addr.rpartition(":")
+        self.addr = (host or "127.0.0.1", int(port))
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def _send(self, state, message):
+        payload = {"state": state, "message": message, "time": time.time()}
+        try:
+            self.sock.sendto(json.dumps(payload, ensure_ascii=False).encode("utf-8"), self.addr)
+        except OSError:
+            pass  # 没有监听方或缓冲区已满时丢弃
+
+    def show(self, state, message):
+        self._send(state.name, message)
+
+    def clear(self):
+        self._send("IDLE", "")
+
+    def close(self):
+        self.sock.close()
+
+
+class FieldStatusSink(NullStatusSink):
+    """旧的显示方式：把状态文本粘贴到输入框，下次更新时逐字符退格删除"""
+
+    in_field = True
+
+    def __init__(self, keyboard_manager):
+        self.keyboard_manager = keyboard_manager
+
+    def show(self, state, message):
+        manager = self.keyboard_manager
+        if state.is_recording:
+            manager.temp_text_length = 0
+        else:
+            manager._delete_previous_text()
+        manager.type_temp_text(message)
+
+
+class MultiStatusSink(NullStatusSink):
+    """同时输出到多个状态显示"""
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+        self.in_field = any(sink.in_field for sink in sinks)
+
+    def show(self, state, message):
+        for sink in self.sinks:
+            sink.show(state, message)
+
+    def clear(self):
+        for sink in self.sinks:
+            sink.clear()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def create_status_sink(spec=None, keyboard_manager=None):
+    """按配置创建状态显示
+
+    Args:
+        spec: 逗号分隔的显示方式（terminal / socket / field / none），默认读取 STATUS_SINK
+        keyboard_manager: field 方式需要的键盘管理器
+    """
+    config = get_config()
+    spec = spec if spec is not None else config.status_sink
+    sinks = []
+    for name in (part.strip().lower() for part in spec.split(",")):
+        if name == "terminal":
+            sinks.append(TerminalStatusSink())
+        elif name == "socket":
+            sinks.append(SocketStatusSink(config.status_socket_addr))
+        elif name == "field":
+            sinks.append(FieldStatusSink(keyboard_manager))
+        elif name in ("none", ""):
+            continue
+        else:
+            logger.error(f"未知的状态显示方式: {name}")
+    if not sinks:
+        return NullStatusSink()
+    return sinks[0] if len(sinks) == 1 else MultiStatusSink(sinks)
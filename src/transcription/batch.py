@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import soundfile as sf
+
+from ..audio.encoder import AudioEncoder, PcmBuffer
+from ..audio.resampler import TARGET_SAMPLE_RATE, resample
+from ..utils.config import get_config
+from ..utils.logger import logger
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".opus", ".mp3", ".aiff", ".aif")
+MODES = ("transcriptions", "translations")
+
+
+def collect_inputs(source, mode="transcriptions"):
+    """列出要转录的文件，返回 [(绝对路径, 模式)]
+
+    source 为目录时递归查找音频文件并按路径排序；否则视为清单文件：每行一个路径
+    （相对清单所在目录），或一个 JSON 对象 {"path": ..., "mode": ...}，空行和 # 开头的行忽略。
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(AUDIO_EXTENSIONS))
+        return [(os.path.abspath(path), mode) for path in sorted(paths)]
+
+    base = os.path.dirname(os.path.abspath(source))
+    items = []
+    with open(source, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path, item_mode = line, mode
+            if line.startswith("{"):
+                entry = json.loads(line)
+                path, item_mode = entry["path"], entry.get("mode", mode)
+            if item_mode not in MODES:
+                raise ValueError(f"{source} 第 {number} 行: 无效的模式 {item_mode}")
+            items.append((os.path.abspath(os.path.join(base, path)), item_mode))
+    return items
+
+
+def load_audio(path, accepts_pcm=False, codec="flac"):
+    """读取音频文件并转换为 16kHz 单声道，返回 (交给后端的音频数据, 时长秒)
+
+    与录音器的输出相同：进程内后端得到 PcmBuffer，其余后端得到编码后的字节流
+    """
+    audio, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+    samples = resample(audio, sample_rate)
+    seconds = len(samples) / TARGET_SAMPLE_RATE
+    if accepts_pcm:
+        return PcmBuffer(samples, TARGET_SAMPLE_RATE), seconds
+    return AudioEncoder.encode(samples, TARGET_SAMPLE_RATE, codec=codec), seconds
+
+
+class ResultJournal:
+    """JSONL 结果文件，同时记录断点续传的进度
+
+    每转录完一个文件立即追加一行并刷新到磁盘，中断后再次运行时跳过已成功的文件，
+    失败的文件会重新转录（同一文件以最后一行为准）。中断时写了一半的行会被忽略。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()  # 已成功的 (路径, 模式)
+        needs_newline = False
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            needs_newline = bool(data) and not data.endswith(b"\n")
+            for line in data.decode("utf-8", errors="replace").splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                key = (record.get("path"), record.get("mode"))
+                if record.get("error") is None:
+                    self.completed.add(key)
+                else:
+                    self.completed.discard(key)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+        self._lock = threading.Lock()
+
+    def is_done(self, path, mode):
+        return (path, mode) in self.completed
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if record["error"] is None:
+                self.completed.add((record["path"], record["mode"]))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BatchTranscriber:
+    """离线批量转录：多个文件并发经过 process_audio（转录 + 后处理）
+
+    workers 限制同时进行的后端请求数；读取和编码在各自的工作线程中完成，
+    同一时刻内存中最多只有 workers 个文件的音频。
+    """
+
+    def __init__(self, processor, workers=4):
+        if workers < 1:
+            raise ValueError(f"并发数必须大于 0: {workers}")
+        self.processor = processor
+        self.workers = workers
+        config = get_config()
+        self.codec = config.audio_codec
+        if workers > config.http_max_connections:
+            logger.warning(f"并发数 {workers} 超过 HTTP_MAX_CONNECTIONS={config.http_max_connections}，多出的请求会排队等待连接")
+
+    def transcribe_file(self, path, mode="transcriptions"):
+        """转录一个文件，返回结果记录；读取或转录失败时 error 为错误信息"""
+        start_time = time.perf_counter()
+        record = {"path": path, "mode": mode, "text": None, "error": None, "audio_seconds": None}
+        try:
+            audio, record["audio_seconds"] = load_audio(
+                path, accepts_pcm=getattr(self.processor, "accepts_pcm", False), codec=self.codec)
+            text, error = self.processor.process_audio(audio, mode=mode, prompt="")
+            if isinstance(text, Iterator):
+                text = "".join(text)  # 启用 LLM_STREAM 时后处理结果是文本片段的迭代器
+            if error is None and not isinstance(text, str):
+                text, error = None, f"❌ 无效的处理结果: {text!r}"
+            record["text"], record["error"] = text, error
+        except Exception as e:
+            record["error"] = f"❌ {e}"
+        record["elapsed"] = round(time.perf_counter() - start_time, 3)
+        return record
+
+    def run(self, items, journal):
+        """转录 items 中尚未完成的文件，结果写入 journal，返回统计信息"""
+        pending = [(path, mode) for path, mode in items if not journal.is_done(path, mode)]
+        skipped = len(items) - len(pending)
+        if skipped:
+            logger.info(f"跳过已完成的 {skipped} 个文件")
+        logger.info(f"开始转录 {len(pending)} 个文件，并发数 {self.workers}")
+
+        start_time = time.perf_counter()
+        records = []
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        try:
+            futures = [executor.submit(self.transcribe_file, path, mode) for path, mode in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                journal.write(record)
+                records.append(record)
+                progress = f"[{len(records)}/{len(pending)}] {record['path']}"
+                if record["error"]:
+                    logger.error(f"{progress}: {record['error']}")
+                else:
+                    logger.info(f"{progress}: {record['audio_seconds']:.1f}秒音频, 耗时 {record['elapsed']:.1f}秒")
+        except KeyboardInterrupt:
+            logger.warning(f"已中断：完成的 {len(records)} 个文件已写入 {journal.path}，再次运行时会跳过")
+            raise
+        finally:
+            # 中断或写入结果出错时取消尚未开始的文件；正常结束时所有任务都已完成
+            executor.shutdown(wait=False, cancel_futures=True)
+        return self._summary(records, skipped, time.perf_counter() - start_time)
+
+    @staticmethod
+    def _summary(records, skipped, wall_seconds):
+        ok = [r for r in records if r["error"] is None]
+        audio_seconds = sum(r["audio_seconds"] for r in ok)
+        latencies = [r["elapsed"] for r in ok]
+        p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (None, None)
+        return {
+            "files": len(records),
+            "skipped": skipped,
+            "succeeded": len(ok),
+            "failed": len(records) - len(ok),
+            "audio_seconds": audio_seconds,
+            "wall_seconds": wall_seconds,
+            # 吞吐量：每秒墙钟时间转录的音频秒数
+            "throughput": audio_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+            "latency_p50": p50,
+            "latency_p95": p95,
+        }
@@ -0,0 +1,179 @@
+import io
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from ..utils.config import get_config
+from ..utils.deadline import Cancelled
+from ..utils.logger import logger
+from ..utils.tracing import current_trace, span
+
+
+class HedgedProcessor:
+    """对冲请求：把同一段音频发给两个转录后端，先成功返回的结果胜出
+
+    主后端立即发送；等待 delay 秒仍未返回（或已经失败）时再发给备用后端，
+    delay 为 0 时两个后端同时发送。胜出后取消另一方：尚未开始的请求直接取消（cancelled），
+    已在途的请求（abandoned）通过共享的取消标志中止，后端在下一个检查点（收到响应头、
+    每块响应数据、本地模型的每个片段）关闭响应并放弃，最迟由截止时间（Deadline）兜底。
+    """
+
+    def __init__(self, primary, secondary, delay=0.5):
+        self.backends = [("primary", primary), ("secondary", secondary)]
+        self.delay = delay
+        self.timeout_seconds = max(primary.timeout_seconds, secondary.timeout_seconds)
+        # 被放弃的请求要等到下一个检查点才退出，期间仍占用线程：每个后端同时在途的请求
+        # 最多为连接池上限（多出的请求本来也只能排队等连接），按此给每个后端留足线程，
+        # 新的对冲请求不会排在被放弃的请求后面。线程按需创建，上限大不增加开销
+        self._executor = ThreadPoolExecutor(max_workers=2 * get_config().http_max_connections,
+                                            thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self.stats = {
+            name: {"requests": 0, "wins": 0, "errors": 0, "cancelled": 0, "abandoned": 0,
+                   "latencies": deque(maxlen=200)}
+            for name, _ in self.backends
+        }
+
+    def _attempt(self, name, processor, payload, filename, mode, prompt, cancelled, trace=None):
+        """在某个后端上执行一次转录；已被取消时不再发送，发送后被取消时由后端中止请求"""
+        if cancelled.is_set():
+            with self._lock:
+                self.stats[name]["cancelled"] += 1
+            raise Cancelled("请求已取消")
+        if trace is not None:
+            with trace.activate(), span(f"hedge:{name}"):
+                return self._attempt(name, processor, payload, filename, mode, prompt, cancelled)
+        with self._lock:
+            self.stats[name]["requests"] += 1
+        buffer = io.BytesIO(payload)
+        buffer.name = filename
+        start = time.perf_counter()
+        try:
+            text = processor.transcribe_segment(buffer, mode, prompt, cancel=cancelled)
+        except Exception as e:
+            with self._lock:
+                # 另一方胜出后才结束（被中止或出错）的请求计为放弃，不算后端失败
+                self.stats[name]["abandoned" if cancelled.is_set() else "errors"] += 1
+            if isinstance(e, Cancelled):
+                logger.info(f"对冲请求: 已中止 {name} 的在途请求")
+            raise
+        with self._lock:
+            if cancelled.is_set():
+                self.stats[name]["abandoned"] += 1  # 返回时另一方已胜出，结果被丢弃
+            else:
+                self.stats[name]["latencies"].append(time.perf_counter() - start)
+        return text
+
+    def _race(self, audio_buffer, mode, prompt):
+        """执行对冲请求，返回 (文本, 胜出的后端处理器)"""
+        payload = audio_buffer.getvalue()
+        filename = getattr(audio_buffer, "name", "audio.wav")
+        audio_buffer.close()
+        cancelled = threading.Event()
+
+        futures = {}
+        for index, (name, processor) in enumerate(self.backends):
+            if index > 0 and futures:
+                # 主后端在对冲延迟内成功返回，则不再发送备用请求
+                done, _ = wait(futures, timeout=self.delay, return_when=FIRST_COMPLETED)
+                winner = next((f for f in done if f.exception() is None), None)
+                if winner is not None:
+                    break
+            future = self._executor.submit(self._attempt, name, processor, payload, filename, mode, prompt, cancelled,
+                                           current_trace())
+            futures[future] = (name, processor)
+
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                name, processor = futures[future]
+                cancelled.set()  # 在途的另一方在下一个检查点中止
+                for other in pending:
+                    if other.cancel():
+                        with self._lock:
+                            self.stats[futures[other][0]]["cancelled"] += 1
+                with self._lock:
+                    self.stats[name]["wins"] += 1
+                logger.info(f"对冲请求: {name} 胜出")
+                return future.result(), processor
+        raise error
+
+    def transcribe_segment(self, audio_buffer, mode="transcriptions", prompt=""):
+        """对冲转录单个流式分段，不做后处理"""
+        text, _ = self._race(audio_buffer, mode, prompt)
+        return text
+
+    def post_process(self, result, mode="transcriptions"):
+        """使用主后端的后处理"""
+        return self.backends[0][1].post_process(result, mode)
+
+    def apply_config(self, config):
+        """按新配置更新对冲延迟，并在两个后端上更新超时与后处理（不重建后端）"""
+        self.delay = config.hedge_delay
+        for _, processor in self.backends:
+            processor.apply_config(config)
+        self.timeout_seconds = max(processor.timeout_seconds for _, processor in self.backends)
+
+    def reload_post_process(self):
+        """两个后端都按当前配置重建后处理客户端"""
+        for _, processor in self.backends:
+            processor.reload_post_process()
+
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt="", stream=None):
+        """对冲处理音频（转录或翻译），返回值与单一后端的 process_audio 相同"""
+        try:
+            start_time = time.time()
+            logger.info(f"正在发起对冲请求... (模式: {mode}, 延迟: {self.delay}秒)")
+            if stream is not None:
+                result, processor = stream.finish(audio_buffer), self.backends[0][1]
+            else:
+                result, processor = self._race(audio_buffer, mode, prompt)
+                audio_buffer = None
+            logger.info(f"API 调用成功 ({mode}), 耗时: {time.time() - start_time:.1f}秒")
+            self.log_stats()
+            return processor.post_process(result, mode), None
+
+        except TimeoutError:
+            error_msg = f"❌ API 请求超时 ({self.timeout_seconds:g}秒)"
+            logger.error(error_msg)
+            return None, error_msg
+        except Exception as e:
+            error_msg = f"❌ {str(e)}"
+            logger.error(f"音频处理错误: {str(e)}", exc_info=True)
+            return None, error_msg
+        finally:
+            if audio_buffer is not None:
+                audio_buffer.close()
+
+    def get_stats(self):
+        """返回各后端的请求数、胜出次数、取消（未发送）与放弃（在途中止）次数和延迟分位数"""
+        with self._lock:
+            result = {}
+            for name, stats in self.stats.items():
+                latencies = np.array(stats["latencies"]) if stats["latencies"] else None
+                result[name] = {
+                    "requests": stats["requests"],
+                    "wins": stats["wins"],
+                    "errors": stats["errors"],
+                    "cancelled": stats["cancelled"],
+                    "abandoned": stats["abandoned"],
+                    "p50": float(np.percentile(latencies, 50)) if latencies is not None else None,
+                    "p99": float(np.percentile(latencies, 99)) if latencies is not None else None,
+                }
+            return result
+
+    def log_stats(self):
+        """输出对冲统计"""
+        for name, stats in self.get_stats().items():
+            p50 = f"{stats['p50']:.2f}秒" if stats["p50"] is not None else "-"
+            logger.info(f"对冲 {name}: 请求 {stats['requests']} 次, 胜出 {stats['wins']} 次, "
+                        f"失败 {stats['errors']} 次, 未发送即取消 {stats['cancelled']} 次, "
+                        f"在途放弃 {stats['abandoned']} 次, p50 {p50}")
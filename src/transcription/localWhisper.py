@@ -0,0 +1,199 @@
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+from ..audio.encoder import PcmBuffer
+from ..utils.config import get_config
+from ..utils.deadline import Cancelled
+from ..utils.logger import logger
+from ..utils.tracing import span
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:  # 可选依赖，只有 SERVICE_PLATFORM=local 时才需要
+    WhisperModel = None
+
+
+class LocalWhisperProcessor:
+    """进程内的 CPU 语音转录（faster-whisper / CTranslate2）
+
+    模型在启动时加载一次并用一段静音预热，之后常驻内存；录音器直接交来
+    16kHz 的 PcmBuffer，不经过编码、HTTP 上传和 JSON 解析。
+    """
+    # 类级别的配置参数
+    SAMPLE_RATE = 16000
+    WARM_UP_SECONDS = 1.0
+
+    # 录音器据此直接输出未编码的 PCM
+    accepts_pcm = True
+
+    def __init__(self, model=None, compute_type=None, cpu_threads=None):
+        if WhisperModel is None:
+            raise RuntimeError("本地转录需要安装 faster-whisper: pip install faster-whisper")
+        config = get_config()
+        self.model_name = model or config.local_model
+        self.compute_type = compute_type or config.local_compute_type
+        if cpu_threads is None:
+            cpu_threads = config.local_cpu_threads
+        self.cpu_threads = cpu_threads
+        self.cc = None
+        self.symbol = None
+        self.apply_config(config)
+        # CTranslate2 模型可以并发调用，但 CPU 线程已经按 cpu_threads 分配，串行执行避免互相争抢
+        self._lock = threading.Lock()
+
+        start_time = time.perf_counter()
+        self.model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads
+        )
+        self.load_seconds = time.perf_counter() - start_time
+        self.warm_up_seconds = self._warm_up()
+        logger.info(
+            f"本地模型已加载: {self.model_name} ({self.compute_type}, 线程 {self.cpu_threads or '自动'}), "
+            f"加载 {self.load_seconds:.1f}秒, 预热 {self.warm_up_seconds:.1f}秒"
+        )
+
+    def apply_config(self, config):
+        """按新配置更新解码参数、繁简转换和后处理开关，已加载的模型不受影响
+
+        模型、精度、线程数变化时由调用方重新创建处理器
+        """
+        self.beam_size = config.local_beam_size
+        self.language = config.local_language
+        if config.convert_to_simplified and self.cc is None:
+            from opencc import OpenCC
+            self.cc = OpenCC('t2s')
+        self.convert_to_simplified = config.convert_to_simplified
+        self.stream_llm = config.llm_stream
+        self.timeout_seconds = config.api_timeout
+        self.reload_post_process()
+
+    def reload_post_process(self):
+        """按当前配置（OPTIMIZE_RESULT、LLM 模型）重建优化结果的 LLM 客户端，模型不受影响"""
+        self.optimize_result = get_config().optimize_result
+        symbol = None
+        if self.optimize_result:
+            # 未启用优化时不导入 openai
+            from ..llm.symbol import SymbolProcessor
+            symbol = SymbolProcessor()
+        self.symbol = symbol
+
+    def _warm_up(self):
+        """用一段静音跑一次推理，让首次录音不必承担内存分配和算子初始化的开销"""
+        start_time = time.perf_counter()
+        self._transcribe(np.zeros(int(self.SAMPLE_RATE * self.WARM_UP_SECONDS), dtype=np.float32))
+        return time.perf_counter() - start_time
+
+    def _to_float(self, audio_buffer):
+        """把录音器交来的数据转成 16kHz 单声道 float32"""
+        if isinstance(audio_buffer, PcmBuffer):
+            samples = audio_buffer.samples
+            if audio_buffer.sample_rate != self.SAMPLE_RATE:
+                raise ValueError(f"本地模型需要 {self.SAMPLE_RATE}Hz 音频，收到 {audio_buffer.sample_rate}Hz")
+        else:
+            # 对冲模式下录音器仍输出编码后的音频，这里解码一次
+            audio_buffer.seek(0)
+            samples, sample_rate = sf.read(audio_buffer, dtype="int16")
+            if sample_rate != self.SAMPLE_RATE:
+                raise ValueError(f"本地模型需要 {self.SAMPLE_RATE}Hz 音频，收到 {sample_rate}Hz")
+            if samples.ndim > 1:
+                samples = samples.mean(axis=1).astype(np.int16)
+        return samples.astype(np.float32) / 32768.0
+
+    def _transcribe(self, audio, mode="transcriptions", prompt="", cancel=None):
+        """在本地模型上推理，返回拼接后的文本；cancel 被设置后在下一个片段之前停止解码"""
+        with span("asr", backend="local"), self._lock:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled("请求已取消")
+            segments, _ = self.model.transcribe(
+                audio,
+                language=self.language,
+                task="translate" if mode == "translations" else "transcribe",
+                beam_size=self.beam_size,
+                initial_prompt=prompt or None,
+                vad_filter=False,  # 录音器已经裁剪过静音
+                condition_on_previous_text=False
+            )
+            # segments 是惰性生成器，真正的解码发生在遍历时
+            texts = []
+            for segment in segments:
+                texts.append(segment.text)
+                if cancel is not None and cancel.is_set():
+                    raise Cancelled("请求已取消")
+            return "".join(texts).strip()
+
+    def _convert_traditional_to_simplified(self, text):
+        """将繁体中文转换为简体中文"""
+        if not self.convert_to_simplified or not text:
+            return text
+        return self.cc.convert(text)
+
+    def _run_model(self, audio_buffer, mode, prompt, cancel=None):
+        audio = self._to_float(audio_buffer)
+        logger.info(f"本地转录: {len(audio) / self.SAMPLE_RATE:.1f}秒音频")
+        return self._transcribe(audio, mode, prompt, cancel)
+
+    def transcribe_segment(self, audio_buffer, mode="transcriptions", prompt="", cancel=None):
+        """转录单个流式分段，不做优化等后处理；cancel 被设置后尽快停止并抛出 Cancelled"""
+        try:
+            return self._convert_traditional_to_simplified(self._run_model(audio_buffer, mode, prompt, cancel))
+        finally:
+            audio_buffer.close()
+
+    def post_process(self, result, mode="transcriptions"):
+        """对识别结果做后处理（繁简转换、优化结果）
+
+        Whisper 自带标点，不需要再添加；启用 LLM_STREAM 时返回文本片段的迭代器
+        """
+        result = self._convert_traditional_to_simplified(result)
+        logger.info(f"识别结果: {result}")
+        symbol = self.symbol
+        if symbol is None or not result:
+            return result
+        if self.stream_llm:
+            return symbol.process_stream(result, ["optimize"])
+        result = symbol.process(result, ["optimize"])
+        logger.info(f"后处理结果: {result}")
+        return result
+
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt="", stream=None):
+        """在本地模型上处理音频（转录或翻译成英文）
+
+        Args:
+            audio_buffer: PcmBuffer 或编码后的音频（流式模式下为尾段，可能为 None）
+            mode: 'transcriptions' 或 'translations'，决定是转录还是翻译
+            prompt: 提示词
+            stream: 流式转录会话 StreamingTranscriber，为 None 时整段转录
+
+        Returns:
+            tuple: (结果文本, 错误信息)
+            - 如果成功，错误信息为 None
+            - 如果失败，结果文本为 None
+        """
+        try:
+            start_time = time.time()
+
+            if stream is not None:
+                result = stream.finish(audio_buffer)
+            else:
+                result = self._run_model(audio_buffer, mode, prompt)
+
+            logger.info(f"本地转录完成 ({mode}), 耗时: {time.time() - start_time:.2f}秒")
+            return self.post_process(result, mode), None
+
+        except TimeoutError:
+            error_msg = f"❌ 本地转录超时 ({self.timeout_seconds:g}秒)"
+            logger.error(error_msg)
+            return None, error_msg
+        except Exception as e:
+            error_msg = f"❌ {str(e)}"
+            logger.error(f"音频处理错误: {str(e)}", exc_info=True)
+            return None, error_msg
+        finally:
+            if audio_buffer is not None:
+                audio_buffer.close()
@@ -0,0 +1,48 @@
+import importlib
+import time
+
+from ..utils.logger import logger
+
+# 平台名称 → (模块, 处理器类名)
+# 模块只在选用该平台时才导入：openai 等依赖的导入耗时接近一秒，不应由其他平台承担
+BACKENDS = {
+    "groq": (".whisper", "WhisperProcessor"),
+    "siliconflow": (".senseVoiceSmall", "SenseVoiceSmallProcessor"),
+    "local": (".localWhisper", "LocalWhisperProcessor"),
+}
+
+
+def load_backend(service_platform):
+    """导入平台对应的模块并返回处理器类"""
+    if service_platform not in BACKENDS:
+        raise ValueError(f"无效的服务平台: {service_platform}")
+    module_name, class_name = BACKENDS[service_platform]
+    return getattr(importlib.import_module(module_name, __package__), class_name)
+
+
+def create_processor(service_platform, **kwargs):
+    """按需导入并创建转录处理器，记录导入与初始化耗时"""
+    start_time = time.perf_counter()
+    processor_class = load_backend(service_platform)
+    imported = time.perf_counter()
+    processor = processor_class(**kwargs)
+    logger.info(
+        f"已加载转录后端 {service_platform}: 导入 {(imported - start_time) * 1000:.0f}ms, "
+        f"初始化 {(time.perf_counter() - imported) * 1000:.0f}ms"
+    )
+    return processor
+
+
+def create_audio_processor(config):
+    """按配置创建转录处理器，设置了 HEDGE_PLATFORM 时同一段音频在延迟后再发给备用平台，先返回者胜出"""
+    processor = create_processor(config.service_platform)
+    if config.hedge_platform:
+        from .hedged import HedgedProcessor
+        kwargs = {"url": config.hedge_sensevoice_url} if config.hedge_platform == "siliconflow" else {}
+        processor = HedgedProcessor(
+            processor,
+            create_processor(config.hedge_platform, **kwargs),
+            delay=config.hedge_delay
+        )
+        logger.info(f"已启用对冲请求: {config.service_platform} + {config.hedge_platform}")
+    return processor
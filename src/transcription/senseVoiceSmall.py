@@ -1,61 +1,48 @@
-import os
-import threading
+import json
 import time
-from functools import wraps
-
-import dotenv
-import httpx
 
 from src.llm.translate import TranslateProcessor
+from ..audio.encoder import payload_size
+from ..utils.config import get_config
+from ..utils.deadline import Deadline
+from ..utils.httpClient import get_client
 from ..utils.logger import logger
-
-dotenv.load_dotenv()
-
-def timeout_decorator(seconds):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = [None]
-            error = [None]
-            completed = threading.Event()
-
-            def target():
-                try:
-                    result[0] = func(*args, **kwargs)
-                except Exception as e:
-                    error[0] = e
-                finally:
-                    completed.set()
-
-            thread = threading.Thread(target=target)
-            thread.daemon = True
-            thread.start()
-
-            if completed.wait(seconds):
-                if error[0] is not None:
-                    raise error[0]
-                return result[0]
-            raise TimeoutError(f"操作超时 ({seconds}秒)")
-
-        return wrapper
-    return decorator
+from ..utils.tracing import span
 
 class SenseVoiceSmallProcessor:
     # 类级别的配置参数
-    DEFAULT_TIMEOUT = 20  # API 超时时间（秒）
     DEFAULT_MODEL = "FunAudioLLM/SenseVoiceSmall"
     
-    def __init__(self):
-        self.local_sensevoice_url = os.getenv("LOCAL_SENSEVOICE_URL")
+    def __init__(self, url=None):
+        config = get_config()
+        self.local_sensevoice_url = url or config.local_sensevoice_url
         assert self.local_sensevoice_url, "未设置 LOCAL_SENSEVOICE_URL 环境变量"
-        
-        self.convert_to_simplified = os.getenv("CONVERT_TO_SIMPLIFIED", "false").lower() == "true"
+        self._translate_processor = None
+        self.apply_config(config)
+
+    def apply_config(self, config):
+        """按新配置更新超时和后处理开关，重新取得连接池与翻译客户端，不重建后端"""
+        self.client = get_client(self.local_sensevoice_url)
+        self.convert_to_simplified = config.convert_to_simplified
         # self.cc = OpenCC('t2s') if self.convert_to_simplified else None
         # self.symbol = SymbolProcessor()
         # self.add_symbol = os.getenv("ADD_SYMBOL", "false").lower() == "true"
         # self.optimize_result = os.getenv("OPTIMIZE_RESULT", "false").lower() == "true"
-        self.timeout_seconds = self.DEFAULT_TIMEOUT
-        self.translate_processor = TranslateProcessor()
+        self.stream_llm = config.llm_stream
+        self.timeout_seconds = config.api_timeout
+        self.connect_timeout = config.api_connect_timeout
+        self.reload_post_process()
+
+    def reload_post_process(self):
+        """修改翻译配置后调用：下次翻译时按新配置创建客户端（同一地址的连接池继续复用）"""
+        self._translate_processor = None
+
+    @property
+    def translate_processor(self):
+        """翻译客户端只在翻译模式下用到，首次使用时才创建"""
+        if self._translate_processor is None:
+            self._translate_processor = TranslateProcessor()
+        return self._translate_processor
 
     def _convert_traditional_to_simplified(self, text):
         """将繁体中文转换为简体中文"""
@@ -63,27 +50,59 @@ class SenseVoiceSmallProcessor:
             return text
         return self.cc.convert(text)
 
-    @timeout_decorator(10)
-    def _call_api(self, audio_data):
-        """调用本地 SenseVoice API"""
+    def _call_api(self, audio_data, cancel=None):
+        """调用本地 SenseVoice API，超时由 HTTP 客户端自身取消请求"""
+        deadline = Deadline(self.timeout_seconds, connect=self.connect_timeout, cancel=cancel)
+        filename = getattr(audio_data, 'name', 'audio.wav')
+        logger.info(f"上传音频: {filename}, {payload_size(audio_data)} 字节")
         
         files = {
-            'file': ('audio.wav', audio_data),
+            'file': (filename, audio_data),
             'model': (None, self.DEFAULT_MODEL)
         }
 
-        with httpx.Client() as client:
-            response = client.post(self.local_sensevoice_url, files=files)
-            response.raise_for_status()
-            return response.json().get('text', '获取失败')
+        with span("asr", backend="sensevoice"), deadline.enforce():
+            with self.client.stream("POST", self.local_sensevoice_url, files=files,
+                                    timeout=deadline.httpx_timeout()) as response:
+                body = deadline.read(response)
+        response.raise_for_status()
+        return json.loads(body).get('text', '获取失败')
 
+    def transcribe_segment(self, audio_buffer, mode="transcriptions", prompt="", cancel=None):
+        """转录单个流式分段，不做翻译等后处理；cancel 被设置后尽快放弃请求并抛出 Cancelled"""
+        try:
+            return self._call_api(audio_buffer, cancel)
+        finally:
+            audio_buffer.close()
+
+    def post_process(self, result, mode="transcriptions"):
+        """对识别结果做后处理（翻译模式下翻译成英文）
 
-    def process_audio(self, audio_buffer, mode="transcriptions", prompt=""):
+        启用 LLM_STREAM 时翻译结果以文本片段的迭代器返回
+        """
+        # result = self._convert_traditional_to_simplified(result)
+        if mode == "translations" and self.stream_llm:
+            logger.info(f"识别结果: {result}")
+            return self.translate_processor.translate_stream(result)
+        if mode == "translations":
+            result = self.translate_processor.translate(result)
+        logger.info(f"识别结果: {result}")
+        
+        # if self.add_symbol:
+        #     result = self.symbol.add_symbol(result)
+        #     logger.info(f"添加标点符号: {result}")
+        # if self.optimize_result:
+        #     result = self.symbol.optimize_result(result)
+        #     logger.info(f"优化结果: {result}")
+        return result
+
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt="", stream=None):
         """处理音频（转录或翻译）
         
         Args:
-            audio_buffer: 音频数据缓冲
+            audio_buffer: 音频数据缓冲（流式模式下为尾段，可能为 None）
             mode: 'transcriptions' 或 'translations'，决定是转录还是翻译
+            stream: 流式转录会话 StreamingTranscriber，为 None 时整段上传
         
         Returns:
             tuple: (结果文本, 错误信息)
@@ -94,25 +113,16 @@ class SenseVoiceSmallProcessor:
             start_time = time.time()
             
             logger.info(f"正在调用 硅基流动 API... (模式: {mode})")
-            result = self._call_api(audio_buffer)
+            if stream is not None:
+                result = stream.finish(audio_buffer)
+            else:
+                result = self._call_api(audio_buffer)
 
             logger.info(f"API 调用成功 ({mode}), 耗时: {time.time() - start_time:.1f}秒")
-            # result = self._convert_traditional_to_simplified(result)
-            if mode == "translations":
-                result = self.translate_processor.translate(result)
-            logger.info(f"识别结果: {result}")
-            
-            # if self.add_symbol:
-            #     result = self.symbol.add_symbol(result)
-            #     logger.info(f"添加标点符号: {result}")
-            # if self.optimize_result:
-            #     result = self.symbol.optimize_result(result)
-            #     logger.info(f"优化结果: {result}")
-
-            return result, None
+            return self.post_process(result, mode), None
 
         except TimeoutError:
-            error_msg = f"❌ API 请求超时 ({self.timeout_seconds}秒)"
+            error_msg = f"❌ API 请求超时 ({self.timeout_seconds:g}秒)"
             logger.error(error_msg)
             return None, error_msg
         except Exception as e:
@@ -120,4 +130,5 @@ class SenseVoiceSmallProcessor:
             logger.error(f"音频处理错误: {str(e)}", exc_info=True)
             return None, error_msg
         finally:
-            audio_buffer.close()  # 显式关闭字节流
+            if audio_buffer is not None:
+                audio_buffer.close()  # 显式关闭字节流
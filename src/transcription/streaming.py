@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.logger import logger
+from ..utils.tracing import current_trace, span
+
+
+def stitch_segments(texts):
+    """按顺序拼接各分段的识别结果
+
+    中文等无空格语言直接拼接，两侧都是拉丁字母/数字时补一个空格。
+    """
+    result = ""
+    for text in texts:
+        text = (text or "").strip()
+        if not text:
+            continue
+        if result and result[-1].isascii() and result[-1].isalnum() and text[0].isascii() and text[0].isalnum():
+            result += " "
+        result += text
+    return result
+
+
+class StreamingTranscriber:
+    """流式转录会话
+
+    录音过程中由 AudioRecorder 不断提交音频分段，分段在后台并发转录；
+    松开按键后只需等待尾段完成，再按提交顺序拼接结果。
+    """
+
+    def __init__(self, processor, mode="transcriptions", prompt="", max_workers=2):
+        self.processor = processor
+        self.mode = mode
+        self.prompt = prompt
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stream-asr")
+        self.futures = []
+        self.trace = current_trace()  # 分段在线程池中转录，耗时记到创建会话时的听写下
+
+    @property
+    def has_segments(self):
+        """是否已经提交过分段"""
+        return bool(self.futures)
+
+    def submit(self, audio_buffer):
+        """提交一个音频分段（在录音线程之外调用）"""
+        index = len(self.futures)
+        logger.info(f"提交流式分段 #{index}")
+        self.futures.append(self.executor.submit(self._transcribe, index, audio_buffer))
+
+    def _transcribe(self, index, audio_buffer):
+        if self.trace is None:
+            return self.processor.transcribe_segment(audio_buffer, self.mode, self.prompt)
+        with self.trace.activate(), span("segment", index=index):
+            return self.processor.transcribe_segment(audio_buffer, self.mode, self.prompt)
+
+    def finish(self, tail_buffer=None):
+        """提交尾段并等待所有分段完成，返回拼接后的文本"""
+        try:
+            if tail_buffer is not None:
+                self.submit(tail_buffer)
+            with span("segment_wait"):
+                texts = [future.result() for future in self.futures]
+            logger.info(f"流式转录完成，共 {len(texts)} 段")
+            return stitch_segments(texts)
+        finally:
+            self.close()
+
+    def close(self):
+        """取消尚未开始的分段并释放线程池"""
+        for future in self.futures:
+            future.cancel()
+        self.executor.shutdown(wait=False)
@@ -1,75 +1,74 @@
-import os
-import threading
 import time
-from functools import wraps
 
-import dotenv
-import httpx
 from openai import OpenAI
-from opencc import OpenCC
 
+from ..audio.encoder import payload_size
 from ..llm.symbol import SymbolProcessor
+from ..utils.config import get_config
+from ..utils.deadline import Deadline
+from ..utils.httpClient import get_client
 from ..utils.logger import logger
-
-dotenv.load_dotenv()
-
-def timeout_decorator(seconds):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = [None]
-            error = [None]
-            completed = threading.Event()
-
-            def target():
-                try:
-                    result[0] = func(*args, **kwargs)
-                except Exception as e:
-                    error[0] = e
-                finally:
-                    completed.set()
-
-            thread = threading.Thread(target=target)
-            thread.daemon = True
-            thread.start()
-
-            if completed.wait(seconds):
-                if error[0] is not None:
-                    raise error[0]
-                return result[0]
-            raise TimeoutError(f"操作超时 ({seconds}秒)")
-
-        return wrapper
-    return decorator
+from ..utils.tracing import span
 
 class WhisperProcessor:
     # 类级别的配置参数
-    DEFAULT_TIMEOUT = 20  # API 超时时间（秒）
     DEFAULT_MODEL = None
     
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        base_url = os.getenv("GROQ_BASE_URL")
-        self.convert_to_simplified = os.getenv("CONVERT_TO_SIMPLIFIED", "false").lower() == "true"
-        self.cc = OpenCC('t2s') if self.convert_to_simplified else None
-        self.symbol = SymbolProcessor()
-        self.add_symbol = os.getenv("ADD_SYMBOL", "false").lower() == "true"
-        self.optimize_result = os.getenv("OPTIMIZE_RESULT", "false").lower() == "true"
-        self.timeout_seconds = self.DEFAULT_TIMEOUT
-        self.service_platform = os.getenv("SERVICE_PLATFORM", "groq").lower()
+        config = get_config()
+        self.api_key = config.groq_api_key
+        self.base_url = config.groq_base_url
+        self.service_platform = config.service_platform.lower()
+        self.cc = None
+        self.symbol = None
 
         if self.service_platform == "groq":
-            assert api_key, "未设置 GROQ_API_KEY 环境变量"
-            self.client = OpenAI(
-                api_key=api_key,
-                base_url=base_url if base_url else None
-            )
+            assert self.api_key, "未设置 GROQ_API_KEY 环境变量"
             self.DEFAULT_MODEL = "whisper-large-v3-turbo"
         elif self.service_platform == "siliconflow":
-            assert api_key, "未设置 SILICONFLOW_API_KEY 环境变量"
+            assert self.api_key, "未设置 SILICONFLOW_API_KEY 环境变量"
             self.DEFAULT_MODEL = "FunAudioLLM/SenseVoiceSmall"
         else:
             raise ValueError(f"未知的平台: {self.service_platform}")
+        self.apply_config(config)
+
+    def apply_config(self, config):
+        """按新配置更新超时、繁简转换和后处理开关，重新取得连接池与 LLM 客户端，不重建后端"""
+        if config.convert_to_simplified and self.cc is None:
+            from opencc import OpenCC
+            self.cc = OpenCC('t2s')
+        self.convert_to_simplified = config.convert_to_simplified
+        self.stream_llm = config.llm_stream
+        self.timeout_seconds = config.api_timeout
+        self.connect_timeout = config.api_connect_timeout
+        if self.service_platform == "groq":
+            self.client = OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url if self.base_url else None,
+                http_client=get_client(self.base_url or "https://api.openai.com/v1"),
+                max_retries=0  # 重试会突破截止时间
+            )
+        self.reload_post_process()
+
+    def reload_post_process(self):
+        """按当前配置重建后处理客户端（修改标点、优化开关或 LLM 模型后调用）
+
+        只有启用了标点或优化时才创建
+        """
+        config = get_config()
+        self.add_symbol = config.add_symbol
+        self.optimize_result = config.optimize_result
+        self.symbol = SymbolProcessor() if self._post_steps() else None
+
+    def _post_steps(self):
+        """启用的后处理步骤，合并成一次 LLM 请求"""
+        # 仅在 groq API 时添加标点符号
+        steps = []
+        if self.service_platform == "groq" and self.add_symbol:
+            steps.append("add_symbol")
+        if self.optimize_result:
+            steps.append("optimize")
+        return steps
 
     def _convert_traditional_to_simplified(self, text):
         """将繁体中文转换为简体中文"""
@@ -77,32 +76,60 @@ class WhisperProcessor:
             return text
         return self.cc.convert(text)
     
-    @timeout_decorator(10)
-    def _call_whisper_api(self, mode, audio_data, prompt):
-        """调用 Whisper API"""
+    def _call_whisper_api(self, mode, audio_data, prompt, cancel=None):
+        """调用 Whisper API，超时由 HTTP 客户端自身取消请求"""
+        deadline = Deadline(self.timeout_seconds, connect=self.connect_timeout, cancel=cancel)
+        filename = getattr(audio_data, 'name', 'audio.wav')
+        logger.info(f"上传音频: {filename}, {payload_size(audio_data)} 字节")
         if mode == "translations":
-            response = self.client.audio.translations.create(
-                model="whisper-large-v3",
-                response_format="text",
-                prompt=prompt,
-                file=("audio.wav", audio_data)
-            )
+            resource, model = self.client.audio.translations, "whisper-large-v3"
         else:  # transcriptions
-            response = self.client.audio.transcriptions.create(
-                model="whisper-large-v3-turbo",
+            resource, model = self.client.audio.transcriptions, "whisper-large-v3-turbo"
+        with span("asr", backend="groq"), deadline.enforce():
+            with resource.with_streaming_response.create(
+                model=model,
                 response_format="text",
                 prompt=prompt,
-                file=("audio.wav", audio_data)
-            )
-        return str(response).strip()
+                file=(filename, audio_data),
+                timeout=deadline.httpx_timeout()
+            ) as response:
+                text = deadline.read(response.http_response).decode("utf-8")
+        return text.strip()
+
+    def transcribe_segment(self, audio_buffer, mode="transcriptions", prompt="", cancel=None):
+        """转录单个流式分段，不做标点、优化等后处理；cancel 被设置后尽快放弃请求并抛出 Cancelled"""
+        try:
+            return self._convert_traditional_to_simplified(self._call_whisper_api(mode, audio_buffer, prompt, cancel))
+        finally:
+            audio_buffer.close()
+
+    def post_process(self, result, mode="transcriptions"):
+        """对识别结果做后处理（繁简转换、添加标点、优化结果）
 
-    def process_audio(self, audio_buffer, mode="transcriptions", prompt=""):
+        启用 LLM_STREAM 时返回文本片段的迭代器，否则返回完整文本
+        """
+        result = self._convert_traditional_to_simplified(result)
+        logger.info(f"识别结果: {result}")
+        
+        # 重新加载配置时开关和客户端先后更新，以同一时刻取得的客户端为准
+        symbol = self.symbol
+        steps = self._post_steps() if symbol is not None else []
+        if steps and self.stream_llm:
+            # 流式输出：返回文本片段的迭代器，由键盘管理器边接收边输入
+            return symbol.process_stream(result, steps)
+        if steps:
+            result = symbol.process(result, steps)
+            logger.info(f"后处理结果: {result}")
+        return result
+
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt="", stream=None):
         """调用 Whisper API 处理音频（转录或翻译）
         
         Args:
-            audio_path: 音频文件路径
+            audio_buffer: 音频数据缓冲（流式模式下为尾段，可能为 None）
             mode: 'transcriptions' 或 'translations'，决定是转录还是翻译
             prompt: 提示词
+            stream: 流式转录会话 StreamingTranscriber，为 None 时整段上传
         
         Returns:
             tuple: (结果文本, 错误信息)
@@ -113,25 +140,16 @@ class WhisperProcessor:
             start_time = time.time()
 
             logger.info(f"正在调用 Whisper API... (模式: {mode})")
-            result = self._call_whisper_api(mode, audio_buffer, prompt)
+            if stream is not None:
+                result = stream.finish(audio_buffer)
+            else:
+                result = self._call_whisper_api(mode, audio_buffer, prompt)
 
             logger.info(f"API 调用成功 ({mode}), 耗时: {time.time() - start_time:.1f}秒")
-            result = self._convert_traditional_to_simplified(result)
-            logger.info(f"识别结果: {result}")
-            
-            # 仅在 groq API 时添加标点符号
-            if self.service_platform == "groq" and self.add_symbol:
-                result = self.symbol.add_symbol(result)
-                logger.info(f"添加标点符号: {result}")
-            if self.optimize_result:
-                result = self.symbol.optimize_result(result)
-                logger.info(f"优化结果: {result}")
-
-            return result, None
-            
+            return self.post_process(result, mode), None
 
         except TimeoutError:
-            error_msg = f"❌ API 请求超时 ({self.timeout_seconds}秒)"
+            error_msg = f"❌ API 请求超时 ({self.timeout_seconds:g}秒)"
             logger.error(error_msg)
             return None, error_msg
         except Exception as e:
@@ -139,4 +157,5 @@ class WhisperProcessor:
             logger.error(f"音频处理错误: {str(e)}", exc_info=True)
             return None, error_msg
         finally:
-            audio_buffer.close()  # 显式关闭字节流
\ No newline at end of file
+            if audio_buffer is not None:
+                audio_buffer.close()  # 显式关闭字节流
\ No newline at end of file
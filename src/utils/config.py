@@ -0,0 +1,203 @@
+import os
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Optional
+
+from dotenv import dotenv_values
+
+from .logger import logger
+
+
+def setting(env, default, component):
+    """声明一个配置项：对应的环境变量、默认值，以及修改后需要重建的组件"""
+    return field(default=default, metadata={"env": env, "component": component})
+
+
+@dataclass(frozen=True)
+class Config:
+    """主程序的全部可热更新配置，启动时从环境变量解析一次
+
+    每个字段标注了它影响的组件，重新加载 .env 时只重建配置发生变化的组件：
+        processor - 转录后端（含对冲，重新创建）  tuning    - 超时、解码参数与后处理开关（在现有后端上更新）
+        translate - 翻译客户端                  symbol    - 标点/优化的 LLM 客户端
+        cache     - LLM 结果缓存                http      - 连接池参数
+        recorder  - 录音器（录音结束后重建）    keyboard  - 热键与文本输入
+        status    - 状态显示                    metrics   - 耗时统计
+        config    - 配置文件监控
+    LOG_STREAM_ADDR、CONTROL_SOCKET_ADDR 由控制界面在启动时传入，不在此列。
+    """
+    # 转录后端
+    service_platform: str = setting("SERVICE_PLATFORM", "siliconflow", "processor")
+    hedge_platform: Optional[str] = setting("HEDGE_PLATFORM", None, "processor")
+    hedge_sensevoice_url: Optional[str] = setting("HEDGE_SENSEVOICE_URL", None, "processor")
+    hedge_delay: float = setting("HEDGE_DELAY", 0.5, "tuning")
+    groq_api_key: Optional[str] = setting("GROQ_API_KEY", None, "processor")
+    groq_base_url: Optional[str] = setting("GROQ_BASE_URL", None, "processor")
+    local_sensevoice_url: Optional[str] = setting("LOCAL_SENSEVOICE_URL", None, "processor")
+    convert_to_simplified: bool = setting("CONVERT_TO_SIMPLIFIED", False, "tuning")
+    add_symbol: bool = setting("ADD_SYMBOL", False, "tuning")
+    optimize_result: bool = setting("OPTIMIZE_RESULT", False, "tuning")
+    llm_stream: bool = setting("LLM_STREAM", False, "tuning")
+    api_timeout: float = setting("API_TIMEOUT", 20.0, "tuning")
+    api_connect_timeout: float = setting("API_CONNECT_TIMEOUT", 3.0, "tuning")
+    local_model: str = setting("LOCAL_MODEL", "small", "processor")
+    local_compute_type: str = setting("LOCAL_COMPUTE_TYPE", "int8", "processor")
+    local_cpu_threads: int = setting("LOCAL_CPU_THREADS", 0, "processor")
+    local_beam_size: int = setting("LOCAL_BEAM_SIZE", 1, "tuning")
+    local_language: Optional[str] = setting("LOCAL_LANGUAGE", None, "tuning")
+
+    # 后处理
+    symbol_model: str = setting("GROQ_ADD_SYMBOL_MODEL", "llama3-8b-8192", "symbol")
+    translate_api_url: Optional[str] = setting("TRANSLATE_API_URL", None, "translate")
+    translate_api_key: Optional[str] = setting("TRANSLATE_API_KEY", None, "translate")
+    translate_model: Optional[str] = setting("TRANSLATE_MODEL", None, "translate")
+    llm_cache_size: int = setting("LLM_CACHE_SIZE", 512, "cache")
+    llm_cache_ttl: float = setting("LLM_CACHE_TTL", 7 * 24 * 3600.0, "cache")
+    llm_cache_path: Optional[str] = setting("LLM_CACHE_PATH", None, "cache")
+
+    # 连接池
+    http2: bool = setting("HTTP2", False, "http")
+    http_max_connections: int = setting("HTTP_MAX_CONNECTIONS", 10, "http")
+    http_max_keepalive: int = setting("HTTP_MAX_KEEPALIVE", 5, "http")
+    http_keepalive_expiry: float = setting("HTTP_KEEPALIVE_EXPIRY", 60.0, "http")
+    http_timeout: float = setting("HTTP_TIMEOUT", 20.0, "http")
+
+    # 录音
+    stream_segment_seconds: float = setting("STREAM_SEGMENT_SECONDS", 0.0, "recorder")
+    audio_codec: str = setting("AUDIO_CODEC", "flac", "recorder")
+    ring_buffer_seconds: float = setting("RING_BUFFER_SECONDS", 30.0, "recorder")
+    vad_enabled: bool = setting("VAD_ENABLED", True, "recorder")
+    vad_threshold_db: float = setting("VAD_THRESHOLD_DB", -45.0, "recorder")
+    vad_max_pause_ms: int = setting("VAD_MAX_PAUSE_MS", 600, "recorder")
+    warm_stream: bool = setting("WARM_STREAM", False, "recorder")
+    preroll_seconds: float = setting("PREROLL_SECONDS", 0.0, "recorder")
+    device_check_interval: float = setting("DEVICE_CHECK_INTERVAL", 5.0, "recorder")
+
+    # 热键与文本输入
+    system_platform: Optional[str] = setting("SYSTEM_PLATFORM", None, "keyboard")
+    transcriptions_button: Optional[str] = setting("TRANSCRIPTIONS_BUTTON", None, "keyboard")
+    translations_button: Optional[str] = setting("TRANSLATIONS_BUTTON", None, "keyboard")
+    stream_batch_ms: float = setting("LLM_STREAM_BATCH_MS", 80.0, "keyboard")
+    direct_type_max_chars: int = setting("DIRECT_TYPE_MAX_CHARS", 16, "keyboard")
+    direct_type_non_ascii: bool = setting("DIRECT_TYPE_NON_ASCII", False, "keyboard")
+    clipboard_restore_delay: float = setting("CLIPBOARD_RESTORE_DELAY", 0.5, "keyboard")
+    keep_original_clipboard: bool = setting("KEEP_ORIGINAL_CLIPBOARD", True, "keyboard")
+
+    # 状态显示与统计
+    status_sink: str = setting("STATUS_SINK", "terminal", "status")
+    status_socket_addr: str = setting("STATUS_SOCKET_ADDR", "127.0.0.1:47800", "status")
+    metrics_path: Optional[str] = setting("METRICS_PATH", "logs/metrics.jsonl", "metrics")
+    metrics_window: int = setting("METRICS_WINDOW", 500, "metrics")
+    metrics_snapshot_every: int = setting("METRICS_SNAPSHOT_EVERY", 50, "metrics")
+    metrics_max_bytes: int = setting("METRICS_MAX_BYTES", 5 * 1024 * 1024, "metrics")
+    config_watch_interval: float = setting("CONFIG_WATCH_INTERVAL", 2.0, "config")
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """从环境变量解析配置，有无效值时抛出 ValueError（列出所有无效项）"""
+        environ = os.environ if environ is None else environ
+        values, errors = {}, []
+        for f in fields(cls):
+            raw = environ.get(f.metadata["env"])
+            if raw is None:
+                continue
+            try:
+                values[f.name] = _parse(f.type, raw)
+            except ValueError:
+                errors.append(f"{f.metadata['env']}={raw!r}")
+        if errors:
+            raise ValueError(f"无效的配置: {', '.join(errors)}")
+        return cls(**values)
+
+    def changes(self, other):
+        """与 other 相比发生变化的 (环境变量名列表, 组件集合)"""
+        names, components = [], set()
+        for f in fields(self):
+            if getattr(self, f.name) != getattr(other, f.name):
+                names.append(f.metadata["env"])
+                components.add(f.metadata["component"])
+        return names, components
+
+
+def _parse(type_, raw):
+    if type_ is bool:
+        return raw.strip().lower() == "true"
+    if type_ is int:
+        return int(raw)
+    if type_ is float:
+        return float(raw)
+    if type_ is str:
+        return raw
+    return raw or None  # Optional[str]：空字符串视为未设置
+
+
+def read_env_file(path, pinned=None):
+    """读取 .env 并解析出新配置，返回 (配置, 文件中的值)
+
+    文件中的值优先于进程的环境变量，pinned 中的值又优先于文件（启动时由父进程指定的值，
+    与启动时 load_dotenv 不覆盖已有环境变量的行为一致）。从文件中删除的配置项保持
+    当前进程中的值。解析失败时抛出 ValueError，当前配置不受影响。
+    """
+    values = {k: v for k, v in dotenv_values(path).items() if v is not None} if os.path.exists(path) else {}
+    values = {k: v for k, v in values.items() if k not in (pinned or {})}
+    return Config.from_env({**os.environ, **values}), values
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_config():
+    """当前生效的配置（首次调用时从环境变量解析）"""
+    global _config
+    config = _config
+    if config is None:
+        with _config_lock:
+            if _config is None:
+                _config = Config.from_env()
+            config = _config
+    return config
+
+
+def set_config(config):
+    """替换当前配置（一次引用赋值，其他线程要么看到旧配置要么看到新配置）"""
+    global _config
+    with _config_lock:
+        _config = config
+
+
+class ConfigWatcher:
+    """后台线程：定期检查 .env 的修改时间，变化时调用 on_change
+
+    检查间隔每次从当前配置读取，CONFIG_WATCH_INTERVAL 改为 0 时停止检查。
+    """
+
+    def __init__(self, path, on_change):
+        self.path = path
+        self.on_change = on_change
+        self._mtime = self._read_mtime()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, name="config-watcher", daemon=True).start()
+
+    def _read_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _run(self):
+        while True:
+            interval = get_config().config_watch_interval
+            if interval <= 0 or self._stop.wait(interval):
+                return
+            mtime = self._read_mtime()
+            if mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"重新加载配置失败: {e}")
+
+    def close(self):
+        self._stop.set()
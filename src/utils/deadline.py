@@ -0,0 +1,76 @@
+import time
+from contextlib import contextmanager
+
+import httpx
+
+
+class Cancelled(Exception):
+    """请求已被调用方取消（例如对冲请求中另一个后端已经胜出）"""
+
+
+class Deadline:
+    """一次 API 调用的截止时间
+
+    不再为每次调用单独起线程计时，而是把剩余时间换算成 HTTP 客户端自身的
+    connect/read/write/pool 超时：超时后由客户端关闭连接，请求真正被取消，
+    socket 和上传缓冲随即释放。
+
+    HTTP 客户端的超时只限制单次网络操作，不限制总时长：服务端持续缓慢地返回数据时
+    每次读取都不超时。因此响应体要用 read() 流式读取，每块数据之间检查剩余时间。
+
+    cancel 为 threading.Event 时，在同样的检查点上检查是否已被取消，已取消时抛出 Cancelled。
+    """
+
+    def __init__(self, total, connect=None, cancel=None):
+        self.total = total
+        self.connect = connect
+        self.cancel = cancel
+        self.expires_at = time.monotonic() + total
+
+    def remaining(self):
+        """剩余时间（秒），已过期时为 0"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        """已被取消时抛出 Cancelled，已过期时抛出 TimeoutError"""
+        if self.cancel is not None and self.cancel.is_set():
+            raise Cancelled("请求已取消")
+        if self.expired:
+            raise TimeoutError(f"操作超时 ({self.total}秒)")
+
+    def httpx_timeout(self):
+        """按剩余时间生成 httpx.Timeout，可直接传给 httpx / OpenAI 客户端"""
+        self.check()
+        remaining = self.remaining()
+        connect = min(self.connect, remaining) if self.connect else remaining
+        return httpx.Timeout(remaining, connect=connect)
+
+    def read(self, response):
+        """读取流式响应（stream=True）的完整响应体，总耗时不超过截止时间
+
+        收到响应头后按剩余时间重新设置读取超时（httpx 在开始读取响应体时才取用），
+        之后每收到一块数据检查一次剩余时间和取消标志，过期或取消时抛出异常，由调用方关闭响应和连接
+        """
+        response.request.extensions["timeout"] = self.httpx_timeout().as_dict()
+        body = bytearray()
+        for chunk in response.iter_bytes():
+            body += chunk
+            self.check()
+        return bytes(body)
+
+    @contextmanager
+    def enforce(self):
+        """把 HTTP 客户端抛出的超时异常统一转换为 TimeoutError"""
+        try:
+            yield self
+        except TimeoutError:
+            raise
+        except Exception as e:
+            # OpenAI SDK 会把 httpx 的超时包装成 APITimeoutError，原始异常在 __cause__ 中
+            if isinstance(e, httpx.TimeoutException) or isinstance(e.__cause__, httpx.TimeoutException):
+                raise TimeoutError(f"操作超时 ({self.total}秒)") from e
+            raise
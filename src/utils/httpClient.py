@@ -0,0 +1,123 @@
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+
+from .config import get_config
+from .logger import logger
+from .tracing import http_event
+
+# 每个后端地址（scheme://host:port）共享一个长连接池；连接池参数也是键的一部分，
+# 重新加载配置时只要参数未变，重建的处理器会继续使用已建立的连接
+_clients = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+def _pool_settings(config):
+    return (config.http2, config.http_max_connections, config.http_max_keepalive,
+            config.http_keepalive_expiry, config.http_timeout)
+
+
+def _http2_enabled(config):
+    if not config.http2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("未安装 h2，HTTP/2 不可用（pip install 'httpx[http2]'），使用 HTTP/1.1")
+        return False
+    return True
+
+
+def _make_hooks(origin):
+    stats = _stats[origin]
+
+    def trace(event_name, info):
+        # 只有新建连接时才会出现 connect_tcp 事件，其余请求都复用了已有连接
+        if event_name == "connection.connect_tcp.complete":
+            with _lock:
+                stats["opened"] += 1
+        # 听写进行中时，把连接、上传、等待响应的耗时记到当前阶段下
+        http_event(event_name, info)
+
+    def on_request(request):
+        request.extensions["trace"] = trace
+        with _lock:
+            stats["requests"] += 1
+
+    return {"request": [on_request]}
+
+
+def get_client(url):
+    """获取 url 所属后端的共享 httpx.Client（keep-alive 长连接池）"""
+    config = get_config()
+    origin = _origin(url)
+    key = (origin, _pool_settings(config))
+    with _lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+        _stats.setdefault(origin, {"requests": 0, "opened": 0})
+
+    limits = httpx.Limits(
+        max_connections=config.http_max_connections,
+        max_keepalive_connections=config.http_max_keepalive,
+        keepalive_expiry=config.http_keepalive_expiry,
+    )
+    client = httpx.Client(
+        limits=limits,
+        http2=_http2_enabled(config),
+        timeout=httpx.Timeout(config.http_timeout),
+        event_hooks=_make_hooks(origin),
+    )
+    with _lock:
+        # 并发创建时以先放入的为准
+        existing = _clients.setdefault(key, client)
+    if existing is not client:
+        client.close()
+    else:
+        logger.info(f"创建连接池: {origin}")
+    return existing
+
+
+def connection_stats():
+    """返回各后端的请求数、新建连接数与复用次数"""
+    with _lock:
+        return {
+            origin: {**stats, "reused": stats["requests"] - stats["opened"]}
+            for origin, stats in _stats.items()
+        }
+
+
+def log_connection_stats():
+    """输出连接池统计"""
+    for origin, stats in connection_stats().items():
+        logger.info(f"连接池 {origin}: 请求 {stats['requests']} 次, 新建连接 {stats['opened']} 个, 复用 {stats['reused']} 次")
+
+
+def close_stale():
+    """关闭参数与当前配置不一致的连接池（重新加载配置、旧请求结束后调用）"""
+    settings = _pool_settings(get_config())
+    with _lock:
+        stale = [key for key in _clients if key[1] != settings]
+        clients = [_clients.pop(key) for key in stale]
+    for client in clients:
+        client.close()
+    if clients:
+        logger.info(f"已关闭 {len(clients)} 个旧连接池")
+
+
+def close_all():
+    """关闭所有连接池"""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
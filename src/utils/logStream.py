@@ -0,0 +1,125 @@
+import logging
+import queue
+import socket
+import threading
+import time
+from collections import deque
+
+
+def parse_addr(addr):
+    host, _, port = addr.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class LogStreamHandler(logging.Handler):
+    """把日志逐行发送到控制界面的本地 TCP 端口
+
+    emit 只把格式化后的一行放进有界队列，由后台线程批量发送，记录日志的线程
+    （录音、转录、按键回调）永远不会因为界面处理不过来而被阻塞；队列满时丢弃
+    并计数，下一批发送时附上一行提示。
+    """
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, addr, max_queue=10000):
+        super().__init__()
+        self.addr = parse_addr(addr)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._sock = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-stream", daemon=True)
+        self._thread.start()
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.format(record))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _next_batch(self):
+        """阻塞等待第一行，再取走队列中已有的所有行"""
+        lines = [self.queue.get()]
+        try:
+            while len(lines) < 1000:
+                lines.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(f"...（日志过多，丢弃 {dropped} 行）")
+        return lines
+
+    def _run(self):
+        while not self._closed:
+            lines = self._next_batch()
+            if self._closed:
+                break
+            data = ("\n".join(lines) + "\n").encode("utf-8", errors="replace")
+            try:
+                if self._sock is None:
+                    self._sock = socket.create_connection(self.addr, timeout=self.RECONNECT_DELAY)
+                    self._sock.settimeout(None)
+                self._sock.sendall(data)
+            except OSError:
+                # 控制界面未在监听或已退出：丢弃这一批，稍后重连
+                if self._sock is not None:
+                    self._sock.close()
+                    self._sock = None
+                time.sleep(self.RECONNECT_DELAY)
+
+    def close(self):
+        self._closed = True
+        try:
+            self.queue.put_nowait("")  # 唤醒发送线程
+        except queue.Full:
+            pass
+        if self._sock is not None:
+            self._sock.close()
+        super().close()
+
+
+class LogLineBuffer:
+    """控制界面一侧的日志缓冲
+
+    收到的字节只做暂存，界面每帧取走一次时才切分成行；两帧之间到达的行再多，
+    也只解码最近 max_lines 行，界面线程每帧的工作量因此有上限。同时保留当前
+    应显示的最近 max_lines 行，需要整体重绘日志视图时直接使用。
+    """
+
+    def __init__(self, max_lines=2000):
+        self.max_lines = max_lines
+        self.lines = deque(maxlen=max_lines)
+        self.received = 0  # 累计收到的行数
+        self._chunks = []
+        self._partial = b""
+
+    def feed(self, data):
+        """加入收到的字节"""
+        if data:
+            self._chunks.append(data)
+
+    def drain(self):
+        """取出这一帧新到的行，返回 (文本, 行数)
+
+        不完整的末行留到下一帧（避免截断多字节字符）；超出 max_lines 的旧行
+        被丢弃，并在开头用一行提示代替。
+        """
+        data = self._partial + b"".join(self._chunks)
+        self._chunks.clear()
+        raw = data.split(b"\n")
+        self._partial = raw.pop()
+        self.received += len(raw)
+        new = []
+        if len(raw) > self.max_lines:
+            new.append(f"...（日志刷新过快，省略 {len(raw) - self.max_lines + 1} 行）")
+            raw = raw[-(self.max_lines - 1):]
+        new.extend(line.decode("utf-8", errors="replace") for line in raw)
+        self.lines.extend(new)
+        return "\n".join(new), len(new)
+
+    def text(self):
+        """当前应显示的全部日志"""
+        return "\n".join(self.lines)
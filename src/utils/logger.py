@@ -43,6 +43,14 @@ def setup_logger():
     for handler in logger.handlers[:-2]:
         logger.removeHandler(handler)
     
+    # 由控制界面启动时，把日志直接发送给界面显示，不再让界面轮询日志文件
+    stream_addr = os.getenv('LOG_STREAM_ADDR')
+    if stream_addr:
+        from .logStream import LogStreamHandler
+        stream_handler = LogStreamHandler(stream_addr)
+        stream_handler.setFormatter(file_handler.formatter)
+        logger.addHandler(stream_handler)
+    
     return logger
 
 logger = setup_logger()
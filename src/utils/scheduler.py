@@ -0,0 +1,78 @@
+import heapq
+import itertools
+import threading
+import time
+
+from .logger import logger
+
+
+class ScheduledCall:
+    """已安排的定时任务，可在执行前取消"""
+
+    __slots__ = ("when", "func", "args", "cancelled")
+
+    def __init__(self, when, func, args):
+        self.when = when
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """单线程定时器服务
+
+    所有定时任务共用一个线程和一个按时间排序的堆，线程只在最近的任务到期
+    或有新任务插队时被唤醒，没有任务时一直休眠，不做轮询。
+    """
+
+    def __init__(self, name="scheduler"):
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def call_later(self, delay, func, *args):
+        """delay 秒后在调度线程中执行 func(*args)，返回可取消的 ScheduledCall"""
+        call = ScheduledCall(time.monotonic() + delay, func, args)
+        with self._condition:
+            heapq.heappush(self._heap, (call.when, next(self._counter), call))
+            # 只有新任务成为最早到期的任务时才需要唤醒调度线程
+            if self._heap[0][2] is call:
+                self._condition.notify()
+        return call
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    timeout = self._heap[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        call = heapq.heappop(self._heap)[2]
+                        break
+                    self._condition.wait(timeout)
+            try:
+                call.func(*call.args)
+            except Exception as e:
+                logger.error(f"定时任务执行失败: {e}", exc_info=True)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """获取进程内共享的定时器服务"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
@@ -0,0 +1,284 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from .config import get_config
+from .logger import logger
+
+# 每个线程当前所属的听写，以及尚未结束的阶段（最内层在末尾）
+_local = threading.local()
+
+
+def _thread_state():
+    if not hasattr(_local, "traces"):
+        _local.traces = []
+        _local.spans = []
+        _local.http = {}
+    return _local
+
+
+class Trace:
+    """一次听写的计时记录
+
+    各阶段以 (名称, 开始, 结束) 的形式记录在同一个听写 ID 下。听写在多个线程中
+    推进（录音线程、处理线程、分段转录线程），每个线程通过 activate() 声明当前
+    处理的是哪一次听写，埋点代码只需调用 span()，不必层层传递 ID。
+    """
+
+    def __init__(self, mode="transcriptions"):
+        self.id = uuid.uuid4().hex[:8]
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.wall_time = time.time()
+        self.released = None  # 松开按键的时间
+        self.ended = None
+        self.outcome = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, end, **attrs):
+        with self._lock:
+            self.spans.append((name, start, end, attrs))
+
+    @contextmanager
+    def activate(self):
+        """在当前线程中把后续的埋点记到这次听写下"""
+        state = _thread_state()
+        state.traces.append(self)
+        try:
+            yield self
+        finally:
+            state.traces.remove(self)
+
+    def finish(self, outcome="ok"):
+        """结束听写并提交到统计，重复调用只生效一次"""
+        with self._lock:
+            if self.outcome is not None:
+                return
+            self.outcome = outcome
+            self.ended = time.perf_counter()
+        get_metrics().record(self)
+
+    @property
+    def latency(self):
+        """松开按键到听写结束的耗时（秒）"""
+        if self.released is None or self.ended is None:
+            return None
+        return self.ended - self.released
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s[1])
+        return {
+            "type": "dictation",
+            "id": self.id,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.wall_time)),
+            "mode": self.mode,
+            "outcome": self.outcome,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "spans": [
+                {"name": name, "start_ms": round((start - self.started) * 1000, 1),
+                 "duration_ms": round((end - start) * 1000, 1), **attrs}
+                for name, start, end, attrs in spans
+            ],
+        }
+
+
+def current_trace():
+    """当前线程正在处理的听写，没有时返回 None"""
+    traces = _thread_state().traces
+    return traces[-1] if traces else None
+
+
+@contextmanager
+def span(name, **attrs):
+    """记录一个阶段的耗时；当前线程没有听写时不做任何事"""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    state = _thread_state()
+    entry = [name]
+    state.spans.append(entry)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter(), **attrs)
+        # 生成器中的阶段可能不按嵌套顺序结束，按对象移除
+        state.spans.remove(entry)
+
+
+def add_span(name, start, end=None, **attrs):
+    """记录一个已知起止时间的阶段"""
+    trace = current_trace()
+    if trace is not None and start is not None:
+        trace.add_span(name, start, end if end is not None else time.perf_counter(), **attrs)
+
+
+def http_event(event_name, info):
+    """httpx trace 扩展的回调：把一次请求拆成 连接 / 上传 / 等待响应 三个子阶段
+
+    子阶段以所在阶段为前缀命名，例如 asr.upload、translate.server。
+    """
+    trace = current_trace()
+    if trace is None:
+        return
+    state = _thread_state()
+    parent = state.spans[-1][0] if state.spans else "http"
+    pending = state.http
+    now = time.perf_counter()
+    step, _, phase = event_name.rpartition(".")
+    step = step.rpartition(".")[2]
+
+    if step in ("connect_tcp", "start_tls"):
+        if phase == "started":
+            pending[step] = now
+        elif phase == "complete" and step in pending:
+            trace.add_span(f"{parent}.{'connect' if step == 'connect_tcp' else 'tls'}", pending.pop(step), now)
+    elif step == "send_request_headers" and phase == "started":
+        pending["upload"] = now
+    elif step == "send_request_body" and phase == "complete" and "upload" in pending:
+        trace.add_span(f"{parent}.upload", pending.pop("upload"), now)
+        pending["server"] = now
+    elif step == "receive_response_headers" and phase == "complete" and "server" in pending:
+        trace.add_span(f"{parent}.server", pending.pop("server"), now)
+
+
+class Histogram:
+    """滚动延迟直方图：只保留最近 window 个样本"""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+        self.total = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000)
+        self.total += 1
+
+    def snapshot(self):
+        values = np.array(self.samples)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        counts = np.bincount(np.searchsorted(self.BUCKETS_MS, values), minlength=len(self.BUCKETS_MS) + 1)
+        labels = [f"<={b}" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}"]
+        return {
+            "count": len(values),
+            "total": self.total,
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+            "max_ms": round(float(values.max()), 1),
+            "buckets": {label: int(n) for label, n in zip(labels, counts) if n},
+        }
+
+
+class Metrics:
+    """进程内的耗时统计
+
+    每次听写结束时把各阶段耗时加入对应的滚动直方图，并以一行 JSON 追加到
+    path；每 snapshot_every 次听写再追加一行所有直方图的快照。文件超过 max_bytes
+    时改名为 path.1（覆盖上一个备份）后重新开始，常驻运行时磁盘占用不超过约两倍 max_bytes。
+    """
+
+    def __init__(self, path=None, window=500, snapshot_every=50, max_bytes=5 * 1024 * 1024):
+        self.path = path
+        self.window = window
+        self.snapshot_every = snapshot_every
+        self.max_bytes = max_bytes
+        self.histograms = {}
+        self.dictations = 0
+        self._lock = threading.Lock()
+
+    def configure(self, path=None, window=500, snapshot_every=50, max_bytes=5 * 1024 * 1024):
+        """修改统计参数，已有的直方图保留；window 只影响之后新建的直方图"""
+        with self._lock:
+            self.path = path
+            self.window = window
+            self.snapshot_every = snapshot_every
+            self.max_bytes = max_bytes
+
+    def _observe(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(self.window)
+        histogram.add(seconds)
+
+    def record(self, trace):
+        record = trace.to_dict()
+        with self._lock:
+            self.dictations += 1
+            if trace.outcome == "ok":
+                for name, start, end, _ in trace.spans:
+                    self._observe(name, end - start)
+                if trace.latency is not None:
+                    self._observe("latency", trace.latency)
+            write_snapshot = self.snapshot_every and self.dictations % self.snapshot_every == 0
+        self._log(record)
+        if self.path:
+            lines = [record]
+            if write_snapshot:
+                lines.append(self._snapshot_record())
+            self._append(self.path, lines)
+
+    def _log(self, record):
+        totals = {}
+        for item in record["spans"]:
+            if "." not in item["name"]:  # 子阶段只写入文件，不进日志
+                totals[item["name"]] = totals.get(item["name"], 0) + item["duration_ms"]
+        parts = ", ".join(f"{name} {ms:.0f}ms" for name, ms in totals.items())
+        latency = f", 松开到完成 {record['latency_ms']:.0f}ms" if record["latency_ms"] is not None else ""
+        logger.info(f"耗时分解 [{record['id']}] {record['outcome']}: {parts}{latency}")
+
+    def _append(self, path, records):
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                if self.max_bytes and os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+                    os.replace(path, path + ".1")
+                with open(path, "a", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"写入耗时统计失败: {e}")
+
+    def snapshot(self):
+        """返回各阶段的直方图统计"""
+        with self._lock:
+            return {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())}
+
+    def _snapshot_record(self):
+        return {"type": "histograms", "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "dictations": self.dictations, "histograms": self.snapshot()}
+
+    def export(self, path=None):
+        """把当前所有直方图的快照作为一行 JSON 追加到文件"""
+        path = path or self.path
+        if path:
+            self._append(path, [self._snapshot_record()])
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """获取进程内共享的耗时统计"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            config = get_config()
+            _metrics = Metrics(
+                path=config.metrics_path,
+                window=config.metrics_window,
+                snapshot_every=config.metrics_snapshot_every,
+                max_bytes=config.metrics_max_bytes,
+            )
+        return _metrics